@@ -8,13 +8,29 @@ Enhanced Lineage Agent - 端到端数据血缘管理系统
 __version__ = "1.0.0"
 __author__ = "Enhanced Lineage Team"
 
-from .agents.context_aware_agent import ContextAwareAgent
-from .models.execution_context import ExecutionContext, EnvironmentType
-from .models.job_mapping import JobExecutionMapping
-from .models.lineage_validation import LineageValidationResult
-from .tools.context_extractor import ExecutionContextExtractor
-from .tools.job_validator import JobIDValidator
-from .tools.log_stream_selector import IntelligentLogStreamSelector
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .agents.context_aware_agent import ContextAwareAgent
+    from .models.execution_context import ExecutionContext, EnvironmentType
+    from .models.job_mapping import JobExecutionMapping
+    from .models.lineage_validation import LineageValidationResult
+    from .tools.context_extractor import ExecutionContextExtractor
+    from .tools.job_validator import JobIDValidator
+    from .tools.log_stream_selector import IntelligentLogStreamSelector
+
+# 公开符号 -> 所在模块，首次访问时才导入（PEP 562），避免导入包时加载boto3/strands
+_LAZY_EXPORTS = {
+    "ContextAwareAgent": ".agents.context_aware_agent",
+    "ExecutionContext": ".models.execution_context",
+    "EnvironmentType": ".models.execution_context",
+    "JobExecutionMapping": ".models.job_mapping",
+    "LineageValidationResult": ".models.lineage_validation",
+    "ExecutionContextExtractor": ".tools.context_extractor",
+    "JobIDValidator": ".tools.job_validator",
+    "IntelligentLogStreamSelector": ".tools.log_stream_selector"
+}
 
 __all__ = [
     "ContextAwareAgent",
@@ -25,4 +41,19 @@ __all__ = [
     "ExecutionContextExtractor",
     "JobIDValidator",
     "IntelligentLogStreamSelector"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """按需导入公开符号"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
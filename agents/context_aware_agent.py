@@ -4,79 +4,185 @@
 基于Claude 3.5 Sonnet的智能代理，协调整个血缘管理流程。
 """
 
+import heapq
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Callable, Tuple, TYPE_CHECKING
 from datetime import datetime
 
-from strands import Agent
-from strands.tools.aws import BedrockModel
-
 from ..models.execution_context import ExecutionContext, EnvironmentType
 from ..models.job_mapping import JobExecutionMapping, ValidationStatus
 from ..models.lineage_validation import LineageValidationResult, RecommendationType
-from ..tools.context_extractor import ExecutionContextExtractor
-from ..tools.job_validator import JobIDValidator
-from ..tools.log_stream_selector import IntelligentLogStreamSelector
 from ..utils.config_manager import ConfigManager
-from ..utils.monitoring import SimpleMonitoring
+
+# strands、boto3及各工具模块的导入开销较大，延迟到首次使用时导入以缩短冷启动时间
+if TYPE_CHECKING:
+    from strands.tools.aws import BedrockModel
+    from ..tools.context_extractor import ExecutionContextExtractor
+    from ..tools.job_validator import JobIDValidator
+    from ..tools.log_stream_selector import IntelligentLogStreamSelector
+    from ..utils.monitoring import SimpleMonitoring
+
+
+DEFAULT_MODEL_ID = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+# 候选结果的置信度排序键
+_candidate_confidence = itemgetter('confidence')
+
+# 各数据源收集结果的元数据模板（每次收集返回其浅拷贝，调用方修改结果不影响模板）
+_COLLECTOR_METADATA = {
+    'extractor_version': '1.0.0',
+    'extraction_method': 'context_aware'
+}
+
+
+# 模型和工具的构造涉及boto3客户端初始化（端点解析、凭证链、TLS），
+# 通过缓存的工厂函数在同一进程内的多个代理实例之间复用
+@lru_cache(maxsize=None)
+def _get_bedrock_model(model_id: str) -> 'BedrockModel':
+    """获取共享的Bedrock模型实例"""
+    from strands.tools.aws import BedrockModel
+    return BedrockModel(model_id)
+
+
+def _should_collect_redshift_lineage(context_id: str, environment_type: EnvironmentType) -> bool:
+    """判断是否应该收集Redshift血缘"""
+    # 简化的判断逻辑，实际实现会更复杂
+    return True  # MVP版本默认尝试收集
+
+
+@lru_cache(maxsize=1024)
+def _applicable_lineage_sources(context_id: str, environment_type: EnvironmentType) -> Tuple[str, ...]:
+    """获取适用于该上下文的血缘数据源（对同一上下文结果不变，按context_id缓存）"""
+    sources = ['glue']
+    if _should_collect_redshift_lineage(context_id, environment_type):
+        sources.append('redshift')
+    if environment_type == EnvironmentType.SAGEMAKER_NOTEBOOK:
+        sources.append('sagemaker')
+    return tuple(sources)
+
+
+@lru_cache(maxsize=None)
+def _get_context_extractor() -> 'ExecutionContextExtractor':
+    """获取共享的执行上下文提取器"""
+    from ..tools.context_extractor import ExecutionContextExtractor
+    return ExecutionContextExtractor()
+
+
+@lru_cache(maxsize=None)
+def _get_job_validator() -> 'JobIDValidator':
+    """获取共享的Job ID验证器"""
+    from ..tools.job_validator import JobIDValidator
+    return JobIDValidator()
+
+
+@lru_cache(maxsize=None)
+def _get_log_stream_selector() -> 'IntelligentLogStreamSelector':
+    """获取共享的日志流选择器"""
+    from ..tools.log_stream_selector import IntelligentLogStreamSelector
+    return IntelligentLogStreamSelector()
 
 
 class ContextAwareAgent:
     """上下文感知代理 - MVP版本的单一代理实现"""
     
+    # 系统提示（类级常量，所有实例共享）
+    SYSTEM_PROMPT = textwrap.dedent("""
+    你是一个端到端数据血缘管理的智能代理。你的核心职责是：
+    
+    1. **执行上下文管理**：
+       - 识别和追踪多种执行上下文（独立脚本、SageMaker Notebook、Airflow等）
+       - 确保每个执行上下文都能获取到属于自己的正确数据血缘
+       - 防止不同执行上下文的血缘数据交叉污染
+    
+    2. **智能Job ID验证**：
+       - 使用多维度验证替代简单的lastEventTime排序
+       - 基于时间匹配、参数匹配、环境匹配等因素进行综合判断
+       - 提供置信度评分和验证建议
+    
+    3. **血缘数据协调**：
+       - 收集Glue Job、Redshift和SageMaker Notebook的完整数据血缘
+       - 按照真实的上下游关系智能合并多源血缘数据
+       - 确保血缘数据的一致性和完整性
+    
+    4. **冲突检测和解决**：
+       - 检测Job ID冲突和上下文混淆
+       - 提供智能的冲突解决策略
+       - 在必要时建议人工干预
+    
+    5. **决策制定**：
+       - 基于多维度信息做出智能决策
+       - 提供清晰的决策理由和建议
+       - 确保决策的可解释性和可审计性
+    
+    **工作原则**：
+    - 准确性优先：宁可保守也不要产生错误的血缘关联
+    - 上下文隔离：严格确保不同执行上下文的数据不会混淆
+    - 智能决策：综合多个维度的信息进行决策
+    - 可解释性：提供清晰的决策理由和建议
+    - 错误恢复：在出现问题时提供恢复建议
+    """).strip()
+    
+    # 候选Job ID并发验证的共享线程池（惰性创建，跨实例复用）
+    _validation_executor: Optional[ThreadPoolExecutor] = None
+    _validation_executor_lock = threading.Lock()
+    _validation_max_workers = 8
+    
+    # 多源血缘收集的共享线程池（每个数据源一个工作线程；惰性创建，跨实例复用）
+    _collector_executor: Optional[ThreadPoolExecutor] = None
+    _collector_executor_lock = threading.Lock()
+    
+    # 数据源显示名称（用于日志）
+    _SOURCE_DISPLAY_NAMES = {
+        'glue': 'Glue',
+        'redshift': 'Redshift',
+        'sagemaker': 'SageMaker'
+    }
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.logger = logging.getLogger(__name__)
         self.config_manager = ConfigManager(config)
-        self.monitoring = SimpleMonitoring()
-        
-        # 初始化Bedrock模型
-        self.model = BedrockModel("anthropic.claude-3-5-sonnet-20241022-v2:0")
-        
-        # 初始化工具
-        self.context_extractor = ExecutionContextExtractor()
-        self.job_validator = JobIDValidator()
-        self.log_stream_selector = IntelligentLogStreamSelector()
         
-        # 系统提示
-        self.system_prompt = """
-        你是一个端到端数据血缘管理的智能代理。你的核心职责是：
-        
-        1. **执行上下文管理**：
-           - 识别和追踪多种执行上下文（独立脚本、SageMaker Notebook、Airflow等）
-           - 确保每个执行上下文都能获取到属于自己的正确数据血缘
-           - 防止不同执行上下文的血缘数据交叉污染
-        
-        2. **智能Job ID验证**：
-           - 使用多维度验证替代简单的lastEventTime排序
-           - 基于时间匹配、参数匹配、环境匹配等因素进行综合判断
-           - 提供置信度评分和验证建议
-        
-        3. **血缘数据协调**：
-           - 收集Glue Job、Redshift和SageMaker Notebook的完整数据血缘
-           - 按照真实的上下游关系智能合并多源血缘数据
-           - 确保血缘数据的一致性和完整性
-        
-        4. **冲突检测和解决**：
-           - 检测Job ID冲突和上下文混淆
-           - 提供智能的冲突解决策略
-           - 在必要时建议人工干预
-        
-        5. **决策制定**：
-           - 基于多维度信息做出智能决策
-           - 提供清晰的决策理由和建议
-           - 确保决策的可解释性和可审计性
-        
-        **工作原则**：
-        - 准确性优先：宁可保守也不要产生错误的血缘关联
-        - 上下文隔离：严格确保不同执行上下文的数据不会混淆
-        - 智能决策：综合多个维度的信息进行决策
-        - 可解释性：提供清晰的决策理由和建议
-        - 错误恢复：在出现问题时提供恢复建议
-        """
+        # 各数据源的血缘收集器
+        self._collectors = {
+            'glue': self._collect_glue_lineage,
+            'redshift': self._collect_redshift_lineage,
+            'sagemaker': self._collect_sagemaker_lineage
+        }
         
         self.logger.info("Context-Aware Agent initialized successfully")
     
+    @cached_property
+    def monitoring(self) -> 'SimpleMonitoring':
+        """监控组件（首次使用时创建）"""
+        from ..utils.monitoring import SimpleMonitoring
+        return SimpleMonitoring()
+    
+    @cached_property
+    def model(self) -> 'BedrockModel':
+        """Bedrock模型（首次使用时创建，跨实例复用）"""
+        return _get_bedrock_model(DEFAULT_MODEL_ID)
+    
+    @cached_property
+    def context_extractor(self) -> 'ExecutionContextExtractor':
+        """执行上下文提取器（首次使用时创建，跨实例复用）"""
+        return _get_context_extractor()
+    
+    @cached_property
+    def job_validator(self) -> 'JobIDValidator':
+        """Job ID验证器（首次使用时创建，跨实例复用）"""
+        return _get_job_validator()
+    
+    @cached_property
+    def log_stream_selector(self) -> 'IntelligentLogStreamSelector':
+        """日志流选择器（首次使用时创建，跨实例复用）"""
+        return _get_log_stream_selector()
+    
     def identify_execution_context(self, trigger_info: Optional[Dict[str, Any]] = None) -> ExecutionContext:
         """
         识别当前执行上下文
@@ -104,10 +210,11 @@ class ContextAwareAgent:
             )
             
             if not is_valid:
-                self.logger.warning(f"Context validation failed for {context.context_id}")
+                self.logger.warning("Context validation failed for %s", context.context_id)
                 context.metadata['validation_warning'] = 'Context validation failed'
             
-            self.logger.info(f"Execution context identified: {context.context_id} ({context.environment_type.value})")
+            self.logger.info("Execution context identified: %s (%s)",
+                             context.context_id, context.environment_type.value)
             return context
             
         except Exception as e:
@@ -133,7 +240,7 @@ class ContextAwareAgent:
             JobExecutionMapping: 验证结果和映射信息
         """
         try:
-            self.logger.info(f"Validating Job ID selection: {job_name}/{selected_job_id}")
+            self.logger.info("Validating Job ID selection: %s/%s", job_name, selected_job_id)
             
             # 执行多维度验证
             mapping = self.job_validator.validate_job_run_id(job_name, selected_job_id, context)
@@ -147,11 +254,14 @@ class ContextAwareAgent:
             
             # 根据验证结果提供建议
             if mapping.validation_status == ValidationStatus.VALIDATED:
-                self.logger.info(f"Job ID validation successful: {selected_job_id} (confidence: {mapping.confidence_score:.3f})")
+                self.logger.info("Job ID validation successful: %s (confidence: %.3f)",
+                                 selected_job_id, mapping.confidence_score)
             elif mapping.validation_status == ValidationStatus.PENDING:
-                self.logger.warning(f"Job ID validation pending: {selected_job_id} (confidence: {mapping.confidence_score:.3f})")
+                self.logger.warning("Job ID validation pending: %s (confidence: %.3f)",
+                                    selected_job_id, mapping.confidence_score)
             else:
-                self.logger.error(f"Job ID validation failed: {selected_job_id} (confidence: {mapping.confidence_score:.3f})")
+                self.logger.error("Job ID validation failed: %s (confidence: %.3f)",
+                                  selected_job_id, mapping.confidence_score)
             
             return mapping
             
@@ -173,29 +283,37 @@ class ContextAwareAgent:
             Dict: 冲突解决结果
         """
         try:
-            self.logger.info(f"Resolving Job ID conflict for {job_name}: {len(conflicting_jobs)} candidates")
+            self.logger.info("Resolving Job ID conflict for %s: %d candidates", job_name, len(conflicting_jobs))
+            
+            # 为每个候选Job ID并发进行验证（每次验证都是阻塞的AWS API调用）
+            executor = self._get_validation_executor()
+            futures = [
+                (job_id, executor.submit(self.validate_job_id_selection, job_name, job_id, context))
+                for job_id in conflicting_jobs
+            ]
             
-            # 为每个候选Job ID进行验证
+            # 按提交顺序收集结果，保证相同置信度时的排序与串行实现一致
             validation_results = []
-            for job_id in conflicting_jobs:
-                mapping = self.validate_job_id_selection(job_name, job_id, context)
+            for job_id, future in futures:
+                mapping = future.result()
                 validation_results.append({
                     'job_id': job_id,
                     'mapping': mapping,
                     'confidence': mapping.confidence_score
                 })
             
-            # 按置信度排序
-            validation_results.sort(key=lambda x: x['confidence'], reverse=True)
+            # 只需要置信度最高的两个候选即可判断（部分排序）
+            top_candidates = heapq.nlargest(2, validation_results, key=_candidate_confidence)
             
             # 选择最佳候选
-            best_candidate = validation_results[0]
+            best_candidate = top_candidates[0]
             
             # 检查是否有明确的最佳选择
-            if len(validation_results) > 1:
-                confidence_gap = best_candidate['confidence'] - validation_results[1]['confidence']
+            if len(top_candidates) > 1:
+                confidence_gap = best_candidate['confidence'] - top_candidates[1]['confidence']
                 if confidence_gap < 0.2:  # 置信度差距小于0.2
-                    # 需要人工干预
+                    # 需要人工干预，此时才对全部候选按置信度排序
+                    validation_results.sort(key=_candidate_confidence, reverse=True)
                     return {
                         'resolution_status': 'manual_intervention_required',
                         'recommended_job_id': best_candidate['job_id'],
@@ -229,6 +347,30 @@ class ContextAwareAgent:
                 'suggested_actions': ['Manual review required', 'Check system logs for details']
             }
     
+    @classmethod
+    def _get_validation_executor(cls) -> ThreadPoolExecutor:
+        """获取候选验证使用的共享线程池"""
+        if cls._validation_executor is None:
+            with cls._validation_executor_lock:
+                if cls._validation_executor is None:
+                    cls._validation_executor = ThreadPoolExecutor(
+                        max_workers=cls._validation_max_workers,
+                        thread_name_prefix='job-id-validation'
+                    )
+        return cls._validation_executor
+    
+    @classmethod
+    def _get_collector_executor(cls) -> ThreadPoolExecutor:
+        """获取多源血缘收集使用的共享线程池"""
+        if cls._collector_executor is None:
+            with cls._collector_executor_lock:
+                if cls._collector_executor is None:
+                    cls._collector_executor = ThreadPoolExecutor(
+                        max_workers=3,
+                        thread_name_prefix='lineage-collector'
+                    )
+        return cls._collector_executor
+    
     def intelligent_log_stream_selection(self, job_name: str, context: ExecutionContext,
                                        log_group_name: str) -> Dict[str, Any]:
         """
@@ -243,7 +385,7 @@ class ContextAwareAgent:
             Dict: 日志流选择结果
         """
         try:
-            self.logger.info(f"Performing intelligent log stream selection for {job_name}")
+            self.logger.info("Performing intelligent log stream selection for %s", job_name)
             
             # 获取可用的日志流
             available_streams = self.log_stream_selector.get_log_streams_for_job(log_group_name)
@@ -261,10 +403,12 @@ class ContextAwareAgent:
             )
             
             # 记录选择结果
-            self.logger.info(
-                f"Log stream selected: {selection_result.get('selected_stream', {}).get('logStreamName', 'None')} "
-                f"(confidence: {selection_result.get('confidence_score', 0):.3f})"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    "Log stream selected: %s (confidence: %.3f)",
+                    selection_result.get('selected_stream', {}).get('logStreamName', 'None'),
+                    selection_result.get('confidence_score', 0)
+                )
             
             return selection_result
             
@@ -288,47 +432,38 @@ class ContextAwareAgent:
             Dict: 多源血缘收集结果
         """
         try:
-            self.logger.info(f"Starting multi-source lineage collection for context {context.context_id}")
+            self.logger.info("Starting multi-source lineage collection for context %s", context.context_id)
+            
+            # 本次收集统一使用同一个时间戳，保证各数据源记录的一致性
+            collection_timestamp = datetime.now().isoformat()
             
             collection_results = {
                 'context_id': context.context_id,
-                'collection_timestamp': datetime.now().isoformat(),
+                'collection_timestamp': collection_timestamp,
                 'sources_collected': [],
                 'lineage_data': {},
                 'collection_status': 'in_progress'
             }
             
-            # 收集Glue血缘（基础功能）
-            try:
-                glue_lineage = self._collect_glue_lineage(context)
-                if glue_lineage:
-                    collection_results['sources_collected'].append('glue')
-                    collection_results['lineage_data']['glue'] = glue_lineage
-            except Exception as e:
-                self.logger.warning(f"Glue lineage collection failed: {e}")
-                collection_results['lineage_data']['glue'] = {'error': str(e)}
-            
-            # 收集Redshift血缘（如果适用）
-            if self._should_collect_redshift_lineage(context):
-                try:
-                    redshift_lineage = self._collect_redshift_lineage(context)
-                    if redshift_lineage:
-                        collection_results['sources_collected'].append('redshift')
-                        collection_results['lineage_data']['redshift'] = redshift_lineage
-                except Exception as e:
-                    self.logger.warning(f"Redshift lineage collection failed: {e}")
-                    collection_results['lineage_data']['redshift'] = {'error': str(e)}
-            
-            # 收集SageMaker血缘（如果适用）
-            if context.environment_type == EnvironmentType.SAGEMAKER_NOTEBOOK:
-                try:
-                    sagemaker_lineage = self._collect_sagemaker_lineage(context)
-                    if sagemaker_lineage:
-                        collection_results['sources_collected'].append('sagemaker')
-                        collection_results['lineage_data']['sagemaker'] = sagemaker_lineage
-                except Exception as e:
-                    self.logger.warning(f"SageMaker lineage collection failed: {e}")
-                    collection_results['lineage_data']['sagemaker'] = {'error': str(e)}
+            # 确定需要收集的数据源（各数据源之间没有数据依赖）
+            sources = _applicable_lineage_sources(context.context_id, context.environment_type)
+            
+            # 并发提交所有收集任务，再按固定顺序汇总结果
+            executor = self._get_collector_executor()
+            futures = [
+                (source, executor.submit(
+                    self._run_collector, source, self._collectors[source], context, collection_timestamp
+                ))
+                for source in sources
+            ]
+            
+            for source, future in futures:
+                lineage, error = future.result()
+                if error is not None:
+                    collection_results['lineage_data'][source] = error
+                elif lineage:
+                    collection_results['sources_collected'].append(source)
+                    collection_results['lineage_data'][source] = lineage
             
             # 更新收集状态
             if collection_results['sources_collected']:
@@ -338,8 +473,8 @@ class ContextAwareAgent:
                 collection_results['error'] = 'No lineage data collected from any source'
             
             self.logger.info(
-                f"Multi-source lineage collection completed: "
-                f"{len(collection_results['sources_collected'])} sources collected"
+                "Multi-source lineage collection completed: %d sources collected",
+                len(collection_results['sources_collected'])
             )
             
             return collection_results
@@ -353,60 +488,61 @@ class ContextAwareAgent:
                 'collection_timestamp': datetime.now().isoformat()
             }
     
-    def _collect_glue_lineage(self, context: ExecutionContext) -> Optional[Dict[str, Any]]:
+    def _run_collector(self, source: str,
+                       collector: Callable[[ExecutionContext, str], Optional[Dict[str, Any]]],
+                       context: ExecutionContext,
+                       collection_timestamp: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """在线程池中执行单个数据源的收集，捕获异常并返回 (血缘数据, 错误信息)"""
+        try:
+            return collector(context, collection_timestamp), None
+        except Exception as e:
+            self.logger.warning("%s lineage collection failed: %s",
+                                self._SOURCE_DISPLAY_NAMES.get(source, source), e)
+            return None, {'error': str(e)}
+    
+    def _collect_glue_lineage(self, context: ExecutionContext,
+                              collection_timestamp: str) -> Optional[Dict[str, Any]]:
         """收集Glue血缘数据（占位符实现）"""
         # 这里是MVP版本的简化实现
         # 在完整实现中，这里会调用增强的Glue血缘提取器
         return {
             'source': 'glue',
             'context_id': context.context_id,
-            'extraction_timestamp': datetime.now().isoformat(),
+            'extraction_timestamp': collection_timestamp,
             'events': [],  # 实际的血缘事件会在这里
-            'metadata': {
-                'extractor_version': '1.0.0',
-                'extraction_method': 'context_aware'
-            }
+            'metadata': dict(_COLLECTOR_METADATA)
         }
     
-    def _collect_redshift_lineage(self, context: ExecutionContext) -> Optional[Dict[str, Any]]:
+    def _collect_redshift_lineage(self, context: ExecutionContext,
+                                  collection_timestamp: str) -> Optional[Dict[str, Any]]:
         """收集Redshift血缘数据（占位符实现）"""
         return {
             'source': 'redshift',
             'context_id': context.context_id,
-            'extraction_timestamp': datetime.now().isoformat(),
+            'extraction_timestamp': collection_timestamp,
             'queries': [],  # 实际的查询血缘会在这里
-            'metadata': {
-                'extractor_version': '1.0.0',
-                'extraction_method': 'context_aware'
-            }
+            'metadata': dict(_COLLECTOR_METADATA)
         }
     
-    def _collect_sagemaker_lineage(self, context: ExecutionContext) -> Optional[Dict[str, Any]]:
+    def _collect_sagemaker_lineage(self, context: ExecutionContext,
+                                   collection_timestamp: str) -> Optional[Dict[str, Any]]:
         """收集SageMaker血缘数据（占位符实现）"""
         return {
             'source': 'sagemaker',
             'context_id': context.context_id,
-            'extraction_timestamp': datetime.now().isoformat(),
+            'extraction_timestamp': collection_timestamp,
             'notebook_instance': context.notebook_instance,
             'operations': [],  # 实际的notebook操作会在这里
-            'metadata': {
-                'extractor_version': '1.0.0',
-                'extraction_method': 'context_aware'
-            }
+            'metadata': dict(_COLLECTOR_METADATA)
         }
     
-    def _should_collect_redshift_lineage(self, context: ExecutionContext) -> bool:
-        """判断是否应该收集Redshift血缘"""
-        # 简化的判断逻辑，实际实现会更复杂
-        return True  # MVP版本默认尝试收集
-    
     def get_agent_status(self) -> Dict[str, Any]:
         """获取代理状态信息"""
         return {
             'agent_type': 'ContextAwareAgent',
             'version': '1.0.0',
             'status': 'active',
-            'model': 'anthropic.claude-3-5-sonnet-20241022-v2:0',
+            'model': DEFAULT_MODEL_ID,
             'tools_available': [
                 'ExecutionContextExtractor',
                 'JobIDValidator',
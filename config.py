@@ -3,12 +3,23 @@
 """
 
 import os
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, field
+import sys
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
 
-@dataclass
+
+# Python 3.10+ 使用__slots__存储配置字段（更快的属性访问、更小的实例）
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class BedrockConfig:
     """Amazon Bedrock配置"""
     model_id: str = "anthropic.claude-3-5-sonnet-20241022-v2:0"
@@ -17,7 +28,7 @@ class BedrockConfig:
     temperature: float = 0.1
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class DynamoDBConfig:
     """DynamoDB配置"""
     region: str = "us-west-2"
@@ -26,7 +37,7 @@ class DynamoDBConfig:
     validation_result_table: str = "lineage-validation-results"
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class CloudWatchConfig:
     """CloudWatch配置"""
     region: str = "us-west-2"
@@ -34,7 +45,7 @@ class CloudWatchConfig:
     log_group: str = "/aws/lambda/enhanced-lineage-agent"
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ValidationConfig:
     """验证配置"""
     time_tolerance_seconds: int = 300  # 5分钟
@@ -43,7 +54,7 @@ class ValidationConfig:
     enable_environment_validation: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Config:
     """主配置类"""
     
@@ -63,82 +74,54 @@ class Config:
     enable_error_recovery: bool = True
     enable_context_caching: bool = True
     
+    # to_dict的缓存结果（不参与初始化、比较和哈希）
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # 配置不可变，字典表示只需构建一次
+        object.__setattr__(self, '_dict_cache', self._build_dict())
+    
     @classmethod
     def from_env(cls) -> 'Config':
         """从环境变量创建配置"""
-        config = cls()
-        
-        # Bedrock配置
-        if os.getenv('BEDROCK_MODEL_ID'):
-            config.bedrock.model_id = os.getenv('BEDROCK_MODEL_ID')
-        if os.getenv('BEDROCK_REGION'):
-            config.bedrock.region = os.getenv('BEDROCK_REGION')
-        
-        # DynamoDB配置
-        if os.getenv('DYNAMODB_REGION'):
-            config.dynamodb.region = os.getenv('DYNAMODB_REGION')
-        if os.getenv('EXECUTION_CONTEXT_TABLE'):
-            config.dynamodb.execution_context_table = os.getenv('EXECUTION_CONTEXT_TABLE')
-        if os.getenv('JOB_MAPPING_TABLE'):
-            config.dynamodb.job_mapping_table = os.getenv('JOB_MAPPING_TABLE')
-        
-        # CloudWatch配置
-        if os.getenv('CLOUDWATCH_NAMESPACE'):
-            config.cloudwatch.namespace = os.getenv('CLOUDWATCH_NAMESPACE')
-        if os.getenv('LOG_GROUP'):
-            config.cloudwatch.log_group = os.getenv('LOG_GROUP')
-        
-        # 通用配置
-        if os.getenv('DEBUG'):
-            config.debug = os.getenv('DEBUG').lower() == 'true'
-        if os.getenv('LOG_LEVEL'):
-            config.log_level = os.getenv('LOG_LEVEL')
-        if os.getenv('AWS_REGION'):
-            config.aws_region = os.getenv('AWS_REGION')
-        
-        # 验证配置
-        if os.getenv('TIME_TOLERANCE_SECONDS'):
-            config.validation.time_tolerance_seconds = int(os.getenv('TIME_TOLERANCE_SECONDS'))
-        if os.getenv('MIN_CONFIDENCE_SCORE'):
-            config.validation.min_confidence_score = float(os.getenv('MIN_CONFIDENCE_SCORE'))
-        
-        return config
+        env_values = tuple(os.getenv(env_var) for env_var, _, _, _ in _ENV_OVERRIDES)
+        return _config_from_env_values(cls, env_values)
     
     @classmethod
     def from_file(cls, config_file: str) -> 'Config':
         """从配置文件创建配置"""
-        with open(config_file, 'r') as f:
-            data = json.load(f)
-        
-        config = cls()
-        
-        # 更新配置
-        if 'bedrock' in data:
-            for key, value in data['bedrock'].items():
-                setattr(config.bedrock, key, value)
+        with open(config_file, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         
-        if 'dynamodb' in data:
-            for key, value in data['dynamodb'].items():
-                setattr(config.dynamodb, key, value)
-        
-        if 'cloudwatch' in data:
-            for key, value in data['cloudwatch'].items():
-                setattr(config.cloudwatch, key, value)
-        
-        if 'validation' in data:
-            for key, value in data['validation'].items():
-                setattr(config.validation, key, value)
-        
-        # 更新通用配置
-        for key in ['debug', 'log_level', 'aws_region', 'enable_monitoring', 
-                   'enable_error_recovery', 'enable_context_caching']:
-            if key in data:
-                setattr(config, key, data[key])
+        # 子配置只保留已声明的字段，忽略配置文件中扩展或遗留的键
+        sections = {
+            section: {
+                key: value for key, value in data[section].items()
+                if key in _SECTION_FIELDS[section]
+            }
+            for section in _SECTION_TYPES if section in data
+        }
+        general = {key: data[key] for key in _GENERAL_KEYS if key in data}
         
-        return config
+        return cls._from_overrides(sections, general)
+    
+    @classmethod
+    def _from_overrides(cls, sections: Dict[str, Dict[str, Any]],
+                        general: Dict[str, Any]) -> 'Config':
+        """根据子配置和通用配置的覆盖值构建配置"""
+        sub_configs = {
+            section: config_type(**sections.get(section, {}))
+            for section, config_type in _SECTION_TYPES.items()
+        }
+        return cls(**sub_configs, **general)
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
+        """转换为字典（返回缓存的字典，调用方不应修改）"""
+        return self._dict_cache
+    
+    def _build_dict(self) -> Dict[str, Any]:
+        """构建字典表示"""
         return {
             'bedrock': {
                 'model_id': self.bedrock.model_id,
@@ -172,6 +155,70 @@ class Config:
         }
 
 
+# 子配置名称与类型
+_SECTION_TYPES = {
+    'bedrock': BedrockConfig,
+    'dynamodb': DynamoDBConfig,
+    'cloudwatch': CloudWatchConfig,
+    'validation': ValidationConfig
+}
+
+# 各子配置声明的字段名称
+_SECTION_FIELDS = {
+    section: frozenset(f.name for f in fields(config_type))
+    for section, config_type in _SECTION_TYPES.items()
+}
+
+# 可从配置文件覆盖的通用配置项
+_GENERAL_KEYS = (
+    'debug', 'log_level', 'aws_region', 'enable_monitoring',
+    'enable_error_recovery', 'enable_context_caching'
+)
+
+# 环境变量覆盖表: (环境变量, 子配置名称或None表示通用配置, 配置项, 类型转换)
+_ENV_OVERRIDES = (
+    # Bedrock配置
+    ('BEDROCK_MODEL_ID', 'bedrock', 'model_id', str),
+    ('BEDROCK_REGION', 'bedrock', 'region', str),
+    
+    # DynamoDB配置
+    ('DYNAMODB_REGION', 'dynamodb', 'region', str),
+    ('EXECUTION_CONTEXT_TABLE', 'dynamodb', 'execution_context_table', str),
+    ('JOB_MAPPING_TABLE', 'dynamodb', 'job_mapping_table', str),
+    
+    # CloudWatch配置
+    ('CLOUDWATCH_NAMESPACE', 'cloudwatch', 'namespace', str),
+    ('LOG_GROUP', 'cloudwatch', 'log_group', str),
+    
+    # 通用配置
+    ('DEBUG', None, 'debug', lambda value: value.lower() == 'true'),
+    ('LOG_LEVEL', None, 'log_level', str),
+    ('AWS_REGION', None, 'aws_region', str),
+    
+    # 验证配置
+    ('TIME_TOLERANCE_SECONDS', 'validation', 'time_tolerance_seconds', int),
+    ('MIN_CONFIDENCE_SCORE', 'validation', 'min_confidence_score', float)
+)
+
+
+@lru_cache(maxsize=16)
+def _config_from_env_values(config_cls: type, env_values: Tuple[Optional[str], ...]) -> Config:
+    """根据环境变量取值构建配置（按取值缓存，相同环境只解析一次）"""
+    sections: Dict[str, Dict[str, Any]] = {}
+    general: Dict[str, Any] = {}
+    
+    for (env_var, section, key, convert), raw_value in zip(_ENV_OVERRIDES, env_values):
+        if not raw_value:
+            continue
+        
+        if section is None:
+            general[key] = convert(raw_value)
+        else:
+            sections.setdefault(section, {})[key] = convert(raw_value)
+    
+    return config_cls._from_overrides(sections, general)
+
+
 # 全局配置实例
 _config: Optional[Config] = None
 
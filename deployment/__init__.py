@@ -6,6 +6,7 @@ from .config_manager import (
     ConfigManager, 
     get_config_manager, 
     get_enhanced_config,
+    clear_config_cache,
     Environment,
     EnhancedLineageConfig
 )
@@ -14,6 +15,7 @@ __all__ = [
     'ConfigManager',
     'get_config_manager', 
     'get_enhanced_config',
+    'clear_config_cache',
     'Environment',
     'EnhancedLineageConfig'
 ]
\ No newline at end of file
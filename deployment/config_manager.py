@@ -3,16 +3,145 @@
 """
 
 import os
+import sys
+import copy
 import yaml
 import json
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Tuple, Callable, FrozenSet
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from enum import Enum
+from pathlib import Path
 
 from ..utils.logging_config import get_logger
 
+# 优先使用libyaml的C实现加载/输出YAML，不可用时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+_YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# 优先使用orjson输出JSON（可选依赖），不可用时回退到标准库json
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
 logger = get_logger('config_manager')
 
+# save_config写文件时使用的缓冲区大小
+_SAVE_BUFFER_SIZE = 1 << 16
+
+# 配置对象不可变；Python 3.10+ 额外使用__slots__存储字段（更快的属性访问、更小的实例）
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+# 已解析的YAML文件缓存: 路径 -> (st_mtime_ns, st_size, 解析结果)，跨ConfigManager实例共享
+_YAML_CACHE: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+
+def _load_yaml_file(path: str) -> Dict[str, Any]:
+    """一次性读取文件内容后解析YAML（libyaml直接解析连续缓冲区，避免逐块回调读取）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return yaml.load(data, Loader=_YamlLoader) or {}
+
+
+def _load_yaml_cached(path: str) -> Dict[str, Any]:
+    """加载YAML文件，文件未修改时直接返回缓存结果的副本"""
+    stat = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return copy.deepcopy(cached[2])
+    
+    parsed = _load_yaml_file(path)
+    _YAML_CACHE[path] = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(parsed))
+    return parsed
+
+
+def _to_bool(value: str) -> bool:
+    """将环境变量字符串转换为布尔值"""
+    return value.lower() in ('true', '1', 'yes', 'on')
+
+
+# 环境变量覆盖表: (环境变量, 配置路径, 类型转换)
+_ENV_OVERRIDES: Tuple[Tuple[str, Tuple[str, ...], Callable[[str], Any]], ...] = (
+    ('AWS_REGION', ('aws', 'region'), str),
+    ('AWS_PROFILE', ('aws', 'profile'), str),
+    ('AWS_ACCOUNT_ID', ('aws', 'account_id'), str),
+    
+    ('DYNAMODB_REGION', ('dynamodb', 'region'), str),
+    ('DYNAMODB_JOB_MAPPING_TABLE', ('dynamodb', 'job_mapping_table'), str),
+    ('DYNAMODB_CONTEXT_TABLE', ('dynamodb', 'context_table'), str),
+    ('DYNAMODB_ENDPOINT_URL', ('dynamodb', 'endpoint_url'), str),
+    
+    ('BEDROCK_MODEL_ID', ('bedrock', 'model_id'), str),
+    ('BEDROCK_REGION', ('bedrock', 'region'), str),
+    ('BEDROCK_MAX_TOKENS', ('bedrock', 'max_tokens'), int),
+    ('BEDROCK_TEMPERATURE', ('bedrock', 'temperature'), float),
+    
+    ('VALIDATION_MIN_CONFIDENCE_SCORE', ('validation', 'min_confidence_score'), float),
+    ('VALIDATION_TIME_TOLERANCE_SECONDS', ('validation', 'time_tolerance_seconds'), int),
+    ('VALIDATION_ENABLE_PARAMETER_VALIDATION', ('validation', 'enable_parameter_validation'), _to_bool),
+    ('VALIDATION_ENABLE_ENVIRONMENT_VALIDATION', ('validation', 'enable_environment_validation'), _to_bool),
+    
+    ('MONITORING_NAMESPACE', ('monitoring', 'namespace'), str),
+    ('MONITORING_BATCH_SIZE', ('monitoring', 'batch_size'), int),
+    ('MONITORING_ALERT_TOPIC_ARN', ('monitoring', 'alert_topic_arn'), str),
+    
+    ('ERROR_RECOVERY_MAX_RETRIES', ('error_recovery', 'max_retries'), int),
+    ('ERROR_RECOVERY_RETRY_DELAY_SECONDS', ('error_recovery', 'retry_delay_seconds'), int),
+    
+    ('LOGGING_LEVEL', ('logging', 'level'), str),
+    ('LOGGING_FILE_PATH', ('logging', 'file_path'), str),
+    
+    ('S3_LINEAGE_BUCKET', ('s3', 'lineage_bucket'), str),
+    ('S3_REGION', ('s3', 'region'), str),
+    ('S3_PREFIX', ('s3', 'prefix'), str)
+)
+
+# 环境变量名 -> (配置路径, 类型转换)，用于只处理实际设置了的环境变量
+_ENV_OVERRIDE_TABLE: Dict[str, Tuple[Tuple[str, ...], Callable[[str], Any]]] = {
+    env_var: (config_path, convert) for env_var, config_path, convert in _ENV_OVERRIDES
+}
+_ENV_KEYS = frozenset(_ENV_OVERRIDE_TABLE)
+
+
+def _set_path(config: Dict[str, Any], config_path: Tuple[str, ...], value: Any):
+    """按路径设置嵌套配置值，缺失的中间层级自动创建"""
+    # 当前所有覆盖路径均为 (section, key) 两级，直接处理，避免切片和循环
+    if len(config_path) == 2:
+        section, leaf = config_path
+        config.setdefault(section, {})[leaf] = value
+        return
+    
+    current = config
+    for key in config_path[:-1]:
+        if key not in current:
+            current[key] = {}
+        current = current[key]
+    current[config_path[-1]] = value
+
+
+def _deep_merge_inplace(dst: Dict[str, Any], src: Dict[str, Any]):
+    """将src深度合并到dst中（迭代实现，不复制中间层级）"""
+    stack = [(dst, src)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            current = target.get(key)
+            # YAML安全加载只会产生内置dict，直接比较类型即可
+            if type(current) is dict and type(value) is dict:
+                stack.append((current, value))
+            else:
+                target[key] = value
+
 
 class Environment(Enum):
     """环境枚举"""
@@ -21,7 +150,7 @@ class Environment(Enum):
     PRODUCTION = "prod"
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class AWSConfig:
     """AWS配置"""
     region: str = "us-east-1"
@@ -29,7 +158,7 @@ class AWSConfig:
     account_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class DynamoDBConfig:
     """DynamoDB配置"""
     region: str = "us-east-1"
@@ -38,7 +167,7 @@ class DynamoDBConfig:
     endpoint_url: Optional[str] = None  # 用于本地测试
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class BedrockConfig:
     """Bedrock配置"""
     model_id: str = "anthropic.claude-3-5-sonnet-20241022-v2:0"
@@ -47,7 +176,7 @@ class BedrockConfig:
     temperature: float = 0.1
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ValidationConfig:
     """验证配置"""
     min_confidence_score: float = 0.7
@@ -57,7 +186,7 @@ class ValidationConfig:
     max_retries: int = 3
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class MonitoringConfig:
     """监控配置"""
     namespace: str = "EnhancedLineageAgent"
@@ -66,7 +195,7 @@ class MonitoringConfig:
     dashboard_name: str = "enhanced-lineage-agent"
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ErrorRecoveryConfig:
     """错误恢复配置"""
     max_retries: int = 3
@@ -75,7 +204,7 @@ class ErrorRecoveryConfig:
     enable_manual_intervention: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class LoggingConfig:
     """日志配置"""
     level: str = "INFO"
@@ -85,7 +214,7 @@ class LoggingConfig:
     backup_count: int = 5
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class S3Config:
     """S3配置"""
     lineage_bucket: str = "enhanced-lineage-agent-lineage-data"
@@ -93,7 +222,7 @@ class S3Config:
     prefix: str = "lineage"
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class EnhancedLineageConfig:
     """增强血缘配置"""
     aws: AWSConfig
@@ -107,15 +236,56 @@ class EnhancedLineageConfig:
     environment: Environment
 
 
+# 必需的配置段
+_REQUIRED_SECTIONS = ('aws', 'dynamodb', 'bedrock', 'validation', 'monitoring')
+
+# 必需的配置值: (配置段, 配置项, 错误提示名称)
+_REQUIRED_VALUES = (
+    ('aws', 'region', 'AWS region'),
+    ('dynamodb', 'job_mapping_table', 'DynamoDB job mapping table name'),
+    ('bedrock', 'model_id', 'Bedrock model ID')
+)
+
+# EnhancedLineageConfig中除environment外的各子配置名称
+_CONFIG_SECTIONS = (
+    'aws', 'dynamodb', 'bedrock', 'validation',
+    'monitoring', 'error_recovery', 'logging', 's3'
+)
+
+
+@lru_cache(maxsize=None)
+def _field_names(config_cls: type) -> Tuple[str, ...]:
+    """获取配置类声明的字段名称"""
+    return tuple(f.name for f in fields(config_cls))
+
+
+def _section_to_dict(section: Any) -> Dict[str, Any]:
+    """将子配置对象转换为字典"""
+    return {name: getattr(section, name) for name in _field_names(type(section))}
+
+
+@lru_cache(maxsize=None)
+def _field_set(config_cls: type) -> FrozenSet[str]:
+    """获取配置类声明的字段名称集合"""
+    return frozenset(_field_names(config_cls))
+
+
+def _build_section(config_cls: type, values: Dict[str, Any]) -> Any:
+    """根据字典创建子配置对象，忽略配置类未声明的键（兼容扩展的配置文件）"""
+    known_fields = _field_set(config_cls)
+    return config_cls(**{key: value for key, value in values.items() if key in known_fields})
+
+
+# 默认配置目录（项目根目录下的config）
+_CONFIG_DIR = Path(__file__).resolve().parent.parent / 'config'
+
+
 class ConfigManager:
     """配置管理器"""
     
     def __init__(self, environment: Optional[str] = None):
         self.environment = Environment(environment or os.getenv('ENVIRONMENT', 'dev'))
-        self.config_dir = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), 
-            'config'
-        )
+        self.config_dir = _CONFIG_DIR
         self._config: Optional[EnhancedLineageConfig] = None
         
         logger.info(f"Initialized config manager for environment: {self.environment.value}")
@@ -132,11 +302,12 @@ class ConfigManager:
             # 加载基础配置
             base_config = self._load_base_config()
             
-            # 加载环境特定配置
+            # 加载并合并环境特定配置（环境配置文件不存在时跳过合并）
             env_config = self._load_environment_config()
-            
-            # 合并配置
-            merged_config = self._merge_configs(base_config, env_config)
+            if env_config is None:
+                merged_config = base_config
+            else:
+                merged_config = self._merge_configs(base_config, env_config)
             
             # 应用环境变量覆盖
             final_config = self._apply_environment_overrides(merged_config)
@@ -155,139 +326,69 @@ class ConfigManager:
         base_config_path = os.path.join(self.config_dir, 'config.yaml')
         
         if os.path.exists(base_config_path):
-            with open(base_config_path, 'r') as f:
-                return yaml.safe_load(f) or {}
+            return _load_yaml_cached(base_config_path)
         else:
             logger.warning(f"Base config file not found: {base_config_path}")
             return self._get_default_config()
     
-    def _load_environment_config(self) -> Dict[str, Any]:
-        """加载环境特定配置"""
-        env_config_path = os.path.join(
-            self.config_dir, 
-            f'config-{self.environment.value}.yaml'
-        )
+    def _load_environment_config(self) -> Optional[Dict[str, Any]]:
+        """加载环境特定配置，配置文件不存在时返回None"""
+        env_config_path = os.path.join(self.config_dir, f'config-{self.environment.value}.yaml')
         
         if os.path.exists(env_config_path):
-            with open(env_config_path, 'r') as f:
-                return yaml.safe_load(f) or {}
+            return _load_yaml_cached(env_config_path)
         else:
             logger.info(f"Environment config file not found: {env_config_path}")
-            return {}
+            return None
     
     def _merge_configs(self, base: Dict[str, Any], env: Dict[str, Any]) -> Dict[str, Any]:
-        """合并配置"""
-        def deep_merge(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
-            result = dict1.copy()
-            for key, value in dict2.items():
-                if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                    result[key] = deep_merge(result[key], value)
-                else:
-                    result[key] = value
-            return result
+        """合并配置（base为本次加载新解析的字典，直接原地合并）"""
+        if not env:
+            return base
         
-        return deep_merge(base, env)
+        _deep_merge_inplace(base, env)
+        return base
     
     def _apply_environment_overrides(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """应用环境变量覆盖"""
-        # 环境变量映射
-        env_mappings = {
-            'AWS_REGION': ['aws', 'region'],
-            'AWS_PROFILE': ['aws', 'profile'],
-            'AWS_ACCOUNT_ID': ['aws', 'account_id'],
-            
-            'DYNAMODB_REGION': ['dynamodb', 'region'],
-            'DYNAMODB_JOB_MAPPING_TABLE': ['dynamodb', 'job_mapping_table'],
-            'DYNAMODB_CONTEXT_TABLE': ['dynamodb', 'context_table'],
-            'DYNAMODB_ENDPOINT_URL': ['dynamodb', 'endpoint_url'],
-            
-            'BEDROCK_MODEL_ID': ['bedrock', 'model_id'],
-            'BEDROCK_REGION': ['bedrock', 'region'],
-            'BEDROCK_MAX_TOKENS': ['bedrock', 'max_tokens'],
-            'BEDROCK_TEMPERATURE': ['bedrock', 'temperature'],
-            
-            'VALIDATION_MIN_CONFIDENCE_SCORE': ['validation', 'min_confidence_score'],
-            'VALIDATION_TIME_TOLERANCE_SECONDS': ['validation', 'time_tolerance_seconds'],
-            'VALIDATION_ENABLE_PARAMETER_VALIDATION': ['validation', 'enable_parameter_validation'],
-            'VALIDATION_ENABLE_ENVIRONMENT_VALIDATION': ['validation', 'enable_environment_validation'],
-            
-            'MONITORING_NAMESPACE': ['monitoring', 'namespace'],
-            'MONITORING_BATCH_SIZE': ['monitoring', 'batch_size'],
-            'MONITORING_ALERT_TOPIC_ARN': ['monitoring', 'alert_topic_arn'],
-            
-            'ERROR_RECOVERY_MAX_RETRIES': ['error_recovery', 'max_retries'],
-            'ERROR_RECOVERY_RETRY_DELAY_SECONDS': ['error_recovery', 'retry_delay_seconds'],
-            
-            'LOGGING_LEVEL': ['logging', 'level'],
-            'LOGGING_FILE_PATH': ['logging', 'file_path'],
-            
-            'S3_LINEAGE_BUCKET': ['s3', 'lineage_bucket'],
-            'S3_REGION': ['s3', 'region'],
-            'S3_PREFIX': ['s3', 'prefix']
-        }
-        
-        for env_var, config_path in env_mappings.items():
-            env_value = os.getenv(env_var)
-            if env_value is not None:
-                # 类型转换
-                if env_var.endswith('_SECONDS') or env_var.endswith('_RETRIES') or env_var.endswith('_SIZE') or env_var.endswith('_TOKENS'):
-                    env_value = int(env_value)
-                elif env_var.endswith('_SCORE') or env_var.endswith('_TEMPERATURE'):
-                    env_value = float(env_value)
-                elif env_var.endswith('_VALIDATION') or env_var.endswith('_FALLBACK') or env_var.endswith('_INTERVENTION'):
-                    env_value = env_value.lower() in ('true', '1', 'yes', 'on')
-                
-                # 设置配置值
-                current = config
-                for key in config_path[:-1]:
-                    if key not in current:
-                        current[key] = {}
-                    current = current[key]
-                current[config_path[-1]] = env_value
+        # 只遍历实际设置了的覆盖变量（通常一个都没有）
+        environ = os.environ
+        for env_var in _ENV_KEYS.intersection(environ):
+            config_path, convert = _ENV_OVERRIDE_TABLE[env_var]
+            _set_path(config, config_path, convert(environ[env_var]))
         
         return config
     
     def _validate_config(self, config: Dict[str, Any]):
         """验证配置"""
-        required_sections = ['aws', 'dynamodb', 'bedrock', 'validation', 'monitoring']
-        
-        for section in required_sections:
+        for section in _REQUIRED_SECTIONS:
             if section not in config:
                 raise ValueError(f"Missing required config section: {section}")
         
-        # 验证AWS区域
-        aws_region = config.get('aws', {}).get('region')
-        if not aws_region:
-            raise ValueError("AWS region is required")
-        
-        # 验证DynamoDB表名
-        job_mapping_table = config.get('dynamodb', {}).get('job_mapping_table')
-        if not job_mapping_table:
-            raise ValueError("DynamoDB job mapping table name is required")
-        
-        # 验证Bedrock模型ID
-        model_id = config.get('bedrock', {}).get('model_id')
-        if not model_id:
-            raise ValueError("Bedrock model ID is required")
+        # 验证AWS区域、DynamoDB表名、Bedrock模型ID
+        for section, key, label in _REQUIRED_VALUES:
+            if not config[section].get(key):
+                raise ValueError(f"{label} is required")
         
         logger.info("Configuration validation passed")
     
     def _dict_to_config(self, config_dict: Dict[str, Any]) -> EnhancedLineageConfig:
         """将字典转换为配置对象"""
         return EnhancedLineageConfig(
-            aws=AWSConfig(**config_dict.get('aws', {})),
-            dynamodb=DynamoDBConfig(**config_dict.get('dynamodb', {})),
-            bedrock=BedrockConfig(**config_dict.get('bedrock', {})),
-            validation=ValidationConfig(**config_dict.get('validation', {})),
-            monitoring=MonitoringConfig(**config_dict.get('monitoring', {})),
-            error_recovery=ErrorRecoveryConfig(**config_dict.get('error_recovery', {})),
-            logging=LoggingConfig(**config_dict.get('logging', {})),
-            s3=S3Config(**config_dict.get('s3', {})),
+            aws=_build_section(AWSConfig, config_dict.get('aws', {})),
+            dynamodb=_build_section(DynamoDBConfig, config_dict.get('dynamodb', {})),
+            bedrock=_build_section(BedrockConfig, config_dict.get('bedrock', {})),
+            validation=_build_section(ValidationConfig, config_dict.get('validation', {})),
+            monitoring=_build_section(MonitoringConfig, config_dict.get('monitoring', {})),
+            error_recovery=_build_section(ErrorRecoveryConfig, config_dict.get('error_recovery', {})),
+            logging=_build_section(LoggingConfig, config_dict.get('logging', {})),
+            s3=_build_section(S3Config, config_dict.get('s3', {})),
             environment=self.environment
         )
     
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
+        # 每次构建新字典：调用方会原地合并修改，构建字面量比缓存后深拷贝更快
         return {
             'aws': {
                 'region': 'us-east-1'
@@ -343,12 +444,18 @@ class ConfigManager:
         try:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
-            config_dict = asdict(config)
-            # 移除环境字段，因为它不需要保存
-            config_dict.pop('environment', None)
+            # 各子配置字段均为简单类型，直接浅层构建字典（环境字段不需要保存）
+            config_dict = {
+                section: _section_to_dict(getattr(config, section))
+                for section in _CONFIG_SECTIONS
+            }
             
-            with open(file_path, 'w') as f:
-                yaml.dump(config_dict, f, default_flow_style=False, indent=2)
+            # 二进制模式 + 较大缓冲区，由emitter直接输出UTF-8字节，减少write系统调用
+            with open(file_path, 'wb', buffering=_SAVE_BUFFER_SIZE) as f:
+                yaml.dump(
+                    config_dict, f, Dumper=_YamlDumper,
+                    default_flow_style=False, indent=2, encoding='utf-8'
+                )
             
             logger.info(f"Configuration saved to: {file_path}")
             
@@ -358,54 +465,51 @@ class ConfigManager:
     
     def export_config_as_env_vars(self, config: EnhancedLineageConfig) -> str:
         """导出配置为环境变量格式"""
-        env_vars = []
-        
-        # AWS配置
-        env_vars.append(f"export AWS_REGION={config.aws.region}")
-        if config.aws.profile:
-            env_vars.append(f"export AWS_PROFILE={config.aws.profile}")
-        if config.aws.account_id:
-            env_vars.append(f"export AWS_ACCOUNT_ID={config.aws.account_id}")
-        
-        # DynamoDB配置
-        env_vars.append(f"export DYNAMODB_REGION={config.dynamodb.region}")
-        env_vars.append(f"export DYNAMODB_JOB_MAPPING_TABLE={config.dynamodb.job_mapping_table}")
-        env_vars.append(f"export DYNAMODB_CONTEXT_TABLE={config.dynamodb.context_table}")
-        
-        # Bedrock配置
-        env_vars.append(f"export BEDROCK_MODEL_ID={config.bedrock.model_id}")
-        env_vars.append(f"export BEDROCK_REGION={config.bedrock.region}")
-        env_vars.append(f"export BEDROCK_MAX_TOKENS={config.bedrock.max_tokens}")
-        env_vars.append(f"export BEDROCK_TEMPERATURE={config.bedrock.temperature}")
-        
-        # 验证配置
-        env_vars.append(f"export VALIDATION_MIN_CONFIDENCE_SCORE={config.validation.min_confidence_score}")
-        env_vars.append(f"export VALIDATION_TIME_TOLERANCE_SECONDS={config.validation.time_tolerance_seconds}")
-        env_vars.append(f"export VALIDATION_ENABLE_PARAMETER_VALIDATION={config.validation.enable_parameter_validation}")
-        env_vars.append(f"export VALIDATION_ENABLE_ENVIRONMENT_VALIDATION={config.validation.enable_environment_validation}")
-        
-        # 监控配置
-        env_vars.append(f"export MONITORING_NAMESPACE={config.monitoring.namespace}")
-        env_vars.append(f"export MONITORING_BATCH_SIZE={config.monitoring.batch_size}")
-        if config.monitoring.alert_topic_arn:
-            env_vars.append(f"export MONITORING_ALERT_TOPIC_ARN={config.monitoring.alert_topic_arn}")
-        
-        # 错误恢复配置
-        env_vars.append(f"export ERROR_RECOVERY_MAX_RETRIES={config.error_recovery.max_retries}")
-        env_vars.append(f"export ERROR_RECOVERY_RETRY_DELAY_SECONDS={config.error_recovery.retry_delay_seconds}")
-        
-        # 日志配置
-        env_vars.append(f"export LOGGING_LEVEL={config.logging.level}")
-        if config.logging.file_path:
-            env_vars.append(f"export LOGGING_FILE_PATH={config.logging.file_path}")
-        
-        # S3配置
-        env_vars.append(f"export S3_LINEAGE_BUCKET={config.s3.lineage_bucket}")
-        env_vars.append(f"export S3_REGION={config.s3.region}")
-        env_vars.append(f"export S3_PREFIX={config.s3.prefix}")
-        
-        # 环境
-        env_vars.append(f"export ENVIRONMENT={config.environment.value}")
+        env_vars = (
+            # AWS配置
+            f"export AWS_REGION={config.aws.region}",
+            *((f"export AWS_PROFILE={config.aws.profile}",) if config.aws.profile else ()),
+            *((f"export AWS_ACCOUNT_ID={config.aws.account_id}",) if config.aws.account_id else ()),
+            
+            # DynamoDB配置
+            f"export DYNAMODB_REGION={config.dynamodb.region}",
+            f"export DYNAMODB_JOB_MAPPING_TABLE={config.dynamodb.job_mapping_table}",
+            f"export DYNAMODB_CONTEXT_TABLE={config.dynamodb.context_table}",
+            
+            # Bedrock配置
+            f"export BEDROCK_MODEL_ID={config.bedrock.model_id}",
+            f"export BEDROCK_REGION={config.bedrock.region}",
+            f"export BEDROCK_MAX_TOKENS={config.bedrock.max_tokens}",
+            f"export BEDROCK_TEMPERATURE={config.bedrock.temperature}",
+            
+            # 验证配置
+            f"export VALIDATION_MIN_CONFIDENCE_SCORE={config.validation.min_confidence_score}",
+            f"export VALIDATION_TIME_TOLERANCE_SECONDS={config.validation.time_tolerance_seconds}",
+            f"export VALIDATION_ENABLE_PARAMETER_VALIDATION={config.validation.enable_parameter_validation}",
+            f"export VALIDATION_ENABLE_ENVIRONMENT_VALIDATION={config.validation.enable_environment_validation}",
+            
+            # 监控配置
+            f"export MONITORING_NAMESPACE={config.monitoring.namespace}",
+            f"export MONITORING_BATCH_SIZE={config.monitoring.batch_size}",
+            *((f"export MONITORING_ALERT_TOPIC_ARN={config.monitoring.alert_topic_arn}",)
+              if config.monitoring.alert_topic_arn else ()),
+            
+            # 错误恢复配置
+            f"export ERROR_RECOVERY_MAX_RETRIES={config.error_recovery.max_retries}",
+            f"export ERROR_RECOVERY_RETRY_DELAY_SECONDS={config.error_recovery.retry_delay_seconds}",
+            
+            # 日志配置
+            f"export LOGGING_LEVEL={config.logging.level}",
+            *((f"export LOGGING_FILE_PATH={config.logging.file_path}",) if config.logging.file_path else ()),
+            
+            # S3配置
+            f"export S3_LINEAGE_BUCKET={config.s3.lineage_bucket}",
+            f"export S3_REGION={config.s3.region}",
+            f"export S3_PREFIX={config.s3.prefix}",
+            
+            # 环境
+            f"export ENVIRONMENT={config.environment.value}"
+        )
         
         return '\n'.join(env_vars)
     
@@ -425,23 +529,38 @@ class ConfigManager:
         }
 
 
-# 全局配置管理器实例
-_config_manager: Optional[ConfigManager] = None
+@lru_cache(maxsize=None)
+def _get_config_manager_cached(environment: str) -> ConfigManager:
+    """按环境缓存的配置管理器实例（lru_cache保证多线程下的安全访问）"""
+    return ConfigManager(environment)
 
 
 def get_config_manager(environment: Optional[str] = None) -> ConfigManager:
     """获取配置管理器实例"""
-    global _config_manager
-    
-    if _config_manager is None or (environment and _config_manager.environment.value != environment):
-        _config_manager = ConfigManager(environment)
-    
-    return _config_manager
+    return _get_config_manager_cached(environment or os.getenv('ENVIRONMENT', 'dev'))
+
+
+# 已构建的配置缓存（按环境），进程内共享
+_BUILT_CONFIGS: Dict[str, EnhancedLineageConfig] = {}
 
 
 def get_enhanced_config(environment: Optional[str] = None) -> EnhancedLineageConfig:
     """获取增强血缘配置"""
-    return get_config_manager(environment).load_config()
+    env_value = environment or os.getenv('ENVIRONMENT', 'dev')
+    
+    config = _BUILT_CONFIGS.get(env_value)
+    if config is None:
+        config = get_config_manager(env_value).load_config()
+        _BUILT_CONFIGS[env_value] = config
+    
+    return config
+
+
+def clear_config_cache():
+    """清除已构建的配置缓存（配置文件或环境变量变更后、以及测试中使用）"""
+    _BUILT_CONFIGS.clear()
+    _YAML_CACHE.clear()
+    _get_config_manager_cached.cache_clear()
 
 
 # 使用示例
@@ -463,7 +582,7 @@ if __name__ == "__main__":
     
     if args.action == 'show':
         summary = config_manager.get_config_summary(config)
-        print(json.dumps(summary, indent=2))
+        print(_json_dumps(summary))
     
     elif args.action == 'export':
         env_vars = config_manager.export_config_as_env_vars(config)
@@ -478,4 +597,4 @@ if __name__ == "__main__":
         print(f"Configuration for {args.environment} is valid")
         summary = config_manager.get_config_summary(config)
         print("Configuration summary:")
-        print(json.dumps(summary, indent=2))
\ No newline at end of file
+        print(_json_dumps(summary))
\ No newline at end of file
@@ -5,12 +5,21 @@
 
 import argparse
 import boto3
+import hashlib
 import json
+import mmap
+import random
 import time
 import os
 import sys
-from typing import Dict, Any, Optional
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -21,23 +30,183 @@ from utils.logging_config import get_logger
 
 logger = get_logger('deployment')
 
+# CloudFormation堆栈状态轮询参数：从2秒开始指数退避，最长30秒，总超时30分钟
+DEFAULT_POLL_DELAY_SECONDS = 2.0
+DEFAULT_POLL_MAX_DELAY_SECONDS = 30.0
+DEFAULT_POLL_TIMEOUT_SECONDS = 1800.0
+_POLL_JITTER_SECONDS = 1.0
+_THROTTLING_ERROR_CODES = frozenset({'Throttling', 'ThrottlingException'})
+
+# DescribeStacks结果的复用时间（秒）
+_STACK_CACHE_MAX_AGE_SECONDS = 2.0
+
+# 记录模板及参数摘要的堆栈标签，用于本地跳过无变化的更新
+_TEMPLATE_HASH_TAG = 'TemplateHash'
+
+# 堆栈事件通知的SQS长轮询等待时间（秒，SQS上限为20）
+_STACK_EVENTS_WAIT_SECONDS = 20
+
+# 等待堆栈事件通知的最长时间（秒），超过后改为轮询堆栈状态
+_STACK_NOTIFICATION_TIMEOUT_SECONDS = 300.0
+
+# 部署流程共用的客户端配置：较大的连接池供并行上传使用，自适应重试在客户端限流
+_CLIENT_CONFIG = BotocoreConfig(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    tcp_keepalive=True
+)
+
+# 代码包上传S3：超过8MB时分片并行上传
+_CODE_UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# 部署包压缩级别及写入缓冲区大小（级别1压缩率接近默认级别，CPU开销小得多）
+_ZIP_COMPRESS_LEVEL = 1
+_ZIP_BUFFER_SIZE = 1 << 20
+
+# Lambda处理函数源文件
+_LAMBDA_HANDLER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_handler.py')
+
+# 打包时跳过的目录及需要包含的文件后缀
+_PACKAGE_SKIP_DIRS = frozenset(('__pycache__', 'tests'))
+_PACKAGE_FILE_SUFFIXES = ('.py', '.yaml', '.json', '.txt')
+
+
+def _template_hash(template_body: str, parameters: list) -> str:
+    """计算模板和参数的SHA-256摘要"""
+    digest = hashlib.sha256(template_body.encode('utf-8'))
+    digest.update(json.dumps(parameters, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _parse_stack_notification(body: str) -> Dict[str, str]:
+    """
+    解析CloudFormation通过SNS发送的堆栈事件
+    
+    消息体为 Key='Value' 逐行格式；未开启原始消息传递时外层还包有一层SNS信封JSON。
+    """
+    try:
+        body = json.loads(body)['Message']
+    except (ValueError, KeyError, TypeError):
+        pass
+    
+    event = {}
+    for line in body.splitlines():
+        key, sep, value = line.partition('=')
+        if sep:
+            event[key.strip()] = value.strip().strip("'")
+    return event
+
+
+def _deflate_file(file_path: str) -> Tuple[bytes, int, int]:
+    """
+    读取并压缩单个文件（zlib压缩时释放GIL，可在线程池中并行执行）
+    
+    Returns:
+        Tuple[bytes, int, int]: (原始DEFLATE数据, CRC32, 原始大小)
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    compressor = zlib.compressobj(_ZIP_COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
+
+
+def _iter_package_files(directory: str, prefix_len: int) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """使用os.scandir递归扫描目录，生成需要打包的 (文件路径, 归档路径, 文件状态)"""
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # 跳过不需要的目录（不跟随目录符号链接，与os.walk一致）
+                name = entry.name
+                if name[:1] != '.' and name not in _PACKAGE_SKIP_DIRS and not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif entry.name.endswith(_PACKAGE_FILE_SUFFIXES):
+                yield entry.path, entry.path[prefix_len:], entry.stat()
+    
+    for subdir in subdirs:
+        yield from _iter_package_files(subdir, prefix_len)
+
+
+def _package_zipinfo(arc_path: str, file_stat: os.stat_result) -> zipfile.ZipInfo:
+    """根据扫描时获取的文件状态构建ZipInfo（等同ZipInfo.from_file，但不再重复stat）"""
+    zinfo = zipfile.ZipInfo(arc_path, time.localtime(file_stat.st_mtime)[:6])
+    zinfo.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+    return zinfo
+
+
+# _write_deflated_entry依赖的ZipFile内部属性（非公开接口，不同CPython版本可能变化）
+_ZIPFILE_RAW_WRITE_ATTRS = ('_lock', '_writing', '_writecheck', '_didModify', 'start_dir', 'fp')
+
+
+def _supports_raw_deflated_write(zipf: zipfile.ZipFile) -> bool:
+    """当前zipfile实现是否具备直接写入预压缩数据所需的内部属性"""
+    return all(hasattr(zipf, name) for name in _ZIPFILE_RAW_WRITE_ATTRS)
+
+
+def _write_deflated_entry(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo,
+                          compressed: bytes, crc: int, file_size: int):
+    """将已压缩好的数据作为DEFLATED条目写入ZIP（zipfile没有公开接口，参照ZipFile.open写入流程）"""
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = len(compressed)
+    
+    with zipf._lock:
+        if zipf._writing:
+            raise ValueError("Can't write to the ZIP file while another write handle is open")
+        # 已位于写入位置时不再seek，避免缓冲写入被提前刷新
+        if zipf.fp.tell() != zipf.start_dir:
+            zipf.fp.seek(zipf.start_dir)
+        zinfo.header_offset = zipf.fp.tell()
+        zipf._writecheck(zinfo)
+        zipf._didModify = True
+        
+        zipf.fp.write(zinfo.FileHeader())
+        zipf.fp.write(compressed)
+        zipf.start_dir = zipf.fp.tell()
+        
+        zipf.filelist.append(zinfo)
+        zipf.NameToInfo[zinfo.filename] = zinfo
+
 
 class DeploymentManager:
     """部署管理器"""
     
-    def __init__(self, environment: str, region: str, profile: Optional[str] = None):
+    def __init__(self, environment: str, region: str, profile: Optional[str] = None,
+                 poll_delay: float = DEFAULT_POLL_DELAY_SECONDS,
+                 poll_max_delay: float = DEFAULT_POLL_MAX_DELAY_SECONDS,
+                 poll_timeout: float = DEFAULT_POLL_TIMEOUT_SECONDS,
+                 notification_topic_arn: Optional[str] = None,
+                 stack_events_queue_url: Optional[str] = None):
         self.environment = environment
         self.region = region
         self.profile = profile
+        self.poll_delay = poll_delay
+        self.poll_max_delay = poll_max_delay
+        self.poll_timeout = poll_timeout
+        
+        # 堆栈事件通知：SNS主题（创建堆栈时设置）及订阅该主题的SQS队列
+        self.notification_topic_arn = notification_topic_arn
+        self.stack_events_queue_url = stack_events_queue_url
         
         # 初始化AWS会话
         session = boto3.Session(profile_name=profile, region_name=region)
-        self.cloudformation = session.client('cloudformation')
-        self.s3 = session.client('s3')
-        self.lambda_client = session.client('lambda')
+        self.cloudformation = session.client('cloudformation', config=_CLIENT_CONFIG)
+        self.s3 = session.client('s3', config=_CLIENT_CONFIG)
+        self.lambda_client = session.client('lambda', config=_CLIENT_CONFIG)
+        self.sqs = session.client('sqs', config=_CLIENT_CONFIG) if stack_events_queue_url else None
+        
+        # 最近一次DescribeStacks结果：(获取时间, 堆栈描述或None)
+        self._stack_cache: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
         
         # 配置
         self.stack_name = f"enhanced-lineage-agent-{environment}"
+        self.deployed_at = datetime.now().isoformat()
         self.template_path = os.path.join(
             os.path.dirname(__file__), 
             'cloudformation_template.yaml'
@@ -58,9 +227,10 @@ class DeploymentManager:
         try:
             logger.info(f"Starting infrastructure deployment for {self.stack_name}")
             
-            # 读取CloudFormation模板
-            with open(self.template_path, 'r') as f:
-                template_body = f.read()
+            # 读取CloudFormation模板（通过mmap直接解码，避免中间bytes副本）
+            with open(self.template_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as template_data:
+                template_body = str(template_data, 'utf-8')
             
             # 准备参数
             cf_parameters = [
@@ -96,12 +266,13 @@ class DeploymentManager:
             logger.error(f"Infrastructure deployment failed: {str(e)}")
             return False
     
-    def deploy_lambda_code(self, code_package_path: str) -> bool:
+    def deploy_lambda_code(self, code_package_path: str, code_bucket: Optional[str] = None) -> bool:
         """
         部署Lambda代码
         
         Args:
             code_package_path: 代码包路径
+            code_bucket: 代码包上传的S3存储桶；为空时直接内联上传ZIP
         
         Returns:
             bool: 部署是否成功
@@ -112,15 +283,7 @@ class DeploymentManager:
             # 获取Lambda函数名
             function_name = f"enhanced-lineage-agent-context-aware-agent-{self.environment}"
             
-            # 读取代码包
-            with open(code_package_path, 'rb') as f:
-                code_data = f.read()
-            
-            # 更新Lambda函数代码
-            response = self.lambda_client.update_function_code(
-                FunctionName=function_name,
-                ZipFile=code_data
-            )
+            response = self._update_function_code(function_name, code_package_path, code_bucket)
             
             logger.info(f"Lambda code updated successfully: {response['LastModified']}")
             return True
@@ -129,6 +292,30 @@ class DeploymentManager:
             logger.error(f"Lambda code deployment failed: {str(e)}")
             return False
     
+    def _update_function_code(self, function_name: str, code_package_path: str,
+                              code_bucket: Optional[str]) -> Dict[str, Any]:
+        """上传代码包并更新函数代码"""
+        if code_bucket:
+            # 通过S3流式上传代码包，避免整个ZIP读入内存
+            code_key = f"lambda/{function_name}/{os.path.basename(code_package_path)}"
+            self.s3.upload_file(
+                code_package_path, code_bucket, code_key,
+                Config=_CODE_UPLOAD_TRANSFER_CONFIG
+            )
+            return self.lambda_client.update_function_code(
+                FunctionName=function_name,
+                S3Bucket=code_bucket,
+                S3Key=code_key
+            )
+        
+        # 内联上传：使用mmap映射代码包，避免额外复制一份bytes
+        with open(code_package_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as code_data:
+            return self.lambda_client.update_function_code(
+                FunctionName=function_name,
+                ZipFile=code_data
+            )
+    
     def create_deployment_package(self) -> str:
         """
         创建部署包
@@ -137,7 +324,6 @@ class DeploymentManager:
             str: 部署包路径
         """
         try:
-            import zipfile
             import tempfile
             
             logger.info("Creating deployment package...")
@@ -147,108 +333,30 @@ class DeploymentManager:
             package_path = temp_file.name
             temp_file.close()
             
-            # 创建ZIP文件
-            with zipfile.ZipFile(package_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # 添加项目文件
-                project_dir = os.path.dirname(os.path.dirname(__file__))
+            # 创建ZIP文件（使用大缓冲区合并小块写入，减少write系统调用）
+            with open(package_path, 'wb', buffering=_ZIP_BUFFER_SIZE) as package_file, \
+                    zipfile.ZipFile(package_file, 'w', zipfile.ZIP_DEFLATED,
+                                    compresslevel=_ZIP_COMPRESS_LEVEL) as zipf:
+                # 收集项目文件
+                project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                package_files = list(_iter_package_files(project_dir, len(project_dir) + 1))
                 
-                for root, dirs, files in os.walk(project_dir):
-                    # 跳过不需要的目录
-                    dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'tests']]
-                    
-                    for file in files:
-                        if file.endswith(('.py', '.yaml', '.json', '.txt')):
-                            file_path = os.path.join(root, file)
-                            arc_path = os.path.relpath(file_path, project_dir)
-                            zipf.write(file_path, arc_path)
+                # Lambda处理函数以lambda_function.py的名称写入包根目录
+                package_files.append((_LAMBDA_HANDLER_PATH, 'lambda_function.py', os.stat(_LAMBDA_HANDLER_PATH)))
                 
-                # 添加Lambda处理函数
-                lambda_handler_code = '''
-import json
-import sys
-import os
-
-# 添加项目路径
-sys.path.insert(0, '/opt/python')
-sys.path.insert(0, os.path.dirname(__file__))
-
-from agents.context_aware_agent import ContextAwareAgent
-from utils.logging_config import get_logger
-
-logger = get_logger('lambda_handler')
-
-def lambda_handler(event, context):
-    """Lambda处理函数"""
-    try:
-        logger.info(f"Received event: {json.dumps(event)}")
-        
-        # 创建上下文感知代理
-        agent = ContextAwareAgent()
-        
-        # 处理不同类型的事件
-        action = event.get('action', 'health_check')
-        
-        if action == 'health_check':
-            return {
-                'statusCode': 200,
-                'body': json.dumps({
-                    'status': 'healthy',
-                    'timestamp': context.aws_request_id,
-                    'environment': os.environ.get('ENVIRONMENT', 'unknown')
-                })
-            }
-        elif action == 'monitoring_check':
-            # 执行监控检查
-            result = perform_monitoring_check()
-            return {
-                'statusCode': 200,
-                'body': json.dumps(result)
-            }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'error': f'Unknown action: {action}'
-                })
-            }
-            
-    except Exception as e:
-        logger.error(f"Lambda handler error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e),
-                'request_id': context.aws_request_id
-            })
-        }
-
-def perform_monitoring_check():
-    """执行监控检查"""
-    try:
-        from monitoring.simple_monitoring import SimpleMonitoring
-        
-        monitoring = SimpleMonitoring()
-        
-        # 记录健康检查指标
-        monitoring.record_metric('HealthCheck', 1.0)
-        
-        # 获取指标摘要
-        summary = monitoring.get_metrics_summary(1)
-        
-        return {
-            'status': 'monitoring_check_completed',
-            'metrics_summary': summary,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Monitoring check failed: {str(e)}")
-        return {
-            'status': 'monitoring_check_failed',
-            'error': str(e)
-        }
-'''
-                zipf.writestr('lambda_function.py', lambda_handler_code)
+                if _supports_raw_deflated_write(zipf):
+                    # 多线程并行压缩文件内容，按顺序写入ZIP
+                    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                        deflated = executor.map(_deflate_file, [path for path, _, _ in package_files])
+                        for (_, arc_path, file_stat), (compressed, crc, file_size) in zip(package_files, deflated):
+                            zinfo = _package_zipinfo(arc_path, file_stat)
+                            _write_deflated_entry(zipf, zinfo, compressed, crc, file_size)
+                else:
+                    # zipfile内部结构不兼容时通过公开接口逐个压缩写入
+                    for file_path, arc_path, file_stat in package_files:
+                        zinfo = _package_zipinfo(arc_path, file_stat)
+                        with open(file_path, 'rb') as f:
+                            zipf.writestr(zinfo, f.read(), zipfile.ZIP_DEFLATED, _ZIP_COMPRESS_LEVEL)
             
             logger.info(f"Deployment package created: {package_path}")
             return package_path
@@ -257,35 +365,62 @@ def perform_monitoring_check():
             logger.error(f"Failed to create deployment package: {str(e)}")
             raise
     
-    def validate_deployment(self) -> bool:
+    def validate_deployment(self, deep: bool = True) -> bool:
         """
         验证部署
         
+        堆栈状态检查与Lambda健康检查互不依赖，两者并发执行。
+        
+        Args:
+            deep: 同步调用Lambda并检查返回结果；为False时只异步投递健康检查事件，
+                不能发现处理函数执行失败
+        
         Returns:
             bool: 验证是否成功
         """
         try:
             logger.info("Validating deployment...")
             
-            # 检查堆栈状态
-            if not self._stack_exists():
-                logger.error("Stack does not exist")
-                return False
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                stack_check = executor.submit(self._check_stack_ready)
+                lambda_check = executor.submit(self._test_lambda_function, deep)
+                stack_ready = stack_check.result()
+                lambda_passed = lambda_check.result()
             
-            stack_status = self._get_stack_status()
-            if stack_status not in ['CREATE_COMPLETE', 'UPDATE_COMPLETE']:
-                logger.error(f"Stack is in invalid state: {stack_status}")
+            if not (stack_ready and lambda_passed):
                 return False
             
-            # 测试Lambda函数
-            function_name = f"enhanced-lineage-agent-context-aware-agent-{self.environment}"
+            logger.info("Deployment validation completed successfully")
+            return True
             
-            try:
-                test_event = {
-                    'action': 'health_check',
-                    'test': True
-                }
-                
+        except Exception as e:
+            logger.error(f"Deployment validation failed: {str(e)}")
+            return False
+    
+    def _check_stack_ready(self) -> bool:
+        """检查堆栈是否存在且处于完成状态"""
+        if not self._stack_exists():
+            logger.error("Stack does not exist")
+            return False
+        
+        stack_status = self._get_stack_status()
+        if stack_status not in ['CREATE_COMPLETE', 'UPDATE_COMPLETE']:
+            logger.error(f"Stack is in invalid state: {stack_status}")
+            return False
+        
+        return True
+    
+    def _test_lambda_function(self, deep: bool) -> bool:
+        """调用Lambda健康检查"""
+        function_name = f"enhanced-lineage-agent-context-aware-agent-{self.environment}"
+        
+        try:
+            test_event = {
+                'action': 'health_check',
+                'test': True
+            }
+            
+            if deep:
                 response = self.lambda_client.invoke(
                     FunctionName=function_name,
                     InvocationType='RequestResponse',
@@ -299,16 +434,24 @@ def perform_monitoring_check():
                 else:
                     logger.error(f"Lambda function test failed: {result}")
                     return False
-                    
-            except Exception as e:
-                logger.error(f"Lambda function test failed: {str(e)}")
-                return False
+            else:
+                # 异步调用只确认事件已被接受（202），不等待冷启动和执行完成
+                response = self.lambda_client.invoke(
+                    FunctionName=function_name,
+                    InvocationType='Event',
+                    Payload=json.dumps(test_event)
+                )
+                
+                if response.get('StatusCode') == 202:
+                    logger.info("Lambda function health check event accepted")
+                else:
+                    logger.error(f"Lambda function health check was not accepted: {response.get('StatusCode')}")
+                    return False
             
-            logger.info("Deployment validation completed successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Deployment validation failed: {str(e)}")
+            logger.error(f"Lambda function test failed: {str(e)}")
             return False
     
     def rollback_deployment(self) -> bool:
@@ -324,9 +467,14 @@ def perform_monitoring_check():
             # 取消堆栈更新（如果正在进行）
             try:
                 self.cloudformation.cancel_update_stack(StackName=self.stack_name)
+                self._invalidate_stack_cache()
                 logger.info("Stack update cancelled")
-            except:
-                pass
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == 'ValidationError':
+                    # 堆栈不在UPDATE_IN_PROGRESS状态，无需取消
+                    logger.info(f"No stack update to cancel: {str(e)}")
+                else:
+                    logger.warning(f"Failed to cancel stack update: {str(e)}")
             
             # 等待堆栈稳定
             self._wait_for_stack_operation()
@@ -348,15 +496,30 @@ def perform_monitoring_check():
         try:
             logger.info("Cleaning up deployment...")
             
+            # 堆栈已配置事件通知时，通过SQS长轮询等待删除完成，否则轮询堆栈状态
+            stack = self._describe_stack()
+            stack_id = None
+            if (stack is not None and self.sqs is not None
+                    and self.notification_topic_arn in stack.get('NotificationARNs', [])):
+                stack_id = stack['StackId']
+            
             # 删除堆栈
             self.cloudformation.delete_stack(StackName=self.stack_name)
+            self._invalidate_stack_cache()
             
-            # 等待删除完成
-            waiter = self.cloudformation.get_waiter('stack_delete_complete')
-            waiter.wait(
-                StackName=self.stack_name,
-                WaiterConfig={'Delay': 30, 'MaxAttempts': 60}
-            )
+            # 等待删除完成；通知丢失或队列未正确订阅时回退到轮询堆栈状态
+            final_status = None
+            if stack_id is not None:
+                final_status = self._wait_for_stack_notification(
+                    stack_id, ('DELETE_COMPLETE', 'DELETE_FAILED')
+                )
+                if final_status is None:
+                    logger.warning("No stack deletion notification received, polling stack status")
+            if final_status is None:
+                final_status = self._poll_stack(allow_missing=True)
+            if final_status != 'DELETE_COMPLETE':
+                logger.error(f"Stack deletion did not complete: {final_status}")
+                return False
             
             logger.info("Deployment cleanup completed")
             return True
@@ -365,37 +528,113 @@ def perform_monitoring_check():
             logger.error(f"Deployment cleanup failed: {str(e)}")
             return False
     
+    def _wait_for_stack_notification(self, stack_id: str, terminal_statuses: Tuple[str, ...]) -> Optional[str]:
+        """
+        长轮询SQS队列，等待堆栈进入终态的事件通知
+        
+        Args:
+            stack_id: 堆栈ID（区分同名的历史堆栈）
+            terminal_statuses: 视为结束的堆栈状态
+        
+        Returns:
+            Optional[str]: 最终堆栈状态，超时返回None
+        """
+        deadline = time.monotonic() + min(self.poll_timeout, _STACK_NOTIFICATION_TIMEOUT_SECONDS)
+        
+        while time.monotonic() < deadline:
+            response = self.sqs.receive_message(
+                QueueUrl=self.stack_events_queue_url,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=_STACK_EVENTS_WAIT_SECONDS
+            )
+            
+            final_status = None
+            processed = []
+            for message in response.get('Messages', []):
+                event = _parse_stack_notification(message['Body'])
+                if event.get('StackId') != stack_id:
+                    # 其他堆栈的事件留在队列中
+                    continue
+                
+                processed.append({'Id': str(len(processed)), 'ReceiptHandle': message['ReceiptHandle']})
+                # 只认堆栈自身的状态事件；嵌套堆栈作为资源的状态事件LogicalResourceId不同
+                if (event.get('ResourceType') == 'AWS::CloudFormation::Stack'
+                        and event.get('LogicalResourceId') == self.stack_name
+                        and event.get('ResourceStatus') in terminal_statuses):
+                    final_status = event['ResourceStatus']
+            
+            if processed:
+                self.sqs.delete_message_batch(QueueUrl=self.stack_events_queue_url, Entries=processed)
+            if final_status is not None:
+                return final_status
+        
+        return None
+    
+    def _describe_stack(self, max_age: float = _STACK_CACHE_MAX_AGE_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        获取堆栈描述，max_age秒内复用上次DescribeStacks结果
+        
+        Returns:
+            Optional[Dict[str, Any]]: 堆栈描述，堆栈不存在时返回None
+        """
+        now = time.monotonic()
+        if self._stack_cache is not None and now - self._stack_cache[0] < max_age:
+            return self._stack_cache[1]
+        
+        try:
+            stack = self.cloudformation.describe_stacks(StackName=self.stack_name)['Stacks'][0]
+        except ClientError as e:
+            if 'does not exist' not in str(e):
+                raise
+            stack = None
+        
+        self._stack_cache = (now, stack)
+        return stack
+    
+    def _invalidate_stack_cache(self):
+        """堆栈变更后丢弃缓存的DescribeStacks结果"""
+        self._stack_cache = None
+    
     def _stack_exists(self) -> bool:
         """检查堆栈是否存在"""
         try:
-            self.cloudformation.describe_stacks(StackName=self.stack_name)
-            return True
-        except self.cloudformation.exceptions.ClientError:
+            return self._describe_stack() is not None
+        except ClientError:
             return False
     
     def _get_stack_status(self) -> str:
         """获取堆栈状态"""
         try:
-            response = self.cloudformation.describe_stacks(StackName=self.stack_name)
-            return response['Stacks'][0]['StackStatus']
-        except:
+            stack = self._describe_stack()
+            return stack['StackStatus'] if stack is not None else 'UNKNOWN'
+        except ClientError as e:
+            logger.warning(f"Failed to get stack status: {str(e)}")
             return 'UNKNOWN'
     
     def _create_stack(self, template_body: str, parameters: list) -> bool:
         """创建堆栈"""
         try:
+            # 配置了通知主题时让CloudFormation推送堆栈事件
+            notification_kwargs = (
+                {'NotificationARNs': [self.notification_topic_arn]}
+                if self.notification_topic_arn else {}
+            )
+            
             self.cloudformation.create_stack(
                 StackName=self.stack_name,
                 TemplateBody=template_body,
                 Parameters=parameters,
                 Capabilities=['CAPABILITY_NAMED_IAM'],
+                **notification_kwargs,
                 Tags=[
                     {'Key': 'Environment', 'Value': self.environment},
                     {'Key': 'Project', 'Value': 'enhanced-lineage-agent'},
                     {'Key': 'DeployedBy', 'Value': 'deployment-script'},
-                    {'Key': 'DeployedAt', 'Value': datetime.now().isoformat()}
+                    {'Key': 'DeployedAt', 'Value': self.deployed_at},
+                    {'Key': _TEMPLATE_HASH_TAG, 'Value': _template_hash(template_body, parameters)}
                 ]
             )
+            self._invalidate_stack_cache()
             return True
         except Exception as e:
             logger.error(f"Failed to create stack: {str(e)}")
@@ -404,12 +643,24 @@ def perform_monitoring_check():
     def _update_stack(self, template_body: str, parameters: list) -> bool:
         """更新堆栈"""
         try:
+            # 模板和参数与上次部署相同时直接跳过，省去一次UpdateStack往返
+            template_hash = _template_hash(template_body, parameters)
+            stack = self._describe_stack()
+            tags = {tag['Key']: tag['Value'] for tag in stack.get('Tags', [])} if stack else {}
+            if tags.get(_TEMPLATE_HASH_TAG) == template_hash:
+                logger.info("Template and parameters unchanged, skipping stack update")
+                return True
+            
+            # UpdateStack传入的Tags会整体替换原有标签，需保留已有标签
+            tags[_TEMPLATE_HASH_TAG] = template_hash
             self.cloudformation.update_stack(
                 StackName=self.stack_name,
                 TemplateBody=template_body,
                 Parameters=parameters,
-                Capabilities=['CAPABILITY_NAMED_IAM']
+                Capabilities=['CAPABILITY_NAMED_IAM'],
+                Tags=[{'Key': key, 'Value': value} for key, value in tags.items()]
             )
+            self._invalidate_stack_cache()
             return True
         except self.cloudformation.exceptions.ClientError as e:
             if 'No updates are to be performed' in str(e):
@@ -427,23 +678,11 @@ def perform_monitoring_check():
         try:
             logger.info("Waiting for stack operation to complete...")
             
-            # 确定等待器类型
-            status = self._get_stack_status()
-            
-            if 'CREATE' in status:
-                waiter = self.cloudformation.get_waiter('stack_create_complete')
-            elif 'UPDATE' in status:
-                waiter = self.cloudformation.get_waiter('stack_update_complete')
-            else:
-                logger.warning(f"Unknown stack status: {status}")
+            final_status = self._poll_stack()
+            if final_status is None:
+                logger.error("Timed out waiting for stack operation")
                 return False
             
-            waiter.wait(
-                StackName=self.stack_name,
-                WaiterConfig={'Delay': 30, 'MaxAttempts': 60}
-            )
-            
-            final_status = self._get_stack_status()
             logger.info(f"Stack operation completed with status: {final_status}")
             
             return final_status in ['CREATE_COMPLETE', 'UPDATE_COMPLETE']
@@ -452,11 +691,59 @@ def perform_monitoring_check():
             logger.error(f"Stack operation failed: {str(e)}")
             return False
     
+    def _poll_stack(self, allow_missing: bool = False) -> Optional[str]:
+        """
+        轮询堆栈状态直到离开 *_IN_PROGRESS 状态
+        
+        状态变化时恢复快速轮询，状态不变时指数退避（带随机抖动）；
+        DescribeStacks被限流时加倍等待时间。
+        
+        Args:
+            allow_missing: 堆栈不存在时视为删除完成
+        
+        Returns:
+            Optional[str]: 最终堆栈状态，超时返回None
+        """
+        deadline = time.monotonic() + self.poll_timeout
+        delay = self.poll_delay
+        last_status = None
+        
+        while True:
+            try:
+                # 每次轮询都重新获取，结果同时刷新缓存供后续调用复用
+                stack = self._describe_stack(max_age=0)
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code')
+                if error_code not in _THROTTLING_ERROR_CODES:
+                    raise
+                logger.warning("DescribeStacks throttled, backing off")
+                delay = min(self.poll_max_delay, delay * 2)
+            else:
+                if stack is None:
+                    if allow_missing:
+                        return 'DELETE_COMPLETE'
+                    raise RuntimeError(f"Stack {self.stack_name} does not exist")
+                
+                status = stack['StackStatus']
+                if not status.endswith('_IN_PROGRESS'):
+                    return status
+                if status != last_status:
+                    # 状态刚发生变化，恢复快速轮询
+                    last_status = status
+                    delay = self.poll_delay
+                else:
+                    delay = min(self.poll_max_delay, delay * 2)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(remaining, delay + random.uniform(0, _POLL_JITTER_SECONDS)))
+    
     def _print_stack_outputs(self):
         """打印堆栈输出"""
         try:
-            response = self.cloudformation.describe_stacks(StackName=self.stack_name)
-            outputs = response['Stacks'][0].get('Outputs', [])
+            stack = self._describe_stack()
+            outputs = stack.get('Outputs', []) if stack is not None else []
             
             if outputs:
                 logger.info("Stack Outputs:")
@@ -481,9 +768,24 @@ def main():
                        help='Email address for alerts')
     parser.add_argument('--action', choices=['deploy', 'validate', 'rollback', 'cleanup'],
                        default='deploy', help='Action to perform')
+    parser.add_argument('--async-validate', action='store_true',
+                       help='With --action validate, only check that the Lambda health check event '
+                            'is accepted instead of verifying its response')
+    parser.add_argument('--code-bucket',
+                       help='S3 bucket for uploading the Lambda deployment package')
     parser.add_argument('--bedrock-model-id', 
                        default='anthropic.claude-3-5-sonnet-20241022-v2:0',
                        help='Bedrock model ID')
+    parser.add_argument('--poll-delay', type=float, default=DEFAULT_POLL_DELAY_SECONDS,
+                       help='Initial seconds between CloudFormation status polls')
+    parser.add_argument('--poll-max-delay', type=float, default=DEFAULT_POLL_MAX_DELAY_SECONDS,
+                       help='Maximum seconds between CloudFormation status polls')
+    parser.add_argument('--poll-timeout', type=float, default=DEFAULT_POLL_TIMEOUT_SECONDS,
+                       help='Seconds to wait for a CloudFormation stack operation')
+    parser.add_argument('--notification-topic-arn',
+                       help='SNS topic that receives CloudFormation stack events')
+    parser.add_argument('--stack-events-queue-url',
+                       help='SQS queue subscribed to the notification topic, used to wait for stack deletion')
     
     args = parser.parse_args()
     
@@ -491,7 +793,12 @@ def main():
     deployment_manager = DeploymentManager(
         environment=args.environment,
         region=args.region,
-        profile=args.profile
+        profile=args.profile,
+        poll_delay=args.poll_delay,
+        poll_max_delay=args.poll_max_delay,
+        poll_timeout=args.poll_timeout,
+        notification_topic_arn=args.notification_topic_arn,
+        stack_events_queue_url=args.stack_events_queue_url
     )
     
     success = False
@@ -516,18 +823,18 @@ def main():
                 package_path = deployment_manager.create_deployment_package()
                 
                 logger.info("Deploying Lambda code...")
-                success = deployment_manager.deploy_lambda_code(package_path)
+                success = deployment_manager.deploy_lambda_code(package_path, args.code_bucket)
                 
                 # 清理临时文件
                 os.unlink(package_path)
                 
                 if success:
-                    # 验证部署
+                    # 验证部署（部署后始终同步调用，确认新代码能正常执行）
                     logger.info("Validating deployment...")
                     success = deployment_manager.validate_deployment()
         
         elif args.action == 'validate':
-            success = deployment_manager.validate_deployment()
+            success = deployment_manager.validate_deployment(deep=not args.async_validate)
         
         elif args.action == 'rollback':
             success = deployment_manager.rollback_deployment()
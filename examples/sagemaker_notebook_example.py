@@ -5,25 +5,149 @@ SageMaker Notebook血缘管理示例
 演示在SageMaker Notebook环境中如何使用Enhanced Lineage Agent。
 """
 
+import io
 import sys
 import os
 import logging
+from collections import defaultdict
 from datetime import datetime
-import json
 
 # 添加项目路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from agents.context_aware_agent import ContextAwareAgent
-from utils.config_manager import ConfigManager
-from models.execution_context import EnvironmentType
-
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# 血缘实体中重复出现的命名空间
+_S3_NAMESPACE = sys.intern('s3')
+_REDSHIFT_NAMESPACE = sys.intern('redshift')
+
+# 模拟的多源血缘事件，统一为扁平结构：(来源, 操作类型, 输入, 输出, 附加信息)
+# 附加信息：SageMaker为单元格ID，Glue为作业名，Redshift为SQL；操作类型仅SageMaker使用
+_SIMULATED_EVENTS = (
+    ('sagemaker', 'data_read',
+     ('s3://ml-data-bucket/raw/customer_data.csv',),
+     (),
+     'cell_001'),
+    ('sagemaker', 'feature_engineering',
+     ('customer_data.csv',),
+     ('s3://ml-data-bucket/features/customer_features.parquet',),
+     'cell_002'),
+    ('sagemaker', 'model_training',
+     ('s3://ml-data-bucket/features/customer_features.parquet',),
+     ('s3://ml-models-bucket/customer_churn_model/',),
+     'cell_003'),
+    ('glue', None,
+     ('s3://ml-models-bucket/customer_churn_model/',),
+     ('analytics.customer_predictions',),
+     'model-deployment-job'),
+    ('redshift', None,
+     ('analytics.customer_predictions',),
+     ('reports.customer_churn_report',),
+     '''INSERT INTO reports.customer_churn_report 
+                             SELECT customer_id, prediction_score, risk_level 
+                             FROM analytics.customer_predictions 
+                             WHERE prediction_score > 0.7'''),
+)
+
+def _namespaced(name):
+    """为Glue血缘实体补充命名空间"""
+    return {
+        'name': name,
+        'namespace': _S3_NAMESPACE if name.startswith('s3://') else _REDSHIFT_NAMESPACE
+    }
+
+def _build_lineage_sources(context, context_id, now_iso):
+    """一次遍历扁平事件表，生成各来源的血缘数据"""
+    operations = []
+    glue_events = []
+    queries = []
+    
+    for source, operation_type, inputs, outputs, detail in _SIMULATED_EVENTS:
+        if source == 'sagemaker':
+            operations.append({
+                'operation_type': operation_type,
+                'inputs': list(inputs),
+                'outputs': list(outputs),
+                'cell_id': detail,
+                'timestamp': now_iso
+            })
+        elif source == 'glue':
+            glue_events.append({
+                'inputs': [_namespaced(name) for name in inputs],
+                'outputs': [_namespaced(name) for name in outputs],
+                'job': {'name': detail}
+            })
+        else:
+            queries.append({
+                'input_tables': list(inputs),
+                'output_tables': list(outputs),
+                'sql': detail
+            })
+    
+    return {
+        # 模拟SageMaker Notebook的数据操作
+        'sagemaker': {
+            'context_id': context_id,
+            'extraction_timestamp': now_iso,
+            'notebook_instance': context.notebook_instance,
+            'sagemaker_role': context.sagemaker_role,
+            'operations': operations,
+            'metadata': {
+                'execution_context': {
+                    'context_id': context_id
+                }
+            }
+        },
+        # 模拟触发的Glue ETL作业血缘
+        'glue': {
+            'context_id': context_id,
+            'extraction_timestamp': now_iso,
+            'events': glue_events,
+            'metadata': {
+                'execution_context': {
+                    'context_id': context_id
+                },
+                'triggered_by': 'sagemaker_notebook'
+            }
+        },
+        # 模拟Redshift数据处理血缘
+        'redshift': {
+            'context_id': context_id,
+            'extraction_timestamp': now_iso,
+            'queries': queries
+        }
+    }
+
+def _entity_name(entity):
+    """血缘事件中的实体可能是名称字符串，也可能是带name字段的字典"""
+    return entity.get('name') if isinstance(entity, dict) else entity
+
+def _index_events(events):
+    """
+    一次遍历血缘事件，同时建立 输入->下游输出、输出->上游输入 索引并统计事件数
+    
+    Returns:
+        (inputs_to_outputs, outputs_to_inputs, event_count)
+    """
+    inputs_to_outputs = defaultdict(set)
+    outputs_to_inputs = defaultdict(set)
+    event_count = 0
+    
+    for event in events:
+        event_count += 1
+        event_inputs = [_entity_name(entity) for entity in event.get('inputs', ())]
+        event_outputs = [_entity_name(entity) for entity in event.get('outputs', ())]
+        for name in event_inputs:
+            inputs_to_outputs[name].update(event_outputs)
+        for name in event_outputs:
+            outputs_to_inputs[name].update(event_inputs)
+    
+    return inputs_to_outputs, outputs_to_inputs, event_count
+
 def simulate_sagemaker_environment():
     """模拟SageMaker环境变量"""
     os.environ['SM_CURRENT_INSTANCE_TYPE'] = 'ml.t3.medium'
@@ -35,7 +159,15 @@ def main():
     logger = logging.getLogger(__name__)
     logger.info("Starting SageMaker Notebook lineage example")
     
+    # 报告输出先写入缓冲区，结束时一次写出，避免Notebook内核逐行转发输出
+    buf = io.StringIO()
+    emit = buf.write
+    
     try:
+        # 延迟导入代理及配置模块，导入本示例（如生成文档）时不加载其依赖
+        from agents.context_aware_agent import ContextAwareAgent
+        from utils.config_manager import ConfigManager
+        
         # 模拟SageMaker环境
         simulate_sagemaker_environment()
         
@@ -47,49 +179,113 @@ def main():
         logger.info("Identifying SageMaker execution context...")
         context = agent.identify_execution_context()
         
-        print(f"\n=== SageMaker Execution Context ===")
-        print(f"Context ID: {context.context_id}")
-        print(f"Environment Type: {context.environment_type.value}")
-        print(f"Is SageMaker Environment: {context.is_sagemaker_environment()}")
-        print(f"Notebook Instance: {context.notebook_instance}")
-        print(f"SageMaker Role: {context.sagemaker_role}")
-        print(f"Working Directory: {context.working_directory}")
+        emit(f"\n=== SageMaker Execution Context ===\n")
+        emit(f"Context ID: {context.context_id}\n")
+        emit(f"Environment Type: {context.environment_type.value}\n")
+        emit(f"Is SageMaker Environment: {context.is_sagemaker_environment()}\n")
+        emit(f"Notebook Instance: {context.notebook_instance}\n")
+        emit(f"SageMaker Role: {context.sagemaker_role}\n")
+        emit(f"Working Directory: {context.working_directory}\n")
         
         # 3. 模拟数据科学工作流的血缘数据
         logger.info("Simulating data science workflow lineage...")
         
-        # 模拟SageMaker Notebook的数据操作
-        sagemaker_lineage = {
-            'context_id': context.context_id,
-            'extraction_timestamp': datetime.now().isoformat(),
-            'notebook_instance': context.notebook_instance,
-            'sagemaker_role': context.sagemaker_role,
-            'operations': [
-                {
-                    'operation_type': 'data_read',
-                    'inputs': ['s3://ml-data-bucket/raw/customer_data.csv'],
-                    'outputs': [],
-                    'cell_id': 'cell_001',
-                    'timestamp': datetime.now().isoformat()
-                },
-                {
-                    'operation_type': 'feature_engineering',
-                    'inputs': ['customer_data.csv'],
-                    'outputs': ['s3://ml-data-bucket/features/customer_features.parquet'],
-                    'cell_id': 'cell_002',
-                    'timestamp': datetime.now().isoformat()
-                },
-                {
-                    'operation_type': 'model_training',
-                    'inputs': ['s3://ml-data-bucket/features/customer_features.parquet'],
-                    'outputs': ['s3://ml-models-bucket/customer_churn_model/'],
-                    'cell_id': 'cell_003',
-                    'timestamp': datetime.now().isoformat()
-                }
-            ],
-            'metadata': {
-                'execution_context': {
-                    'context_id': context.context_id
-                }
-            }
-        }\n        \n        # 模拟触发的Glue ETL作业血缘\n        glue_lineage = {\n            'context_id': context.context_id,\n            'extraction_timestamp': datetime.now().isoformat(),\n            'events': [\n                {\n                    'inputs': [{\n                        'name': 's3://ml-models-bucket/customer_churn_model/',\n                        'namespace': 's3'\n                    }],\n                    'outputs': [{\n                        'name': 'analytics.customer_predictions',\n                        'namespace': 'redshift'\n                    }],\n                    'job': {'name': 'model-deployment-job'}\n                }\n            ],\n            'metadata': {\n                'execution_context': {\n                    'context_id': context.context_id\n                },\n                'triggered_by': 'sagemaker_notebook'\n            }\n        }\n        \n        # 模拟Redshift数据处理血缘\n        redshift_lineage = {\n            'context_id': context.context_id,\n            'extraction_timestamp': datetime.now().isoformat(),\n            'queries': [\n                {\n                    'input_tables': ['analytics.customer_predictions'],\n                    'output_tables': ['reports.customer_churn_report'],\n                    'sql': '''INSERT INTO reports.customer_churn_report \n                             SELECT customer_id, prediction_score, risk_level \n                             FROM analytics.customer_predictions \n                             WHERE prediction_score > 0.7'''\n                }\n            ]\n        }\n        \n        # 4. 合并多源血缘数据\n        logger.info(\"Merging multi-source lineage data...\")\n        \n        lineage_sources = {\n            'sagemaker': sagemaker_lineage,\n            'glue': glue_lineage,\n            'redshift': redshift_lineage\n        }\n        \n        merge_result = agent.merge_lineage_data(lineage_sources, context)\n        \n        print(f\"\\n=== Multi-Source Lineage Merge Result ===\")\n        print(f\"Success: {merge_result['success']}\")\n        print(f\"Sources Processed: {merge_result.get('sources_processed', [])}\")\n        print(f\"Correlation Status: {merge_result.get('correlation_status', 'unknown')}\")\n        \n        if merge_result['success']:\n            merged_lineage = merge_result['merged_lineage']\n            print(f\"\\n=== End-to-End Lineage Summary ===\")\n            print(f\"Total Events: {len(merged_lineage.get('lineage_events', []))}\")\n            print(f\"Data Entities: {len(merged_lineage.get('data_entities', []))}\")\n            \n            # 显示数据流路径\n            lineage_graph = merged_lineage.get('lineage_graph', {})\n            print(f\"Graph Nodes: {lineage_graph.get('node_count', 0)}\")\n            print(f\"Graph Edges: {lineage_graph.get('edge_count', 0)}\")\n            \n            # 显示数据实体\n            print(f\"\\n=== Data Entities ===\")\n            for entity in merged_lineage.get('data_entities', [])[:5]:  # 显示前5个\n                print(f\"  - {entity}\")\n            \n            # 显示血缘事件\n            print(f\"\\n=== Lineage Events ===\")\n            for i, event in enumerate(merged_lineage.get('lineage_events', [])[:3]):  # 显示前3个\n                print(f\"  Event {i+1}:\")\n                print(f\"    Source: {event.get('source', 'unknown')}\")\n                print(f\"    Type: {event.get('event_type', 'unknown')}\")\n                print(f\"    Inputs: {event.get('inputs', [])}\")\n                print(f\"    Outputs: {event.get('outputs', [])}\")\n        else:\n            print(f\"Error: {merge_result.get('error', 'Unknown error')}\")\n        \n        # 5. 演示血缘查询功能\n        logger.info(\"Demonstrating lineage query capabilities...\")\n        \n        if merge_result['success']:\n            # 模拟血缘查询\n            print(f\"\\n=== Lineage Query Example ===\")\n            \n            # 查询特定数据源的下游影响\n            data_source = \"s3://ml-data-bucket/raw/customer_data.csv\"\n            print(f\"Querying downstream impact of: {data_source}\")\n            \n            # 这里可以实现实际的查询逻辑\n            downstream_entities = []\n            for event in merged_lineage.get('lineage_events', []):\n                if data_source in event.get('inputs', []):\n                    downstream_entities.extend(event.get('outputs', []))\n            \n            print(f\"Downstream entities: {list(set(downstream_entities))}\")\n            \n            # 查询特定输出的上游依赖\n            data_target = \"reports.customer_churn_report\"\n            print(f\"\\nQuerying upstream dependencies of: {data_target}\")\n            \n            upstream_entities = []\n            for event in merged_lineage.get('lineage_events', []):\n                if data_target in event.get('outputs', []):\n                    upstream_entities.extend(event.get('inputs', []))\n            \n            print(f\"Upstream entities: {list(set(upstream_entities))}\")\n        \n        # 6. 显示验证详情\n        validation_result = merge_result.get('validation_result', {})\n        if validation_result:\n            print(f\"\\n=== Validation Details ===\")\n            print(f\"Overall Valid: {validation_result.get('is_valid', False)}\")\n            print(f\"Confidence Score: {validation_result.get('confidence_score', 0.0):.3f}\")\n            print(f\"Context Match: {validation_result.get('context_match', False)}\")\n            print(f\"Data Consistency: {validation_result.get('data_consistency', False)}\")\n            print(f\"Temporal Alignment: {validation_result.get('temporal_alignment', False)}\")\n            \n            # 显示建议\n            suggested_actions = validation_result.get('suggested_actions', [])\n            if suggested_actions:\n                print(f\"\\nSuggested Actions:\")\n                for action in suggested_actions[:3]:\n                    print(f\"  - {action.get('action', 'Unknown action')} (Priority: {action.get('priority', 'unknown')})\")\n        \n        logger.info(\"SageMaker Notebook lineage example completed successfully\")\n        \n    except Exception as e:\n        logger.error(f\"SageMaker example execution failed: {e}\")\n        print(f\"\\nError: {e}\")\n        return 1\n    \n    return 0\n\n\nif __name__ == \"__main__\":\n    exit_code = main()\n    sys.exit(exit_code)
\ No newline at end of file
+        # 同一批模拟数据共用一个时间戳；上下文ID在各来源中大量重复，驻留后共享同一字符串对象
+        now_iso = datetime.now().isoformat()
+        context_id = sys.intern(context.context_id)
+        
+        # 各来源的血缘数据由同一张扁平事件表一次生成
+        lineage_sources = _build_lineage_sources(context, context_id, now_iso)
+        
+        # 4. 合并多源血缘数据
+        logger.info("Merging multi-source lineage data...")
+        
+        merge_result = agent.merge_lineage_data(lineage_sources, context)
+        
+        emit(f"\n=== Multi-Source Lineage Merge Result ===\n")
+        emit(f"Success: {merge_result['success']}\n")
+        emit(f"Sources Processed: {merge_result.get('sources_processed', [])}\n")
+        emit(f"Correlation Status: {merge_result.get('correlation_status', 'unknown')}\n")
+        
+        if merge_result['success']:
+            merged_lineage = merge_result['merged_lineage']
+            
+            # 一次遍历建立查询索引并统计事件数
+            inputs_to_outputs, outputs_to_inputs, event_count = _index_events(
+                merged_lineage.get('lineage_events', [])
+            )
+            
+            emit(f"\n=== End-to-End Lineage Summary ===\n")
+            emit(f"Total Events: {event_count}\n")
+            emit(f"Data Entities: {len(merged_lineage.get('data_entities', []))}\n")
+            
+            # 显示数据流路径
+            lineage_graph = merged_lineage.get('lineage_graph', {})
+            emit(f"Graph Nodes: {lineage_graph.get('node_count', 0)}\n")
+            emit(f"Graph Edges: {lineage_graph.get('edge_count', 0)}\n")
+            
+            # 显示数据实体
+            emit(f"\n=== Data Entities ===\n")
+            for entity in merged_lineage.get('data_entities', [])[:5]:  # 显示前5个
+                emit(f"  - {entity}\n")
+            
+            # 显示血缘事件
+            emit(f"\n=== Lineage Events ===\n")
+            for i, event in enumerate(merged_lineage.get('lineage_events', [])[:3]):  # 显示前3个
+                emit(f"  Event {i+1}:\n")
+                emit(f"    Source: {event.get('source', 'unknown')}\n")
+                emit(f"    Type: {event.get('event_type', 'unknown')}\n")
+                emit(f"    Inputs: {event.get('inputs', [])}\n")
+                emit(f"    Outputs: {event.get('outputs', [])}\n")
+        else:
+            emit(f"Error: {merge_result.get('error', 'Unknown error')}\n")
+        
+        # 5. 演示血缘查询功能
+        logger.info("Demonstrating lineage query capabilities...")
+        
+        if merge_result['success']:
+            # 模拟血缘查询
+            emit(f"\n=== Lineage Query Example ===\n")
+            
+            # 查询特定数据源的下游影响
+            data_source = "s3://ml-data-bucket/raw/customer_data.csv"
+            emit(f"Querying downstream impact of: {data_source}\n")
+            emit(f"Downstream entities: {sorted(inputs_to_outputs.get(data_source, ()))}\n")
+            
+            # 查询特定输出的上游依赖
+            data_target = "reports.customer_churn_report"
+            emit(f"\nQuerying upstream dependencies of: {data_target}\n")
+            emit(f"Upstream entities: {sorted(outputs_to_inputs.get(data_target, ()))}\n")
+        
+        # 6. 显示验证详情
+        validation_result = merge_result.get('validation_result', {})
+        if validation_result:
+            emit(f"\n=== Validation Details ===\n")
+            emit(f"Overall Valid: {validation_result.get('is_valid', False)}\n")
+            emit(f"Confidence Score: {validation_result.get('confidence_score', 0.0):.3f}\n")
+            emit(f"Context Match: {validation_result.get('context_match', False)}\n")
+            emit(f"Data Consistency: {validation_result.get('data_consistency', False)}\n")
+            emit(f"Temporal Alignment: {validation_result.get('temporal_alignment', False)}\n")
+            
+            # 显示建议
+            suggested_actions = validation_result.get('suggested_actions', [])
+            if suggested_actions:
+                emit(f"\nSuggested Actions:\n")
+                for action in suggested_actions[:3]:
+                    emit(f"  - {action.get('action', 'Unknown action')} (Priority: {action.get('priority', 'unknown')})\n")
+        
+        logger.info("SageMaker Notebook lineage example completed successfully")
+        
+    except Exception as e:
+        logger.error(f"SageMaker example execution failed: {e}")
+        emit(f"\nError: {e}\n")
+        return 1
+    finally:
+        sys.stdout.write(buf.getvalue())
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
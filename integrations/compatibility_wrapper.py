@@ -2,9 +2,14 @@
 兼容性包装器 - 为现有脚本提供增强功能的无缝集成
 """
 
+import ast
 import sys
 import os
+import re
+import shutil
+import tempfile
 import importlib.util
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 # 添加项目根目录到Python路径
@@ -12,8 +17,215 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from integrations.enhanced_glue_extractor import EnhancedGlueLineageExtractor
-from integrations.enhanced_table_merger import EnhancedTableLineageMerger
+# 迁移脚本模板
+_MIGRATION_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'templates', 'migrate_lineage_scripts.py'
+)
+
+# 补丁锚点：导入语句及对象创建语句
+_GLUE_IMPORT_ANCHOR = 'import boto3'
+_GLUE_CLASS_ANCHOR = 'extractor = GlueLineageExtractor(session, args.output_path)'
+_MERGER_IMPORT_ANCHOR = 'import json'
+_MERGER_CLASS_ANCHOR = 'merger = TableLineageMerger(output_dir)'
+
+# 锚点语句的AST结构（不含位置信息），用于在脚本语法树中按结构匹配，与格式无关
+_GLUE_IMPORT_NODE = ast.dump(ast.parse(_GLUE_IMPORT_ANCHOR).body[0])
+_GLUE_CLASS_NODE = ast.dump(ast.parse(_GLUE_CLASS_ANCHOR).body[0])
+_MERGER_IMPORT_NODE = ast.dump(ast.parse(_MERGER_IMPORT_ANCHOR).body[0])
+_MERGER_CLASS_NODE = ast.dump(ast.parse(_MERGER_CLASS_ANCHOR).body[0])
+
+# 脚本无法解析时的回退方案：第1组为导入语句，否则为对象创建语句；一次扫描完成两处替换
+_GLUE_PATCH_RE = re.compile(f"({re.escape(_GLUE_IMPORT_ANCHOR)})|{re.escape(_GLUE_CLASS_ANCHOR)}")
+_MERGER_PATCH_RE = re.compile(f"({re.escape(_MERGER_IMPORT_ANCHOR)})|{re.escape(_MERGER_CLASS_ANCHOR)}")
+
+# 补丁内容在模块导入时一次性构建，打补丁时直接复用
+# Glue提取器：导入语句后追加增强功能导入
+_GLUE_IMPORT_PATCH = '''
+# Enhanced lineage extractor integration
+try:
+    from integrations.compatibility_wrapper import CompatibilityWrapper
+    ENHANCED_MODE_AVAILABLE = True
+except ImportError:
+    ENHANCED_MODE_AVAILABLE = False
+    print("[INFO] Enhanced lineage features not available, using legacy mode")
+'''
+_GLUE_IMPORT_REPLACEMENT = _GLUE_IMPORT_ANCHOR + _GLUE_IMPORT_PATCH
+
+# Glue提取器：修改GlueLineageExtractor类的创建（首行之后以4个空格为基准缩进）
+_GLUE_CLASS_REPLACEMENT = '''
+    # Create extractor with enhanced capabilities if available
+    if ENHANCED_MODE_AVAILABLE:
+        try:
+            extractor_factory = CompatibilityWrapper.enhance_glue_extractor_class()
+            extractor = extractor_factory(session, args.output_path)
+            print("[INFO] Using enhanced Glue lineage extractor")
+        except Exception as e:
+            print(f"[WARNING] Enhanced mode failed: {e}")
+            extractor = GlueLineageExtractor(session, args.output_path)
+            print("[INFO] Falling back to legacy extractor")
+    else:
+        extractor = GlueLineageExtractor(session, args.output_path)
+'''.strip()
+
+# 表合并器：导入语句后追加增强功能导入
+_MERGER_IMPORT_PATCH = '''
+# Enhanced table merger integration
+try:
+    from integrations.compatibility_wrapper import CompatibilityWrapper
+    ENHANCED_MODE_AVAILABLE = True
+except ImportError:
+    ENHANCED_MODE_AVAILABLE = False
+    print("[INFO] Enhanced merger features not available, using legacy mode")
+'''
+_MERGER_IMPORT_REPLACEMENT = _MERGER_IMPORT_ANCHOR + _MERGER_IMPORT_PATCH
+
+# 表合并器：修改TableLineageMerger类的创建（首行之后以4个空格为基准缩进）
+_MERGER_CLASS_REPLACEMENT = '''
+    # Create merger with enhanced capabilities if available
+    if ENHANCED_MODE_AVAILABLE:
+        try:
+            merger_factory = CompatibilityWrapper.enhance_table_merger_class()
+            merger = merger_factory(output_dir)
+            print("[INFO] Using enhanced table lineage merger")
+        except Exception as e:
+            print(f"[WARNING] Enhanced mode failed: {e}")
+            merger = TableLineageMerger(output_dir)
+            print("[INFO] Falling back to legacy merger")
+    else:
+        merger = TableLineageMerger(output_dir)
+'''.strip()
+
+
+def _ast_patch(content: str, import_node: str, import_patch: str,
+               class_node: str, class_patch: str) -> Optional[str]:
+    """
+    解析一次脚本，按AST结构定位导入语句和对象创建语句，再在原文对应位置拼接补丁
+    
+    只修改真实的语句（注释、字符串及相似的导入不受影响），补丁按语句所在缩进对齐，
+    脚本其余部分（包括注释和格式）保持原样。
+    
+    Returns:
+        打补丁后的内容；脚本无法解析时返回None
+    """
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return None
+    
+    lines = content.split('\n')
+    
+    def line_prefix(lineno, col):
+        # AST列偏移按UTF-8字节计算
+        return lines[lineno - 1].encode('utf-8')[:col].decode('utf-8')
+    
+    edits = []
+    first_import = None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            if (ast.dump(node) == import_node
+                    and (first_import is None or node.lineno < first_import.lineno)):
+                first_import = node
+        elif isinstance(node, ast.Assign) and ast.dump(node) == class_node:
+            indent = line_prefix(node.lineno, node.col_offset)
+            # 与其他语句写在同一行时无法安全替换，保持原样
+            if indent.strip():
+                continue
+            block = class_patch.split('\n')
+            text = block[0] + ''.join(f'\n{indent}{line[4:]}' for line in block[1:])
+            edits.append((node.lineno, node.col_offset, node.end_lineno, node.end_col_offset, text))
+    
+    # 增强功能导入只需追加一次，放在第一处导入语句之后
+    if first_import is not None:
+        indent = line_prefix(first_import.lineno, first_import.col_offset)
+        if not indent.strip():
+            text = '\n'.join(f'{indent}{line}' if line else line for line in import_patch.split('\n'))
+            edits.append((first_import.end_lineno, first_import.end_col_offset,
+                          first_import.end_lineno, first_import.end_col_offset, text))
+    
+    # 从后往前拼接，前面语句的位置不受影响
+    for start_line, start_col, end_line, end_col, text in sorted(edits, reverse=True):
+        head = line_prefix(start_line, start_col)
+        tail = lines[end_line - 1].encode('utf-8')[end_col:].decode('utf-8')
+        lines[start_line - 1:end_line] = (head + text + tail).split('\n')
+    
+    return '\n'.join(lines)
+
+
+def _copy_backup(src_path: str, dst_path: str):
+    """
+    复制备份文件：Linux上使用copy_file_range在内核中完成复制（BTRFS/XFS等可直接reflink），
+    不支持时回退到shutil.copyfile
+    """
+    try:
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return
+    except (AttributeError, OSError):
+        pass
+    shutil.copyfile(src_path, dst_path)
+
+
+@lru_cache(maxsize=1)
+def _glue_extractor_factory():
+    """创建增强Glue提取器工厂（只构建一次，后续调用返回同一个函数对象）"""
+    # 延迟导入：只做脚本补丁/生成迁移脚本时不需要加载提取器及其依赖
+    from integrations.enhanced_glue_extractor import EnhancedGlueLineageExtractor
+    
+    def create_enhanced_extractor(session, lineage_output_path):
+        """创建增强的Glue血缘提取器"""
+        try:
+            # 尝试创建增强版本
+            return EnhancedGlueLineageExtractor(
+                session=session,
+                lineage_output_path=lineage_output_path,
+                enable_context_awareness=True
+            )
+        except Exception as e:
+            print(f"[WARNING] Failed to create enhanced extractor: {e}")
+            print("[INFO] Falling back to legacy mode")
+            
+            # 降级到传统模式
+            return EnhancedGlueLineageExtractor(
+                session=session,
+                lineage_output_path=lineage_output_path,
+                enable_context_awareness=False
+            )
+    
+    return create_enhanced_extractor
+
+
+@lru_cache(maxsize=1)
+def _table_merger_factory():
+    """创建增强表血缘合并器工厂（只构建一次）"""
+    from integrations.enhanced_table_merger import EnhancedTableLineageMerger
+    
+    def create_enhanced_merger(output_dir=None, session=None):
+        """创建增强的表血缘合并器"""
+        try:
+            # 尝试创建增强版本
+            return EnhancedTableLineageMerger(
+                output_dir=output_dir,
+                enable_validation=True,
+                session=session
+            )
+        except Exception as e:
+            print(f"[WARNING] Failed to create enhanced merger: {e}")
+            print("[INFO] Falling back to legacy mode")
+            
+            # 降级到传统模式
+            return EnhancedTableLineageMerger(
+                output_dir=output_dir,
+                enable_validation=False,
+                session=session
+            )
+    
+    return create_enhanced_merger
 
 
 class CompatibilityWrapper:
@@ -22,50 +234,12 @@ class CompatibilityWrapper:
     @staticmethod
     def enhance_glue_extractor_class():
         """增强现有的GlueLineageExtractor类"""
-        def create_enhanced_extractor(session, lineage_output_path):
-            """创建增强的Glue血缘提取器"""
-            try:
-                # 尝试创建增强版本
-                return EnhancedGlueLineageExtractor(
-                    session=session,
-                    lineage_output_path=lineage_output_path,
-                    enable_context_awareness=True
-                )
-            except Exception as e:
-                print(f"[WARNING] Failed to create enhanced extractor: {e}")
-                print("[INFO] Falling back to legacy mode")
-                
-                # 降级到传统模式
-                return EnhancedGlueLineageExtractor(
-                    session=session,
-                    lineage_output_path=lineage_output_path,
-                    enable_context_awareness=False
-                )
-        
-        return create_enhanced_extractor
+        return _glue_extractor_factory()
     
     @staticmethod
     def enhance_table_merger_class():
         """增强现有的TableLineageMerger类"""
-        def create_enhanced_merger(output_dir=None):
-            """创建增强的表血缘合并器"""
-            try:
-                # 尝试创建增强版本
-                return EnhancedTableLineageMerger(
-                    output_dir=output_dir,
-                    enable_validation=True
-                )
-            except Exception as e:
-                print(f"[WARNING] Failed to create enhanced merger: {e}")
-                print("[INFO] Falling back to legacy mode")
-                
-                # 降级到传统模式
-                return EnhancedTableLineageMerger(
-                    output_dir=output_dir,
-                    enable_validation=False
-                )
-        
-        return create_enhanced_merger
+        return _table_merger_factory()
     
     @staticmethod
     def patch_existing_script(script_path: str, backup: bool = True) -> bool:
@@ -80,19 +254,20 @@ class CompatibilityWrapper:
             bool: 是否成功应用补丁
         """
         try:
-            if not os.path.exists(script_path):
+            # 读取原始脚本（直接打开，文件不存在时捕获异常，省去一次stat）；
+            # 换行符统一为\n，写回时使用原脚本的换行符
+            try:
+                with open(script_path, 'r', encoding='utf-8', newline=None) as f:
+                    original_content = f.read()
+                    original_newline = f.newlines if isinstance(f.newlines, str) else '\n'
+            except FileNotFoundError:
                 print(f"[ERROR] Script not found: {script_path}")
                 return False
             
-            # 读取原始脚本
-            with open(script_path, 'r', encoding='utf-8') as f:
-                original_content = f.read()
-            
-            # 创建备份
+            # 创建备份（优先在内核中复制，支持reflink的文件系统上不复制数据块）
             if backup:
                 backup_path = f"{script_path}.backup"
-                with open(backup_path, 'w', encoding='utf-8') as f:
-                    f.write(original_content)
+                _copy_backup(script_path, backup_path)
                 print(f"[INFO] Backup created: {backup_path}")
             
             # 应用补丁
@@ -104,9 +279,20 @@ class CompatibilityWrapper:
                 print(f"[WARNING] Unknown script type: {script_path}")
                 return False
             
-            # 写入补丁后的内容
-            with open(script_path, 'w', encoding='utf-8') as f:
-                f.write(patched_content)
+            # 先写入同目录下的临时文件再原子替换，避免中途失败留下不完整的脚本
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(script_path) or '.',
+                prefix=f"{os.path.basename(script_path)}.",
+                suffix='.tmp'
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline=original_newline) as f:
+                    f.write(patched_content)
+                shutil.copymode(script_path, temp_path)
+                os.replace(temp_path, script_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
             
             print(f"[SUCCESS] Enhanced functionality added to: {script_path}")
             return True
@@ -118,174 +304,49 @@ class CompatibilityWrapper:
     @staticmethod
     def _patch_glue_extractor(content: str) -> str:
         """为Glue提取器脚本添加增强功能补丁"""
-        # 添加导入语句
-        import_patch = '''
-# Enhanced lineage extractor integration
-try:
-    from integrations.compatibility_wrapper import CompatibilityWrapper
-    ENHANCED_MODE_AVAILABLE = True
-except ImportError:
-    ENHANCED_MODE_AVAILABLE = False
-    print("[INFO] Enhanced lineage features not available, using legacy mode")
-'''
+        # 在导入部分后添加增强功能导入，并替换extractor创建部分
+        patched = _ast_patch(content, _GLUE_IMPORT_NODE, _GLUE_IMPORT_PATCH,
+                             _GLUE_CLASS_NODE, _GLUE_CLASS_REPLACEMENT)
+        if patched is not None:
+            return patched
         
-        # 修改GlueLineageExtractor类的创建
-        class_patch = '''
-    # Create extractor with enhanced capabilities if available
-    if ENHANCED_MODE_AVAILABLE:
-        try:
-            extractor_factory = CompatibilityWrapper.enhance_glue_extractor_class()
-            extractor = extractor_factory(session, args.output_path)
-            print("[INFO] Using enhanced Glue lineage extractor")
-        except Exception as e:
-            print(f"[WARNING] Enhanced mode failed: {e}")
-            extractor = GlueLineageExtractor(session, args.output_path)
-            print("[INFO] Falling back to legacy extractor")
-    else:
-        extractor = GlueLineageExtractor(session, args.output_path)
-'''
-        
-        # 在导入部分后添加增强功能导入
-        if 'import boto3' in content:
-            content = content.replace('import boto3', f'import boto3{import_patch}')
-        
-        # 替换extractor创建部分
-        if 'extractor = GlueLineageExtractor(session, args.output_path)' in content:
-            content = content.replace(
-                'extractor = GlueLineageExtractor(session, args.output_path)',
-                class_patch.strip()
-            )
-        
-        return content
+        # 脚本无法解析时回退到文本替换
+        return _GLUE_PATCH_RE.sub(
+            lambda match: _GLUE_IMPORT_REPLACEMENT if match.group(1) else _GLUE_CLASS_REPLACEMENT,
+            content
+        )
     
     @staticmethod
     def _patch_table_merger(content: str) -> str:
         """为表血缘合并器脚本添加增强功能补丁"""
-        # 添加导入语句
-        import_patch = '''
-# Enhanced table merger integration
-try:
-    from integrations.compatibility_wrapper import CompatibilityWrapper
-    ENHANCED_MODE_AVAILABLE = True
-except ImportError:
-    ENHANCED_MODE_AVAILABLE = False
-    print("[INFO] Enhanced merger features not available, using legacy mode")
-'''
-        
-        # 修改TableLineageMerger类的创建
-        class_patch = '''
-    # Create merger with enhanced capabilities if available
-    if ENHANCED_MODE_AVAILABLE:
-        try:
-            merger_factory = CompatibilityWrapper.enhance_table_merger_class()
-            merger = merger_factory(output_dir)
-            print("[INFO] Using enhanced table lineage merger")
-        except Exception as e:
-            print(f"[WARNING] Enhanced mode failed: {e}")
-            merger = TableLineageMerger(output_dir)
-            print("[INFO] Falling back to legacy merger")
-    else:
-        merger = TableLineageMerger(output_dir)
-'''
-        
-        # 在导入部分后添加增强功能导入
-        if 'import json' in content:
-            content = content.replace('import json', f'import json{import_patch}')
-        
-        # 替换merger创建部分
-        if 'merger = TableLineageMerger(output_dir)' in content:
-            content = content.replace(
-                'merger = TableLineageMerger(output_dir)',
-                class_patch.strip()
-            )
+        # 在导入部分后添加增强功能导入，并替换merger创建部分
+        patched = _ast_patch(content, _MERGER_IMPORT_NODE, _MERGER_IMPORT_PATCH,
+                             _MERGER_CLASS_NODE, _MERGER_CLASS_REPLACEMENT)
+        if patched is not None:
+            return patched
         
-        return content
+        # 脚本无法解析时回退到文本替换
+        return _MERGER_PATCH_RE.sub(
+            lambda match: _MERGER_IMPORT_REPLACEMENT if match.group(1) else _MERGER_CLASS_REPLACEMENT,
+            content
+        )
     
     @staticmethod
     def create_migration_script():
         """创建迁移脚本，帮助用户升级现有脚本"""
-        migration_script = '''#!/usr/bin/env python3
-"""
-血缘提取器增强功能迁移脚本
-"""
-
-import os
-import sys
-import argparse
-from integrations.compatibility_wrapper import CompatibilityWrapper
-
-def main():
-    parser = argparse.ArgumentParser(description="Migrate existing lineage scripts to enhanced version")
-    parser.add_argument('--script-dir', default='script', help="Directory containing scripts to migrate")
-    parser.add_argument('--no-backup', action='store_true', help="Skip creating backup files")
-    parser.add_argument('--dry-run', action='store_true', help="Show what would be done without making changes")
-    
-    args = parser.parse_args()
-    
-    script_dir = args.script_dir
-    if not os.path.exists(script_dir):
-        print(f"[ERROR] Script directory not found: {script_dir}")
-        return 1
-    
-    # 查找需要迁移的脚本
-    scripts_to_migrate = []
-    
-    # Glue提取器脚本
-    glue_script = os.path.join(script_dir, 'glue', 'extract-lineage-to-s3.py')
-    if os.path.exists(glue_script):
-        scripts_to_migrate.append(glue_script)
-    
-    # 表血缘合并器脚本
-    merger_script = os.path.join(script_dir, 'table_lineage_merger.py')
-    if os.path.exists(merger_script):
-        scripts_to_migrate.append(merger_script)
-    
-    if not scripts_to_migrate:
-        print("[INFO] No scripts found to migrate")
-        return 0
-    
-    print(f"[INFO] Found {len(scripts_to_migrate)} scripts to migrate:")
-    for script in scripts_to_migrate:
-        print(f"  - {script}")
-    
-    if args.dry_run:
-        print("[INFO] Dry run mode - no changes will be made")
-        return 0
-    
-    # 执行迁移
-    success_count = 0
-    for script in scripts_to_migrate:
-        print(f"\\n[INFO] Migrating: {script}")
-        if CompatibilityWrapper.patch_existing_script(script, backup=not args.no_backup):
-            success_count += 1
-        else:
-            print(f"[ERROR] Failed to migrate: {script}")
-    
-    print(f"\\n[INFO] Migration completed: {success_count}/{len(scripts_to_migrate)} scripts migrated successfully")
-    
-    if success_count > 0:
-        print("\\n[INFO] Migration successful! Your scripts now have enhanced lineage capabilities.")
-        print("[INFO] The enhanced features include:")
-        print("  - Context-aware execution tracking")
-        print("  - Intelligent log stream selection")
-        print("  - Job ID validation")
-        print("  - Lineage data validation")
-        print("\\n[INFO] Enhanced features will be used automatically when available.")
-        print("[INFO] If enhanced features fail, scripts will fall back to legacy mode.")
-    
-    return 0 if success_count == len(scripts_to_migrate) else 1
-
-if __name__ == "__main__":
-    sys.exit(main())
-'''
-        
-        # 保存迁移脚本
+        # 迁移脚本以独立文件保存在templates目录，直接复制到项目根目录
         migration_path = os.path.join(project_root, 'migrate_lineage_scripts.py')
-        with open(migration_path, 'w', encoding='utf-8') as f:
-            f.write(migration_script)
+        with open(_MIGRATION_TEMPLATE_PATH, 'rb') as f:
+            migration_script = f.read()
         
-        # 设置执行权限
-        os.chmod(migration_path, 0o755)
+        # 创建文件时直接带上执行权限；文件已存在时通过同一描述符设置（Windows在Python 3.13前没有fchmod，改为按路径chmod）
+        fd = os.open(migration_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(migration_script)
+            if hasattr(os, 'fchmod'):
+                os.fchmod(f.fileno(), 0o755)
+        if not hasattr(os, 'fchmod'):
+            os.chmod(migration_path, 0o755)
         
         print(f"[INFO] Migration script created: {migration_path}")
         return migration_path
@@ -296,11 +357,12 @@ if __name__ == "__main__":
         print("=== Enhanced Lineage Integration Verification ===\\n")
         
         try:
-            # 测试增强的Glue提取器
-            print("[INFO] Testing enhanced Glue extractor...")
+            # 两项检查共用一个boto3会话
             import boto3
             session = boto3.Session()
             
+            # 测试增强的Glue提取器
+            print("[INFO] Testing enhanced Glue extractor...")
             extractor_factory = CompatibilityWrapper.enhance_glue_extractor_class()
             extractor = extractor_factory(session, "s3://test-bucket/test-path")
             
@@ -310,7 +372,7 @@ if __name__ == "__main__":
             # 测试增强的表合并器
             print("\\n[INFO] Testing enhanced table merger...")
             merger_factory = CompatibilityWrapper.enhance_table_merger_class()
-            merger = merger_factory()
+            merger = merger_factory(session=session)
             
             print("  ✓ Enhanced table merger created successfully")
             print(f"  ✓ Validation features: {'Enabled' if merger.enable_validation else 'Disabled'}")
@@ -4,21 +4,26 @@
 
 import argparse
 import json
+import logging
 import sys
 import re
+import tempfile
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
-from time import sleep, time
+from time import monotonic, sleep, time
 import os
 from typing import Dict, List, Any, Optional
 
-from ..agents.context_aware_agent import ContextAwareAgent
-from ..tools.context_extractor import ExecutionContextExtractor
-from ..tools.job_validator import JobIDValidator
-from ..tools.log_stream_selector import IntelligentLogStreamSelector
 from ..models.execution_context import ExecutionContext
 from ..config import get_config
-from ..utils.logging_config import get_contextual_logger
+from ..utils.logging_config import get_contextual_logger, setup_logging
 
 # 保持与原始脚本的兼容性
 GLUE_LOG_GROUPS = [
@@ -35,32 +40,159 @@ GLUE_LOG_GROUPS = [
 CONSOLE_TRANSPORT_PATTERN = "ConsoleTransport"
 WAIT_TIME_SECONDS = 15
 
+# CloudWatch服务端过滤条件：只返回同时包含ConsoleTransport锚点和eventType的日志事件
+_LINEAGE_FILTER_PATTERN = f'"{CONSOLE_TRANSPORT_PATTERN}:" "eventType"'
+
+# 并行提取日志流的最大线程数；filter_log_events为纯I/O等待，线程即可并行
+_STREAM_EXTRACT_MAX_WORKERS = 8
+
+# Logs/S3客户端共用的配置：连接池容纳并行提取和分片上传的线程，保持TCP长连接，
+# 限流时自适应退避重试
+_CLIENT_CONFIG = BotocoreConfig(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30
+)
+
+# 血缘文档上传：按紧凑格式逐个事件写入临时文件（小文档留在内存），超过阈值时分片并行上传
+_LINEAGE_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+_LINEAGE_UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    use_threads=True
+)
+
+_UTC = timezone.utc
+
+# 日志流按最后事件时间排序的键
+_LAST_EVENT_TIME_KEY = itemgetter('lastEventTime')
+
+# ConsoleTransport日志中JSON对象的起始锚点
+_CONSOLE_TRANSPORT_JSON_RE = re.compile(r'ConsoleTransport:\s*\{')
+_JSON_DECODER = json.JSONDecoder()
+
+# 优先使用orjson编解码热点路径上的JSON（可选依赖），不可用时回退到标准库json
+try:
+    import orjson
+    
+    def _dumps_json_bytes(obj):
+        return orjson.dumps(obj)
+    
+    def _loads_json_tail(message, start_pos):
+        """JSON对象通常延伸到消息末尾，整体解析尾部；尾部还有其他内容时返回None"""
+        try:
+            return orjson.loads(message[start_pos:])
+        except orjson.JSONDecodeError:
+            return None
+except ImportError:
+    _encode_compact_json = json.JSONEncoder(separators=(',', ':')).encode
+    
+    def _dumps_json_bytes(obj):
+        return _encode_compact_json(obj).encode('utf-8')
+    
+    def _loads_json_tail(message, start_pos):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _ms_to_iso(timestamp_ms: int) -> str:
+    """
+    毫秒时间戳转为UTC ISO格式字符串
+    
+    批量日志中相邻事件常共享同一时间戳，结果按毫秒值缓存。
+    """
+    seconds, millis = divmod(timestamp_ms, 1000)
+    return datetime.fromtimestamp(seconds, _UTC).replace(microsecond=millis * 1000).isoformat()
+
+
+def _aggregate_datasets(events, direction):
+    """
+    汇总所有事件中某一方向（inputs/outputs）的数据集
+    
+    按 (namespace, name) 去重，OpenLineage中同一数据集的facets相同，无需逐个深度比较。
+    """
+    datasets = []
+    seen = set()
+    for event in events:
+        for dataset in event.get(direction, ()):
+            ds_key = (dataset.get('namespace'), dataset.get('name'))
+            if ds_key not in seen:
+                seen.add(ds_key)
+                datasets.append({
+                    'namespace': ds_key[0],
+                    'name': ds_key[1],
+                    'facets': dataset.get('facets', {})
+                })
+    return datasets
+
+
+def _decode_json_at(message, start_pos):
+    """
+    从指定位置解析一个JSON对象
+    
+    Returns:
+        (对象, 下一个搜索位置)；解析失败时返回 (None, start_pos + 1)
+    """
+    json_obj = _loads_json_tail(message, start_pos)
+    if json_obj is not None:
+        return json_obj, len(message)
+    try:
+        return _JSON_DECODER.raw_decode(message, start_pos)
+    except ValueError:
+        return None, start_pos + 1
+
 
 class EnhancedGlueLineageExtractor:
     """增强的Glue血缘提取器，集成上下文感知功能"""
     
-    def __init__(self, session, lineage_output_path, enable_context_awareness=True):
-        self.logs_client = session.client('logs')
-        self.s3_client = session.client('s3')
+    def __init__(self, session, lineage_output_path, enable_context_awareness=True,
+                 capture_inputs=True, capture_outputs=True, capture_event_type_stats=True):
+        self.logs_client = session.client('logs', config=_CLIENT_CONFIG)
+        self.s3_client = session.client('s3', config=_CLIENT_CONFIG)
+        # 分页器只依赖服务模型，创建一次后各线程复用
+        self._logs_paginator = self.logs_client.get_paginator('filter_log_events')
         self.lineage_output_path = lineage_output_path
         self.enable_context_awareness = enable_context_awareness
         
+        # 文档级汇总（输入/输出数据集、事件类型统计）只在下游需要时计算
+        self.capture_inputs = capture_inputs
+        self.capture_outputs = capture_outputs
+        self.capture_event_type_stats = capture_event_type_stats
+        
+        # 输出路径只解析一次，前缀不带首尾斜杠
+        if not lineage_output_path.startswith('s3://'):
+            raise ValueError(f"Invalid S3 path: {lineage_output_path}")
+        bucket, _, prefix = lineage_output_path[5:].partition('/')
+        self._s3_bucket = bucket
+        self._s3_prefix = prefix.strip('/')
+        
+        # 提取过程的输出统一通过日志记录，不再逐行print
+        self.logger = get_contextual_logger('enhanced_glue_extractor')
+        
         # 初始化增强功能组件
         if self.enable_context_awareness:
+            # 代理及工具模块的导入开销较大，仅在启用上下文感知时导入
+            from ..agents.context_aware_agent import ContextAwareAgent
+            from ..tools.context_extractor import ExecutionContextExtractor
+            from ..tools.job_validator import JobIDValidator
+            
             self.config = get_config()
-            self.logger = get_contextual_logger('enhanced_glue_extractor')
             
             # 初始化上下文感知组件
             self.context_extractor = ExecutionContextExtractor()
             self.job_validator = JobIDValidator()
-            self.log_stream_selector = IntelligentLogStreamSelector()
             self.context_aware_agent = ContextAwareAgent()
             
             # 提取当前执行上下文
             self.execution_context = self._initialize_execution_context()
         else:
-            self.logger = None
             self.execution_context = None
+        
+        # 文件名中的上下文ID部分在整个运行期间不变
+        self._context_part = (f"_{self.execution_context.context_id}"
+                              if self.enable_context_awareness and self.execution_context else "")
     
     def _initialize_execution_context(self) -> ExecutionContext:
         """初始化执行上下文"""
@@ -91,41 +223,19 @@ class EnhancedGlueLineageExtractor:
         """从日志消息中提取JSON对象（保持原有逻辑）"""
         json_objects = []
         
-        # 查找所有可能的JSON起始位置
-        start_positions = []
-        for match in re.finditer(r'ConsoleTransport:\\s*{', message):
-            start_positions.append(match.end() - 1)
+        # Glue的OpenLineage事件总以ConsoleTransport锚点为前缀，没有锚点的消息中不会有血缘事件
+        if CONSOLE_TRANSPORT_PATTERN not in message:
+            return json_objects
         
-        if not start_positions:
-            for i, char in enumerate(message):
-                if char == '{':
-                    start_positions.append(i)
-        
-        for start_pos in start_positions:
-            try:
-                # 找到匹配的结束括号
-                bracket_count = 0
-                end_pos = start_pos
-                
-                for i in range(start_pos, len(message)):
-                    if message[i] == '{':
-                        bracket_count += 1
-                    elif message[i] == '}':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            end_pos = i + 1
-                            break
-                
-                if end_pos > start_pos:
-                    json_str = message[start_pos:end_pos]
-                    json_obj = json.loads(json_str)
-                    
-                    # 验证是否是OpenLineage事件
-                    if 'eventType' in json_obj or 'eventTime' in json_obj:
-                        json_objects.append(json_obj)
-                        
-            except Exception:
-                pass
+        # 由C实现的解码器直接确定对象结束位置；成功解析后跳到对象末尾，不再重复解析其内部的起始括号
+        next_pos = 0
+        for match in _CONSOLE_TRANSPORT_JSON_RE.finditer(message):
+            start_pos = match.end() - 1
+            if start_pos < next_pos:
+                continue
+            json_obj, next_pos = _decode_json_at(message, start_pos)
+            if json_obj is not None and ('eventType' in json_obj or 'eventTime' in json_obj):
+                json_objects.append(json_obj)
         
         return json_objects
     
@@ -137,83 +247,39 @@ class EnhancedGlueLineageExtractor:
             return self._find_log_streams_legacy(job_name, job_run_id, start_time)
     
     def _find_log_streams_with_context_awareness(self, job_name, job_run_id, start_time):
-        """使用上下文感知的日志流查找"""
+        """使用上下文感知的日志流查找（仅在已知Job Run ID时调用）"""
         try:
             self.logger.info(f"Finding log streams with context awareness for job {job_name}, run {job_run_id}")
             
             # 1. 验证Job Run ID是否属于当前执行上下文
-            if job_run_id:
-                validation_result = self.context_aware_agent.validate_job_id_selection(
-                    job_name, job_run_id, self.execution_context
-                )
-                
-                if not validation_result['is_valid']:
-                    self.logger.warning(
-                        f"Job Run ID {job_run_id} validation failed: {validation_result.get('reason', 'Unknown')}"
-                    )
-                    
-                    # 根据置信度决定是否继续
-                    if validation_result['confidence_score'] < 0.3:
-                        self.logger.error("Job Run ID validation confidence too low, aborting")
-                        return []
-                    else:
-                        self.logger.warning("Proceeding with low confidence Job Run ID")
-            
-            # 2. 获取所有可能的日志流
-            all_streams = []
-            for log_group_config in GLUE_LOG_GROUPS:
-                log_group = log_group_config['name']
-                stream_pattern = log_group_config['stream_pattern']
-                
-                try:
-                    # 构造预期的日志流名称
-                    expected_stream_name = stream_pattern.format(job_run_id=job_run_id)
-                    
-                    # 获取日志流列表
-                    response = self.logs_client.describe_log_streams(
-                        logGroupName=log_group,
-                        orderBy='LastEventTime',
-                        descending=True,
-                        limit=50
-                    )
-                    
-                    for stream in response.get('logStreams', []):
-                        stream_info = {
-                            'logGroup': log_group,
-                            'logStreamName': stream['logStreamName'],
-                            'lastEventTime': stream.get('lastEventTime', 0),
-                            'storedBytes': stream.get('storedBytes', 0)
-                        }
-                        all_streams.append(stream_info)
-                        
-                except Exception as e:
-                    self.logger.warning(f"Error accessing log group {log_group}: {e}")
-            
-            if not all_streams:
-                self.logger.warning("No log streams found")
-                return []
-            
-            # 3. 使用智能日志流选择器
-            selection_result = self.log_stream_selector.select_log_stream(
-                job_name, self.execution_context, all_streams
+            validation_result = self.context_aware_agent.validate_job_id_selection(
+                job_name, job_run_id, self.execution_context
             )
             
-            if selection_result['selected_stream']:
-                selected_stream = selection_result['selected_stream']
-                self.logger.info(
-                    f"Intelligent selection chose: {selected_stream['logGroup']}/{selected_stream['logStreamName']} "
-                    f"(score: {selection_result['score']:.2f}, confidence: {selection_result['confidence']:.2f})"
+            if not validation_result['is_valid']:
+                self.logger.warning(
+                    f"Job Run ID {job_run_id} validation failed: {validation_result.get('reason', 'Unknown')}"
                 )
                 
-                # 记录选择原因
-                for reason in selection_result.get('reasons', []):
-                    self.logger.info(f"Selection reason: {reason}")
-                
-                # 返回选中的日志流，但保持原有格式
-                return [selected_stream]
-            else:
-                self.logger.warning("No suitable log stream selected")
-                return []
+                # 根据置信度决定是否继续
+                if validation_result['confidence_score'] < 0.3:
+                    self.logger.error("Job Run ID validation confidence too low, aborting")
+                    return []
+                else:
+                    self.logger.warning("Proceeding with low confidence Job Run ID")
+            
+            # 2. Glue日志流名称由Job Run ID确定，直接构造，无需调用describe_log_streams；
+            #    日志流不存在时提取结果为空，由调用方等待重试或回退到直接搜索
+            self.logger.info(f"Using expected log streams for run {job_run_id}")
+            return [
+                {
+                    'logGroup': log_group_config['name'],
+                    'logStreamName': log_group_config['stream_pattern'].format(job_run_id=job_run_id),
+                    'lastEventTime': 0,
+                    'storedBytes': 0
+                }
+                for log_group_config in GLUE_LOG_GROUPS
+            ]
                 
         except Exception as e:
             self.logger.error(f"Context-aware log stream selection failed: {str(e)}")
@@ -233,7 +299,7 @@ class EnhancedGlueLineageExtractor:
                 if job_run_id:
                     expected_stream_name = stream_pattern.format(job_run_id=job_run_id)
                     
-                    print(f"[INFO] Looking for log stream: {log_group}/{expected_stream_name}")
+                    self.logger.info(f"Looking for log stream: {log_group}/{expected_stream_name}")
                     
                     try:
                         response = self.logs_client.describe_log_streams(
@@ -251,18 +317,18 @@ class EnhancedGlueLineageExtractor:
                                         'lastEventTime': stream.get('lastEventTime', 0)
                                     }
                                     found_streams.append(stream_info)
-                                    print(f"[SUCCESS] Found log stream: {log_group}/{expected_stream_name}")
+                                    self.logger.info(f"Found log stream: {log_group}/{expected_stream_name}")
                                     break
                         else:
-                            print(f"[WARNING] Log stream not found: {log_group}/{expected_stream_name}")
+                            self.logger.warning(f"Log stream not found: {log_group}/{expected_stream_name}")
                     except self.logs_client.exceptions.ResourceNotFoundException:
-                        print(f"[WARNING] Log stream does not exist: {log_group}/{expected_stream_name}")
+                        self.logger.warning(f"Log stream does not exist: {log_group}/{expected_stream_name}")
                     except Exception as e:
-                        print(f"[WARNING] Error checking log stream: {e}")
+                        self.logger.warning(f"Error checking log stream: {e}")
                 
                 # 如果没有job_run_id或没有找到特定的流，列出所有流
                 if not job_run_id or not any(s['logGroup'] == log_group for s in found_streams):
-                    print(f"[INFO] Listing all log streams in {log_group}...")
+                    self.logger.info(f"Listing all log streams in {log_group}...")
                     
                     paginator = self.logs_client.get_paginator('describe_log_streams')
                     params = {
@@ -275,7 +341,13 @@ class EnhancedGlueLineageExtractor:
                     elif job_name:
                         params['logStreamNamePrefix'] = job_name
                     
+                    # 早于开始时间2小时以前的日志流跳过；阈值按毫秒计算一次，循环内直接比较整数时间戳
+                    min_last_event_ms = None
+                    if start_time:
+                        min_last_event_ms = (start_time - timedelta(hours=2)).timestamp() * 1000
+                    
                     stream_count = 0
+                    debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
                     for page in paginator.paginate(**params):
                         for stream in page.get('logStreams', []):
                             stream_count += 1
@@ -294,42 +366,39 @@ class EnhancedGlueLineageExtractor:
                                 'storedBytes': stream.get('storedBytes', 0)
                             }
                             
-                            if start_time and stream_info['lastEventTime'] > 0:
-                                stream_time = datetime.fromtimestamp(
-                                    stream_info['lastEventTime'] / 1000, 
-                                    tz=timezone.utc
-                                )
-                                if stream_time < start_time - timedelta(hours=2):
-                                    continue
+                            if (min_last_event_ms is not None and stream_info['lastEventTime'] > 0
+                                    and stream_info['lastEventTime'] < min_last_event_ms):
+                                continue
                             
                             found_streams.append(stream_info)
-                            print(f"[INFO] Found log stream: {log_group}/{stream_name}")
+                            if debug_enabled:
+                                self.logger.debug(f"Found log stream: {log_group}/{stream_name}")
                     
                     if stream_count == 0:
-                        print(f"[WARNING] No log streams found in {log_group}")
+                        self.logger.warning(f"No log streams found in {log_group}")
                 
             except self.logs_client.exceptions.ResourceNotFoundException:
-                print(f"[ERROR] Log group does not exist: {log_group}")
+                self.logger.error(f"Log group does not exist: {log_group}")
             except Exception as e:
-                print(f"[WARNING] Error accessing log group {log_group}: {e}")
+                self.logger.warning(f"Error accessing log group {log_group}: {e}")
         
-        # 按最后事件时间排序（最新的在前）
-        found_streams.sort(key=lambda x: x['lastEventTime'], reverse=True)
+        # 按最后事件时间排序（最新的在前）；键函数由C实现，排序时不回调解释器
+        found_streams.sort(key=_LAST_EVENT_TIME_KEY, reverse=True)
         
-        # 打印找到的所有日志流
+        # 汇总找到的日志流；逐个日志流的明细只在DEBUG级别输出
         if found_streams:
-            print(f"\\n[INFO] Summary - Found {len(found_streams)} log streams:")
-            for stream in found_streams:
-                if stream['lastEventTime'] > 0:
-                    last_event = datetime.fromtimestamp(
-                        stream['lastEventTime'] / 1000, 
-                        tz=timezone.utc
-                    ).isoformat()
-                else:
-                    last_event = "No events"
+            self.logger.info(f"Summary - Found {len(found_streams)} log streams")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                for stream in found_streams:
+                    if stream['lastEventTime'] > 0:
+                        last_event = _ms_to_iso(stream['lastEventTime'])
+                    else:
+                        last_event = "No events"
                     
-                size_info = f", Size: {stream.get('storedBytes', 0)} bytes"
-                print(f"  - {stream['logGroup']}/{stream['logStreamName']} (Last event: {last_event}{size_info})")
+                    self.logger.debug(
+                        f"  - {stream['logGroup']}/{stream['logStreamName']} "
+                        f"(Last event: {last_event}, Size: {stream.get('storedBytes', 0)} bytes)"
+                    )
         
         return found_streams
     
@@ -338,136 +407,103 @@ class EnhancedGlueLineageExtractor:
         lineage_events = []
         
         try:
-            print(f"[INFO] Extracting from {log_group}/{log_stream}")
+            self.logger.info(f"Extracting from {log_group}/{log_stream}")
             
+            # 由CloudWatch在服务端完成过滤，并以当前时间为上界限定扫描范围
             params = {
                 'logGroupName': log_group,
                 'logStreamNames': [log_stream],
-                'filterPattern': f'"{CONSOLE_TRANSPORT_PATTERN}"'
+                'filterPattern': _LINEAGE_FILTER_PATTERN,
+                'endTime': int(time() * 1000)
             }
             
             if start_time:
                 params['startTime'] = int((start_time - timedelta(minutes=5)).timestamp() * 1000)
-                print(f"[INFO] Searching events from: {(start_time - timedelta(minutes=5)).isoformat()}")
-            else:
-                print(f"[INFO] No start time specified, searching all events")
-            
-            # 获取初始事件信息
-            initial_response = self.logs_client.filter_log_events(
-                logGroupName=log_group,
-                logStreamNames=[log_stream],
-                limit=10
-            )
-            
-            if initial_response.get('events'):
-                first_event = initial_response['events'][0]
-                first_timestamp = datetime.fromtimestamp(
-                    first_event['timestamp'] / 1000, 
-                    tz=timezone.utc
-                )
-                print(f"[INFO] Log stream contains {len(initial_response['events'])} events (sample)")
-                print(f"[INFO] First event timestamp: {first_timestamp.isoformat()}")
+                self.logger.info(f"Searching events from: {(start_time - timedelta(minutes=5)).isoformat()}")
             else:
-                print(f"[WARNING] Log stream appears to be empty")
+                self.logger.info("No start time specified, searching all events")
             
-            paginator = self.logs_client.get_paginator('filter_log_events')
-            event_count = 0
             matching_event_count = 0
             
-            for page in paginator.paginate(**params):
+            for page in self._logs_paginator.paginate(**params):
                 for event in page.get('events', []):
-                    event_count += 1
-                    message = event['message']
-                    
-                    if CONSOLE_TRANSPORT_PATTERN in message:
-                        matching_event_count += 1
-                        json_objs = self.extract_json_from_message(message)
-                        
-                        for json_obj in json_objs:
-                            if json_obj and 'eventType' in json_obj:
-                                # 添加元数据，包括执行上下文信息
-                                metadata = {
-                                    'captured_at': datetime.fromtimestamp(
-                                        event['timestamp'] / 1000, 
-                                        tz=timezone.utc
-                                    ).isoformat(),
-                                    'log_group': log_group,
-                                    'log_stream': log_stream
-                                }
-                                
-                                # 如果启用了上下文感知，添加上下文信息
-                                if self.enable_context_awareness and self.execution_context:
-                                    metadata['execution_context'] = {
-                                        'context_id': self.execution_context.context_id,
-                                        'environment_type': self.execution_context.environment_type.value,
-                                        'process_id': self.execution_context.process_id,
-                                        'timestamp': self.execution_context.timestamp.isoformat()
-                                    }
-                                
-                                json_obj['_metadata'] = metadata
-                                lineage_events.append(json_obj)
+                    matching_event_count += 1
+                    lineage_events.extend(self._annotate_lineage_events(
+                        event['message'], event['timestamp'], log_group, log_stream
+                    ))
             
-            print(f"[INFO] Processed {matching_event_count} log events matching filter, found {len(lineage_events)} lineage events")
+            self.logger.info(f"Processed {matching_event_count} log events matching filter, found {len(lineage_events)} lineage events")
             
+        except self.logs_client.exceptions.ResourceNotFoundException:
+            self.logger.warning(f"Log stream does not exist: {log_group}/{log_stream}")
         except Exception as e:
-            print(f"[ERROR] Error extracting from {log_stream}: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"Error extracting from {log_stream}: {e}")
+        
+        return lineage_events
+    
+    def _annotate_lineage_events(self, message, timestamp_ms, log_group, log_stream):
+        """从一条日志消息中提取血缘事件，并附加采集元数据（包括执行上下文信息）"""
+        lineage_events = []
+        
+        for json_obj in self.extract_json_from_message(message):
+            if json_obj and 'eventType' in json_obj:
+                metadata = {
+                    'captured_at': _ms_to_iso(timestamp_ms),
+                    'log_group': log_group,
+                    'log_stream': log_stream
+                }
+                
+                # 如果启用了上下文感知，只记录上下文ID；完整上下文写在文档级元数据中
+                if self.enable_context_awareness and self.execution_context:
+                    metadata['context_id'] = self.execution_context.context_id
+                
+                json_obj['_metadata'] = metadata
+                lineage_events.append(json_obj)
         
         return lineage_events
     
     def save_lineage_to_s3(self, events, job_name, job_run_id=None):
         """将血缘信息保存到S3（增强版本，包含上下文信息）"""
         if not events:
-            print("[WARNING] No lineage events to save")
+            self.logger.warning("No lineage events to save")
             return None
         
-        print(f"\\n[INFO] Saving {len(events)} lineage events to S3...")
+        self.logger.info(f"Saving {len(events)} lineage events to S3...")
         
-        # 解析S3路径
-        if self.lineage_output_path.startswith('s3://'):
-            path_parts = self.lineage_output_path[5:].split('/', 1)
-            bucket = path_parts[0]
-            prefix = path_parts[1] if len(path_parts) > 1 else ''
-        else:
-            raise ValueError(f"Invalid S3 path: {self.lineage_output_path}")
+        bucket = self._s3_bucket
         
-        # 生成文件名
+        # 生成文件名；启用上下文感知时包含上下文ID
         timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
         run_id_part = f"_{job_run_id}" if job_run_id else ""
+        file_name = f"lineage_{job_name}{run_id_part}{self._context_part}_{timestamp}.json"
+        key = f"{self._s3_prefix}/{file_name}" if self._s3_prefix else file_name
         
-        # 如果启用了上下文感知，在文件名中包含上下文ID
-        context_part = ""
-        if self.enable_context_awareness and self.execution_context:
-            context_part = f"_{self.execution_context.context_id}"
-        
-        file_name = f"lineage_{job_name}{run_id_part}{context_part}_{timestamp}.json"
-        key = f"{prefix}/{file_name}".strip('/') if prefix else file_name
-        
-        # 创建血缘文档
-        lineage_document = {
-            'metadata': {
-                'job_name': job_name,
-                'job_run_id': job_run_id,
-                'extraction_timestamp': datetime.now(timezone.utc).isoformat(),
-                'total_events': len(events),
-                'event_types': {},
-                'data_lineage': {
-                    'inputs': [],
-                    'outputs': [],
-                    'transformations': []
-                },
-                'enhanced_features': {
-                    'context_awareness_enabled': self.enable_context_awareness,
-                    'extractor_version': '2.0_enhanced'
-                }
+        # 创建血缘文档元数据；事件列表在上传时逐个写出，不再构建完整文档
+        metadata = {
+            'job_name': job_name,
+            'job_run_id': job_run_id,
+            'extraction_timestamp': datetime.now(timezone.utc).isoformat(),
+            'total_events': len(events),
+            'event_types': {},
+            'data_lineage': {
+                'inputs': [],
+                'outputs': [],
+                'transformations': []
             },
-            'events': events
+            'enhanced_features': {
+                'context_awareness_enabled': self.enable_context_awareness,
+                'extractor_version': '2.0_enhanced',
+                'captured_sections': {
+                    'inputs': self.capture_inputs,
+                    'outputs': self.capture_outputs,
+                    'event_types': self.capture_event_type_stats
+                }
+            }
         }
         
         # 如果启用了上下文感知，添加执行上下文信息
         if self.enable_context_awareness and self.execution_context:
-            lineage_document['metadata']['execution_context'] = {
+            metadata['execution_context'] = {
                 'context_id': self.execution_context.context_id,
                 'environment_type': self.execution_context.environment_type.value,
                 'timestamp': self.execution_context.timestamp.isoformat(),
@@ -478,57 +514,50 @@ class EnhancedGlueLineageExtractor:
                 'unique_identifier': self.execution_context.get_unique_identifier()
             }
         
-        # 分析事件（保持原有逻辑）
-        for event in events:
-            event_type = event.get('eventType', 'unknown')
-            lineage_document['metadata']['event_types'][event_type] = \\
-                lineage_document['metadata']['event_types'].get(event_type, 0) + 1
-            
-            # 提取输入/输出数据集
-            if 'inputs' in event:
-                for input_ds in event['inputs']:
-                    ds_info = {
-                        'namespace': input_ds.get('namespace'),
-                        'name': input_ds.get('name'),
-                        'facets': input_ds.get('facets', {})
-                    }
-                    if ds_info not in lineage_document['metadata']['data_lineage']['inputs']:
-                        lineage_document['metadata']['data_lineage']['inputs'].append(ds_info)
-            
-            if 'outputs' in event:
-                for output_ds in event['outputs']:
-                    ds_info = {
-                        'namespace': output_ds.get('namespace'),
-                        'name': output_ds.get('name'),
-                        'facets': output_ds.get('facets', {})
-                    }
-                    if ds_info not in lineage_document['metadata']['data_lineage']['outputs']:
-                        lineage_document['metadata']['data_lineage']['outputs'].append(ds_info)
+        # 分析事件：统计事件类型，汇总输入/输出数据集；下游不需要的部分按构造参数跳过
+        if self.capture_event_type_stats:
+            metadata['event_types'] = dict(
+                Counter(event.get('eventType', 'unknown') for event in events)
+            )
+        if self.capture_inputs:
+            metadata['data_lineage']['inputs'] = _aggregate_datasets(events, 'inputs')
+        if self.capture_outputs:
+            metadata['data_lineage']['outputs'] = _aggregate_datasets(events, 'outputs')
         
         # 上传到S3
         try:
-            response = self.s3_client.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=json.dumps(lineage_document, indent=2),
-                ContentType='application/json'
-            )
-            print(f"[SUCCESS] Lineage saved to s3://{bucket}/{key}")
-            print(f"[INFO] S3 ETag: {response.get('ETag', 'unknown')}")
+            with tempfile.SpooledTemporaryFile(max_size=_LINEAGE_SPOOL_MAX_SIZE) as body:
+                body.write(b'{"metadata":')
+                body.write(_dumps_json_bytes(metadata))
+                body.write(b',"events":[')
+                for index, event in enumerate(events):
+                    if index:
+                        body.write(b',')
+                    body.write(_dumps_json_bytes(event))
+                body.write(b']}')
+                body.seek(0)
+                
+                self.s3_client.upload_fileobj(
+                    body, bucket, key,
+                    ExtraArgs={'ContentType': 'application/json'},
+                    Config=_LINEAGE_UPLOAD_TRANSFER_CONFIG
+                )
+            self.logger.info(f"Lineage saved to s3://{bucket}/{key}")
             
-            # 打印事件统计
-            print("\\n[INFO] Event Statistics:")
-            for event_type, count in lineage_document['metadata']['event_types'].items():
-                print(f"  - {event_type}: {count}")
+            # 记录事件统计
+            event_statistics = ', '.join(
+                f"{event_type}: {count}" for event_type, count in metadata['event_types'].items()
+            )
+            self.logger.info(f"Event Statistics: {event_statistics}")
             
             # 如果启用了上下文感知，记录上下文信息
             if self.enable_context_awareness and self.execution_context:
-                print(f"[INFO] Execution Context: {self.execution_context.context_id}")
-                print(f"[INFO] Environment: {self.execution_context.environment_type.value}")
+                self.logger.info(f"Execution Context: {self.execution_context.context_id}")
+                self.logger.info(f"Environment: {self.execution_context.environment_type.value}")
             
             return f"s3://{bucket}/{key}"
         except Exception as e:
-            print(f"[ERROR] Failed to save lineage to S3: {str(e)}")
+            self.logger.error(f"Failed to save lineage to S3: {str(e)}")
             raise
     
     def extract_and_save_lineage(self, job_name, job_run_id=None, start_time=None, 
@@ -536,6 +565,10 @@ class EnhancedGlueLineageExtractor:
         """提取并保存血缘信息（增强版本）"""
         all_events = []
         processed_streams = set()
+        # Live Tail会话覆盖所有Glue作业的日志，只有已知Job Run ID时才能可靠地筛选出本次运行的事件
+        live_tail_available = self.enable_context_awareness and bool(job_run_id)
+        # 等待日志流创建及直接搜索只在第一轮查找时进行，之后按WAIT_TIME_SECONDS轮询
+        first_search = True
         
         # 如果启用了上下文感知，记录开始信息
         if self.enable_context_awareness:
@@ -545,72 +578,42 @@ class EnhancedGlueLineageExtractor:
             self.logger.info(f"Execution context: {self.execution_context.context_id}")
         
         while True:
-            print("\\n[INFO] Searching for lineage events...")
+            self.logger.info("Searching for lineage events...")
             
-            # 查找日志流（使用增强方法）
-            streams = self.find_log_streams(job_name, job_run_id, start_time)
+            # 查找日志流（使用增强方法）并提取事件
+            found_events = self._extract_from_log_streams(
+                job_name, job_run_id, start_time, processed_streams, all_events
+            )
             
-            if not streams:
-                print("[WARNING] No log streams found")
+            # 第一轮没有找到日志流，或按Job Run ID构造的日志流尚不存在/没有事件时，等待一段时间再重试
+            if first_search and not found_events and job_run_id:
+                self.logger.info("Waiting 30 seconds for log streams to be created...")
+                sleep(30)
                 
-                # 如果没有找到流，尝试等待一段时间再重试
-                if not all_events and job_run_id:
-                    print(f"[INFO] Waiting 30 seconds for log streams to be created...")
-                    sleep(30)
-                    
-                    # 再次尝试
-                    streams = self.find_log_streams(job_name, job_run_id, start_time)
-                    
-                    if not streams:
-                        print("[ERROR] Still no log streams found after waiting")
-                        # 尝试直接搜索（保持原有逻辑）
-                        self._attempt_direct_search(job_name, job_run_id, all_events)
-            else:
-                print(f"[INFO] Found {len(streams)} log streams")
+                # 再次尝试
+                found_events = self._extract_from_log_streams(
+                    job_name, job_run_id, start_time, processed_streams, all_events
+                )
                 
-                # 从每个流提取事件
-                for stream_info in streams:
-                    stream_key = f"{stream_info['logGroup']}:{stream_info['logStreamName']}"
-                    
-                    if stream_key not in processed_streams:
-                        events = self.extract_lineage_from_stream(
-                            stream_info['logGroup'],
-                            stream_info['logStreamName'],
-                            start_time
-                        )
-                        
-                        if events:
-                            print(f"[SUCCESS] Found {len(events)} events in {stream_key}")
-                            all_events.extend(events)
-                            processed_streams.add(stream_key)
+                if not found_events:
+                    self.logger.error("Still no lineage events found in log streams after waiting")
+                    # 尝试直接搜索（保持原有逻辑）
+                    self._attempt_direct_search(job_name, job_run_id, all_events)
+            first_search = False
             
-            # 去重
+            # 去重后保存到S3
             if all_events:
-                unique_events = []
-                seen_events = set()
-                
-                for event in all_events:
-                    event_key = json.dumps({
-                        'eventType': event.get('eventType'),
-                        'eventTime': event.get('eventTime'),
-                        'run': {'runId': event.get('run', {}).get('runId')}
-                    }, sort_keys=True)
-                    
-                    if event_key not in seen_events:
-                        seen_events.add(event_key)
-                        unique_events.append(event)
-                
-                print(f"[INFO] Total unique events: {len(unique_events)}")
-                
-                # 保存到S3
-                if unique_events:
-                    self.save_lineage_to_s3(unique_events, job_name, job_run_id)
+                self._save_unique_events(all_events, job_name, job_run_id)
             
             if not continuous:
                 break
             
-            # 持续模式：等待新事件
-            print(f"\\n[INFO] Waiting {WAIT_TIME_SECONDS} seconds for new events...")
+            # 持续模式：优先通过Live Tail接收推送的新事件，不可用时回退到定时轮询
+            if live_tail_available:
+                self._follow_live_tail(job_name, job_run_id, all_events)
+                live_tail_available = False
+            
+            self.logger.info(f"Waiting {WAIT_TIME_SECONDS} seconds for new events...")
             sleep(WAIT_TIME_SECONDS)
             
             # 更新开始时间为最后处理的时间
@@ -621,64 +624,217 @@ class EnhancedGlueLineageExtractor:
                 )
                 start_time = last_event_time
     
+    def _extract_from_log_streams(self, job_name, job_run_id, start_time, processed_streams, all_events):
+        """
+        查找日志流并并行提取其中的血缘事件，追加到all_events
+        
+        Returns:
+            bool: 本次是否提取到新事件
+        """
+        streams = self.find_log_streams(job_name, job_run_id, start_time)
+        
+        if not streams:
+            self.logger.warning("No log streams found")
+            return False
+        
+        self.logger.info(f"Found {len(streams)} log streams")
+        
+        # 并行从各个未处理的流提取事件，按流的原有顺序汇总结果
+        pending_streams = {}
+        for stream_info in streams:
+            stream_key = f"{stream_info['logGroup']}:{stream_info['logStreamName']}"
+            if stream_key not in processed_streams:
+                pending_streams.setdefault(stream_key, stream_info)
+        
+        if not pending_streams:
+            return False
+        
+        found_events = False
+        max_workers = min(_STREAM_EXTRACT_MAX_WORKERS, len(pending_streams))
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix='lineage-stream') as executor:
+            futures = [
+                (stream_key, executor.submit(
+                    self.extract_lineage_from_stream,
+                    stream_info['logGroup'],
+                    stream_info['logStreamName'],
+                    start_time
+                ))
+                for stream_key, stream_info in pending_streams.items()
+            ]
+            
+            for stream_key, future in futures:
+                events = future.result()
+                if events:
+                    self.logger.info(f"Found {len(events)} events in {stream_key}")
+                    all_events.extend(events)
+                    processed_streams.add(stream_key)
+                    found_events = True
+        
+        return found_events
+    
+    def _save_unique_events(self, all_events, job_name, job_run_id):
+        """按 (eventType, eventTime, runId) 去重后保存到S3"""
+        unique_events = []
+        seen_events = set()
+        
+        for event in all_events:
+            # 以元组作为去重键，避免每个事件构建字典并序列化
+            event_key = (
+                event.get('eventType'),
+                event.get('eventTime'),
+                event.get('run', {}).get('runId')
+            )
+            
+            if event_key not in seen_events:
+                seen_events.add(event_key)
+                unique_events.append(event)
+        
+        self.logger.info(f"Total unique events: {len(unique_events)}")
+        
+        if unique_events:
+            self.save_lineage_to_s3(unique_events, job_name, job_run_id)
+    
+    def _resolve_log_group_arns(self):
+        """查询Glue日志组的ARN（Live Tail只接受ARN），返回 {ARN: 日志组名称}"""
+        log_groups = {}
+        
+        for log_group_config in GLUE_LOG_GROUPS:
+            log_group = log_group_config['name']
+            response = self.logs_client.describe_log_groups(logGroupNamePrefix=log_group)
+            for group in response.get('logGroups', []):
+                if group['logGroupName'] == log_group:
+                    arn = group.get('logGroupArn') or group['arn'].removesuffix(':*')
+                    log_groups[arn] = log_group
+                    break
+        
+        return log_groups
+    
+    def _follow_live_tail(self, job_name, job_run_id, all_events):
+        """
+        持续模式下通过CloudWatch Logs Live Tail接收服务端过滤后推送的血缘日志
+        
+        新事件按轮询间隔批量保存；会话超时（最长3小时）后重新建立。
+        只在已知Job Run ID时使用，按日志流名称筛选本次运行的事件。
+        Live Tail不可用或会话异常时返回，由调用方回退到定时轮询。
+        """
+        try:
+            log_groups = self._resolve_log_group_arns()
+        except (BotoCoreError, ClientError) as e:
+            self.logger.warning(f"Live Tail unavailable, falling back to polling: {e}")
+            return
+        
+        if not log_groups:
+            self.logger.warning("No Glue log groups found for Live Tail, falling back to polling")
+            return
+        
+        pending = False
+        last_save = monotonic()
+        
+        try:
+            while True:
+                try:
+                    # 跨多个日志组的会话不支持按日志流过滤，由客户端按Job Run ID筛选
+                    response = self.logs_client.start_live_tail(
+                        logGroupIdentifiers=list(log_groups),
+                        logEventFilterPattern=_LINEAGE_FILTER_PATTERN
+                    )
+                except (AttributeError, BotoCoreError, ClientError) as e:
+                    # AttributeError: botocore版本过旧，不支持StartLiveTail
+                    self.logger.warning(f"Live Tail unavailable, falling back to polling: {e}")
+                    return
+                
+                self.logger.info("Live Tail session started, waiting for lineage events...")
+                
+                try:
+                    for stream_event in response['responseStream']:
+                        session_update = stream_event.get('sessionUpdate')
+                        if session_update:
+                            for result in session_update.get('sessionResults', ()):
+                                log_stream = result.get('logStreamName', '')
+                                if job_run_id not in log_stream:
+                                    continue
+                                
+                                group_identifier = result.get('logGroupIdentifier')
+                                events = self._annotate_lineage_events(
+                                    result['message'], result['timestamp'],
+                                    log_groups.get(group_identifier, group_identifier), log_stream
+                                )
+                                if events:
+                                    all_events.extend(events)
+                                    pending = True
+                        
+                        if pending and monotonic() - last_save >= WAIT_TIME_SECONDS:
+                            pending = False
+                            last_save = monotonic()
+                            self._save_unique_events(all_events, job_name, job_run_id)
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code') != 'SessionTimeoutException':
+                        self.logger.warning(f"Live Tail session failed, falling back to polling: {e}")
+                        return
+                except BotoCoreError as e:
+                    # 连接中断、读取超时等传输层错误同样回退到轮询，不结束持续模式
+                    self.logger.warning(f"Live Tail session failed, falling back to polling: {e}")
+                    return
+                
+                self.logger.info("Live Tail session ended, restarting...")
+        finally:
+            # 返回或中断前保存尚未写出的事件
+            if pending:
+                self._save_unique_events(all_events, job_name, job_run_id)
+    
     def _attempt_direct_search(self, job_name, job_run_id, all_events):
         """尝试直接搜索（保持原有逻辑）"""
-        print("[INFO] Attempting direct search using filter_log_events...")
+        if not job_run_id:
+            return
+        
+        self.logger.info("Attempting direct search using filter_log_events...")
+        # Glue的日志流名称均以Job Run ID开头，由服务端按前缀筛选日志流，并在两端限定时间窗口
+        end_time = datetime.now(timezone.utc)
+        time_window = {
+            'startTime': int((end_time - timedelta(hours=2)).timestamp() * 1000),
+            'endTime': int(end_time.timestamp() * 1000)
+        }
+        
         for log_group_config in GLUE_LOG_GROUPS:
             log_group = log_group_config['name']
-            stream_pattern = log_group_config['stream_pattern']
-            
-            if job_run_id:
-                expected_stream = stream_pattern.format(job_run_id=job_run_id)
-                print(f"[INFO] Searching for events in {log_group} with stream pattern: {expected_stream}")
+            expected_stream = log_group_config['stream_pattern'].format(job_run_id=job_run_id)
+            self.logger.info(f"Searching for events in {log_group} with stream pattern: {expected_stream}")
             
             try:
-                response = self.logs_client.filter_log_events(
+                matching_event_count = 0
+                for page in self._logs_paginator.paginate(
                     logGroupName=log_group,
-                    filterPattern=f'"{CONSOLE_TRANSPORT_PATTERN}"',
-                    startTime=int((datetime.now(timezone.utc) - timedelta(hours=2)).timestamp() * 1000)
-                )
+                    logStreamNamePrefix=job_run_id,
+                    filterPattern=_LINEAGE_FILTER_PATTERN,
+                    **time_window
+                ):
+                    for event in page.get('events', []):
+                        matching_event_count += 1
+                        all_events.extend(self._annotate_lineage_events(
+                            event['message'], event['timestamp'], log_group, event.get('logStreamName', '')
+                        ))
                 
-                if response.get('events'):
-                    print(f"[INFO] Found {len(response['events'])} events in {log_group}")
-                    for event in response['events']:
-                        event_stream = event.get('logStreamName', '')
-                        if job_run_id and (event_stream == expected_stream or job_run_id in event_stream):
-                            message = event['message']
-                            if CONSOLE_TRANSPORT_PATTERN in message:
-                                json_objs = self.extract_json_from_message(message)
-                                for json_obj in json_objs:
-                                    if json_obj and 'eventType' in json_obj:
-                                        metadata = {
-                                            'captured_at': datetime.fromtimestamp(
-                                                event['timestamp'] / 1000, 
-                                                tz=timezone.utc
-                                            ).isoformat(),
-                                            'log_group': log_group,
-                                            'log_stream': event_stream
-                                        }
-                                        
-                                        # 添加上下文信息
-                                        if self.enable_context_awareness and self.execution_context:
-                                            metadata['execution_context'] = {
-                                                'context_id': self.execution_context.context_id,
-                                                'environment_type': self.execution_context.environment_type.value
-                                            }
-                                        
-                                        json_obj['_metadata'] = metadata
-                                        all_events.append(json_obj)
-                                        
+                if matching_event_count:
+                    self.logger.info(f"Found {matching_event_count} events in {log_group}")
+                    
             except Exception as e:
-                print(f"[WARNING] Direct search failed for {log_group}: {e}")
+                self.logger.warning(f"Direct search failed for {log_group}: {e}")
         
         if all_events:
-            print(f"[SUCCESS] Found {len(all_events)} events using direct search")
+            self.logger.info(f"Found {len(all_events)} events using direct search")
             self.save_lineage_to_s3(all_events, job_name, job_run_id)
 
 
-def create_enhanced_extractor(session, lineage_output_path, enable_context_awareness=True):
+def create_enhanced_extractor(session, lineage_output_path, enable_context_awareness=True,
+                              capture_inputs=True, capture_outputs=True, capture_event_type_stats=True):
     """创建增强的Glue血缘提取器实例"""
-    return EnhancedGlueLineageExtractor(session, lineage_output_path, enable_context_awareness)
+    return EnhancedGlueLineageExtractor(
+        session, lineage_output_path, enable_context_awareness,
+        capture_inputs=capture_inputs,
+        capture_outputs=capture_outputs,
+        capture_event_type_stats=capture_event_type_stats
+    )
 
 
 def parse_arguments():
@@ -699,6 +855,12 @@ def parse_arguments():
                        help="Disable time filtering, search all events in the log stream")
     parser.add_argument('--disable-context-awareness', action='store_true',
                        help="Disable context awareness features (use legacy mode)")
+    parser.add_argument('--no-input-aggregation', action='store_true',
+                       help="Skip aggregating input datasets in the lineage document metadata")
+    parser.add_argument('--no-output-aggregation', action='store_true',
+                       help="Skip aggregating output datasets in the lineage document metadata")
+    parser.add_argument('--no-event-type-stats', action='store_true',
+                       help="Skip counting event types in the lineage document metadata")
     
     return parser.parse_args()
 
@@ -706,7 +868,7 @@ def parse_arguments():
 if __name__ == "__main__":
     args = parse_arguments()
     
-    print(f"\\n=== Enhanced Glue Lineage Extractor ===")
+    print(f"\n=== Enhanced Glue Lineage Extractor ===")
     print(f"Region: {args.region}")
     print(f"Job Name: {args.job_name}")
     print(f"Job Run ID: {args.job_run_id if args.job_run_id else 'Not specified'}")
@@ -714,6 +876,9 @@ if __name__ == "__main__":
     print(f"Mode: {'Continuous' if args.continuous else 'One-time'}")
     print(f"Context Awareness: {'Disabled' if args.disable_context_awareness else 'Enabled'}")
     
+    # 提取过程通过日志输出进度
+    setup_logging()
+    
     # 创建AWS会话
     session = boto3.Session(profile_name=args.profile, region_name=args.region)
     
@@ -732,7 +897,10 @@ if __name__ == "__main__":
     extractor = EnhancedGlueLineageExtractor(
         session, 
         args.output_path, 
-        enable_context_awareness=not args.disable_context_awareness
+        enable_context_awareness=not args.disable_context_awareness,
+        capture_inputs=not args.no_input_aggregation,
+        capture_outputs=not args.no_output_aggregation,
+        capture_event_type_stats=not args.no_event_type_stats
     )
     
     try:
@@ -743,8 +911,8 @@ if __name__ == "__main__":
             continuous=args.continuous
         )
     except KeyboardInterrupt:
-        print("\\n[INFO] Extraction stopped by user")
+        print("\n[INFO] Extraction stopped by user")
     except Exception as e:
-        print(f"\\n[ERROR] Extraction failed: {e}")
+        print(f"\n[ERROR] Extraction failed: {e}")
         import traceback
         traceback.print_exc()
\ No newline at end of file
@@ -17,12 +17,23 @@ from ..models.lineage_validation import LineageValidationResult, ValidationStatu
 from ..config import get_config
 from ..utils.logging_config import get_contextual_logger
 
+# 优先使用orjson序列化血缘输出（可选依赖），不可用时回退到标准库json
+try:
+    import orjson
+    
+    def _dumps_json_bytes(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dumps_json_bytes(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
+
 
 class EnhancedTableLineageMerger:
     """增强的表血缘合并器，集成血缘验证功能"""
     
-    def __init__(self, output_dir=None, enable_validation=True):
-        self.s3_client = boto3.client('s3')
+    def __init__(self, output_dir=None, enable_validation=True, session=None):
+        # 传入已有的boto3会话时复用它，避免重复初始化会话
+        self.s3_client = (session or boto3).client('s3')
         self.bucket_name = 'sales-forecast-demo-new'
         self.enable_validation = enable_validation
         
@@ -595,8 +606,8 @@ class EnhancedTableLineageMerger:
         output_path = os.path.join(self.output_dir, output_filename)
         
         try:
-            with open(output_path, 'w') as f:
-                json.dump(output, f, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(_dumps_json_bytes(output))
             
             print(f"\\nEnhanced TABLE-level lineage merged successfully!")
             print(f"Output saved to: {output_path}")
@@ -621,8 +632,8 @@ class EnhancedTableLineageMerger:
             print(f"Error saving output file: {e}")
             alt_path = f"/tmp/{output_filename}"
             try:
-                with open(alt_path, 'w') as f:
-                    json.dump(output, f, indent=2)
+                with open(alt_path, 'wb') as f:
+                    f.write(_dumps_json_bytes(output))
                 print(f"Output saved to alternative location: {alt_path}")
             except:
                 print("Failed to save output file")
@@ -696,8 +707,8 @@ class EnhancedTableLineageMerger:
         output_filename = f"table_lineage_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         output_path = os.path.join(self.output_dir, output_filename)
         
-        with open(output_path, 'w') as f:
-            json.dump(output, f, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(_dumps_json_bytes(output))
         
         print(f"TABLE-level lineage merged successfully!")
         print(f"Output saved to: {output_path}")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+血缘提取器增强功能迁移脚本
+"""
+
+import os
+import sys
+import argparse
+from integrations.compatibility_wrapper import CompatibilityWrapper
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate existing lineage scripts to enhanced version")
+    parser.add_argument('--script-dir', default='script', help="Directory containing scripts to migrate")
+    parser.add_argument('--no-backup', action='store_true', help="Skip creating backup files")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would be done without making changes")
+    
+    args = parser.parse_args()
+    
+    script_dir = args.script_dir
+    if not os.path.exists(script_dir):
+        print(f"[ERROR] Script directory not found: {script_dir}")
+        return 1
+    
+    # 查找需要迁移的脚本
+    scripts_to_migrate = []
+    
+    # Glue提取器脚本
+    glue_script = os.path.join(script_dir, 'glue', 'extract-lineage-to-s3.py')
+    if os.path.exists(glue_script):
+        scripts_to_migrate.append(glue_script)
+    
+    # 表血缘合并器脚本
+    merger_script = os.path.join(script_dir, 'table_lineage_merger.py')
+    if os.path.exists(merger_script):
+        scripts_to_migrate.append(merger_script)
+    
+    if not scripts_to_migrate:
+        print("[INFO] No scripts found to migrate")
+        return 0
+    
+    print(f"[INFO] Found {len(scripts_to_migrate)} scripts to migrate:")
+    for script in scripts_to_migrate:
+        print(f"  - {script}")
+    
+    if args.dry_run:
+        print("[INFO] Dry run mode - no changes will be made")
+        return 0
+    
+    # 执行迁移
+    success_count = 0
+    for script in scripts_to_migrate:
+        print(f"\n[INFO] Migrating: {script}")
+        if CompatibilityWrapper.patch_existing_script(script, backup=not args.no_backup):
+            success_count += 1
+        else:
+            print(f"[ERROR] Failed to migrate: {script}")
+    
+    print(f"\n[INFO] Migration completed: {success_count}/{len(scripts_to_migrate)} scripts migrated successfully")
+    
+    if success_count > 0:
+        print("\n[INFO] Migration successful! Your scripts now have enhanced lineage capabilities.")
+        print("[INFO] The enhanced features include:")
+        print("  - Context-aware execution tracking")
+        print("  - Intelligent log stream selection")
+        print("  - Job ID validation")
+        print("  - Lineage data validation")
+        print("\n[INFO] Enhanced features will be used automatically when available.")
+        print("[INFO] If enhanced features fail, scripts will fall back to legacy mode.")
+    
+    return 0 if success_count == len(scripts_to_migrate) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
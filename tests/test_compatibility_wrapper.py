@@ -0,0 +1,194 @@
+"""
+兼容性包装器脚本补丁测试
+"""
+
+import ast
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from integrations import compatibility_wrapper
+from integrations.compatibility_wrapper import CompatibilityWrapper
+
+
+GLUE_SCRIPT = '''import sys
+# import boto3 在注释中不应被匹配
+import boto3
+
+HELP = "extractor = GlueLineageExtractor(session, args.output_path)"
+
+
+def main():
+    session = boto3.Session()
+    if args.output_path:
+        extractor = GlueLineageExtractor(session, args.output_path)
+    extractor.run()
+'''
+
+MERGER_SCRIPT = '''import os
+import json
+
+
+def main(output_dir):
+    merger = TableLineageMerger(output_dir)
+    merger.merge()
+'''
+
+
+class TestScriptPatching(unittest.TestCase):
+    """按AST定位的脚本补丁测试类"""
+    
+    def test_glue_patch_targets_real_statements_only(self):
+        """测试只修改真实的导入和创建语句，注释与字符串中的相同文本保持原样"""
+        patched = CompatibilityWrapper._patch_glue_extractor(GLUE_SCRIPT)
+        lines = patched.split('\n')
+        
+        ast.parse(patched)
+        self.assertEqual(patched.count('from integrations.compatibility_wrapper import CompatibilityWrapper'), 1)
+        self.assertEqual(lines[2], 'import boto3')
+        self.assertEqual(lines[3], '# Enhanced lineage extractor integration')
+        self.assertIn('# import boto3 在注释中不应被匹配', lines)
+        self.assertIn('HELP = "extractor = GlueLineageExtractor(session, args.output_path)"', lines)
+    
+    def test_glue_patch_keeps_statement_indentation(self):
+        """测试替换后的代码块按原语句所在缩进对齐"""
+        patched = CompatibilityWrapper._patch_glue_extractor(GLUE_SCRIPT)
+        lines = patched.split('\n')
+        
+        start = lines.index('        # Create extractor with enhanced capabilities if available')
+        self.assertEqual(lines[start + 1], '        if ENHANCED_MODE_AVAILABLE:')
+        self.assertEqual(lines[start + 2], '            try:')
+        self.assertEqual(lines[-3], '            extractor = GlueLineageExtractor(session, args.output_path)')
+        self.assertEqual(lines[-2], '    extractor.run()')
+    
+    def test_merger_patch(self):
+        """测试表合并器脚本的导入和创建语句补丁"""
+        patched = CompatibilityWrapper._patch_table_merger(MERGER_SCRIPT)
+        lines = patched.split('\n')
+        
+        ast.parse(patched)
+        self.assertEqual(lines[:4], ['import os', 'import json', '# Enhanced table merger integration', 'try:'])
+        self.assertIn('    # Create merger with enhanced capabilities if available', lines)
+        self.assertIn('            merger = merger_factory(output_dir)', lines)
+        self.assertEqual(lines[-2], '    merger.merge()')
+    
+    def test_script_without_anchors_unchanged(self):
+        """测试不含锚点语句的脚本保持原样"""
+        content = 'import os\n\nprint(os.getcwd())\n'
+        
+        self.assertEqual(CompatibilityWrapper._patch_glue_extractor(content), content)
+        self.assertEqual(CompatibilityWrapper._patch_table_merger(content), content)
+    
+    def test_unparseable_script_falls_back_to_text_replacement(self):
+        """测试脚本无法解析时回退到文本替换"""
+        content = 'import boto3\ndef main(:\nextractor = GlueLineageExtractor(session, args.output_path)\n'
+        
+        patched = CompatibilityWrapper._patch_glue_extractor(content)
+        
+        self.assertTrue(patched.startswith('import boto3\n# Enhanced lineage extractor integration'))
+        self.assertIn('# Create extractor with enhanced capabilities if available', patched)
+        self.assertNotIn('\nextractor = GlueLineageExtractor(session, args.output_path)\n', patched)
+
+
+class TestPatchExistingScript(unittest.TestCase):
+    """脚本文件补丁及迁移脚本生成测试类"""
+    
+    def setUp(self):
+        """测试设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        
+        stdout_patcher = patch('builtins.print')
+        stdout_patcher.start()
+        self.addCleanup(stdout_patcher.stop)
+    
+    def _write_script(self, name, content, mode=0o644):
+        """在临时目录中写入脚本"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(path, mode)
+        return path
+    
+    def test_patch_writes_backup_and_keeps_mode(self):
+        """测试补丁前创建备份，补丁后保留原文件权限"""
+        script_path = self._write_script('extract-lineage-to-s3.py', GLUE_SCRIPT, 0o750)
+        
+        self.assertTrue(CompatibilityWrapper.patch_existing_script(script_path))
+        
+        with open(f"{script_path}.backup", encoding='utf-8') as f:
+            self.assertEqual(f.read(), GLUE_SCRIPT)
+        with open(script_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), CompatibilityWrapper._patch_glue_extractor(GLUE_SCRIPT))
+        self.assertEqual(stat.S_IMODE(os.stat(script_path).st_mode), 0o750)
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir)),
+            ['extract-lineage-to-s3.py', 'extract-lineage-to-s3.py.backup']
+        )
+    
+    def test_patch_keeps_crlf_line_endings(self):
+        """测试CRLF换行的脚本补丁后所有行仍使用CRLF"""
+        script_path = os.path.join(self.temp_dir, 'extract-lineage-to-s3.py')
+        with open(script_path, 'wb') as f:
+            f.write(GLUE_SCRIPT.replace('\n', '\r\n').encode('utf-8'))
+        
+        self.assertTrue(CompatibilityWrapper.patch_existing_script(script_path, backup=False))
+        
+        with open(script_path, 'rb') as f:
+            patched = f.read().decode('utf-8')
+        self.assertEqual(patched.count('\n'), patched.count('\r\n'))
+        self.assertEqual(
+            patched.replace('\r\n', '\n'),
+            CompatibilityWrapper._patch_glue_extractor(GLUE_SCRIPT)
+        )
+    
+    def test_failed_replace_removes_temp_file(self):
+        """测试替换失败时删除临时文件并保留原脚本"""
+        script_path = self._write_script('table_lineage_merger.py', MERGER_SCRIPT)
+        
+        with patch('os.replace', side_effect=OSError('replace failed')):
+            self.assertFalse(CompatibilityWrapper.patch_existing_script(script_path, backup=False))
+        
+        self.assertEqual(os.listdir(self.temp_dir), ['table_lineage_merger.py'])
+        with open(script_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), MERGER_SCRIPT)
+    
+    def test_patch_without_backup(self):
+        """测试关闭备份时不生成备份文件"""
+        script_path = self._write_script('table_lineage_merger.py', MERGER_SCRIPT)
+        
+        self.assertTrue(CompatibilityWrapper.patch_existing_script(script_path, backup=False))
+        self.assertFalse(os.path.exists(f"{script_path}.backup"))
+    
+    def test_missing_and_unknown_scripts(self):
+        """测试脚本不存在或类型未知时返回False且不修改文件"""
+        missing_path = os.path.join(self.temp_dir, 'extract-lineage-to-s3.py')
+        self.assertFalse(CompatibilityWrapper.patch_existing_script(missing_path))
+        
+        unknown_path = self._write_script('other_script.py', GLUE_SCRIPT)
+        self.assertFalse(CompatibilityWrapper.patch_existing_script(unknown_path, backup=False))
+        with open(unknown_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), GLUE_SCRIPT)
+    
+    def test_create_migration_script(self):
+        """测试迁移脚本从模板复制并带有执行权限"""
+        with patch.object(compatibility_wrapper, 'project_root', self.temp_dir):
+            migration_path = CompatibilityWrapper.create_migration_script()
+        
+        self.assertEqual(os.path.dirname(migration_path), self.temp_dir)
+        self.assertEqual(stat.S_IMODE(os.stat(migration_path).st_mode), 0o755)
+        with open(migration_path, 'rb') as f, open(compatibility_wrapper._MIGRATION_TEMPLATE_PATH, 'rb') as template:
+            self.assertEqual(f.read(), template.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+配置文件加载测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from config import Config
+
+
+class TestConfigFromFile(unittest.TestCase):
+    """从配置文件创建配置测试类"""
+    
+    def setUp(self):
+        """测试设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+    
+    def _write_config(self, data):
+        """写入JSON配置文件"""
+        config_path = os.path.join(self.temp_dir, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return config_path
+    
+    def test_load_sections_and_general_keys(self):
+        """测试加载子配置和通用配置"""
+        config_path = self._write_config({
+            'bedrock': {'region': 'us-east-1', 'max_tokens': 2000},
+            'validation': {'min_confidence_score': 0.9},
+            'debug': True,
+            'log_level': 'DEBUG'
+        })
+        
+        config = Config.from_file(config_path)
+        
+        self.assertEqual(config.bedrock.region, 'us-east-1')
+        self.assertEqual(config.bedrock.max_tokens, 2000)
+        self.assertEqual(config.validation.min_confidence_score, 0.9)
+        self.assertEqual(config.dynamodb.region, 'us-west-2')
+        self.assertTrue(config.debug)
+        self.assertEqual(config.log_level, 'DEBUG')
+    
+    def test_unknown_keys_ignored(self):
+        """测试子配置中未声明的键被忽略，不影响加载"""
+        config_path = self._write_config({
+            'dynamodb': {'region': 'eu-west-1', 'legacy_table': 'old-table'},
+            'cloudwatch': {'retention_days': 30},
+            'unknown_section': {'key': 'value'}
+        })
+        
+        config = Config.from_file(config_path)
+        
+        self.assertEqual(config.dynamodb.region, 'eu-west-1')
+        self.assertFalse(hasattr(config.dynamodb, 'legacy_table'))
+        self.assertEqual(config.cloudwatch.namespace, 'LineageExtractor/ContextAware')
+        self.assertNotIn('legacy_table', config.to_dict()['dynamodb'])
+
+
+if __name__ == '__main__':
+    unittest.main()
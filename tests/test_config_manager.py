@@ -0,0 +1,124 @@
+"""
+配置管理器缓存测试
+"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from deployment import config_manager
+from deployment.config_manager import (
+    ConfigManager, get_config_manager, get_enhanced_config, clear_config_cache
+)
+
+
+class TestYamlCache(unittest.TestCase):
+    """YAML文件解析缓存测试类"""
+    
+    def setUp(self):
+        """测试设置"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.addCleanup(clear_config_cache)
+        clear_config_cache()
+        
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        self._write_config('aws:\n  region: us-east-1\n')
+    
+    def _write_config(self, content, mtime_ns=None):
+        """写入配置文件，可指定修改时间"""
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(self.config_path, ns=(mtime_ns, mtime_ns))
+    
+    def test_unchanged_file_parsed_once(self):
+        """测试文件未修改时只解析一次"""
+        with patch.object(config_manager, '_load_yaml_file', wraps=config_manager._load_yaml_file) as mock_load:
+            first = config_manager._load_yaml_cached(self.config_path)
+            second = config_manager._load_yaml_cached(self.config_path)
+        
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(first, {'aws': {'region': 'us-east-1'}})
+        self.assertEqual(second, first)
+    
+    def test_returns_independent_copies(self):
+        """测试修改返回结果不影响缓存内容"""
+        first = config_manager._load_yaml_cached(self.config_path)
+        first['aws']['region'] = 'eu-west-1'
+        
+        self.assertEqual(config_manager._load_yaml_cached(self.config_path), {'aws': {'region': 'us-east-1'}})
+    
+    def test_reloads_when_mtime_or_size_changes(self):
+        """测试文件修改时间或大小变化时重新解析"""
+        self._write_config('aws:\n  region: us-east-1\n', mtime_ns=1_000_000_000)
+        config_manager._load_yaml_cached(self.config_path)
+        
+        # 大小不变、修改时间变化
+        self._write_config('aws:\n  region: us-west-2\n', mtime_ns=2_000_000_000)
+        self.assertEqual(config_manager._load_yaml_cached(self.config_path), {'aws': {'region': 'us-west-2'}})
+        
+        # 修改时间不变、大小变化
+        self._write_config('aws:\n  region: ap-southeast-1\n', mtime_ns=2_000_000_000)
+        self.assertEqual(config_manager._load_yaml_cached(self.config_path), {'aws': {'region': 'ap-southeast-1'}})
+    
+    def test_empty_file_loads_as_empty_dict(self):
+        """测试空文件解析为空字典"""
+        self._write_config('')
+        
+        self.assertEqual(config_manager._load_yaml_cached(self.config_path), {})
+
+
+class TestConfigManagerCache(unittest.TestCase):
+    """配置管理器及已构建配置的缓存测试类"""
+    
+    def setUp(self):
+        """测试设置"""
+        self.addCleanup(clear_config_cache)
+        clear_config_cache()
+    
+    def test_config_manager_cached_per_environment(self):
+        """测试同一环境返回同一个配置管理器实例"""
+        dev_manager = get_config_manager('dev')
+        
+        self.assertIs(get_config_manager('dev'), dev_manager)
+        self.assertIsNot(get_config_manager('prod'), dev_manager)
+        self.assertEqual(get_config_manager('prod').environment.value, 'prod')
+    
+    def test_default_environment_from_env_var(self):
+        """测试未指定环境时使用ENVIRONMENT环境变量"""
+        with patch.dict(os.environ, {'ENVIRONMENT': 'test'}):
+            manager = get_config_manager()
+        
+        self.assertIs(manager, get_config_manager('test'))
+    
+    def test_enhanced_config_built_once(self):
+        """测试同一环境的配置只构建一次，清除缓存后重新构建"""
+        with patch.object(ConfigManager, '_build_config', side_effect=lambda: object()) as mock_build:
+            first = get_enhanced_config('dev')
+            self.assertIs(get_enhanced_config('dev'), first)
+            self.assertEqual(mock_build.call_count, 1)
+            
+            clear_config_cache()
+            self.assertIsNot(get_enhanced_config('dev'), first)
+            self.assertEqual(mock_build.call_count, 2)
+    
+    def test_clear_config_cache_creates_new_manager(self):
+        """测试清除缓存后重新创建配置管理器"""
+        manager = get_config_manager('dev')
+        
+        clear_config_cache()
+        
+        self.assertIsNot(get_config_manager('dev'), manager)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,9 @@ from datetime import datetime, timezone
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from integrations.enhanced_glue_extractor import EnhancedGlueLineageExtractor
+from integrations.enhanced_glue_extractor import (
+    EnhancedGlueLineageExtractor, _aggregate_datasets, _ms_to_iso
+)
 from integrations.enhanced_table_merger import EnhancedTableLineageMerger
 from models.execution_context import ExecutionContext, EnvironmentType
 
@@ -127,7 +129,6 @@ class TestLineageIntegrationEndToEnd(unittest.TestCase):
         self.assertIsNotNone(extractor.execution_context)
         self.assertIsNotNone(extractor.context_extractor)
         self.assertIsNotNone(extractor.job_validator)
-        self.assertIsNotNone(extractor.log_stream_selector)
     
     @patch('enhanced_lineage_agent.integrations.enhanced_table_merger.get_config')
     def test_enhanced_table_merger_validation(self, mock_get_config):
@@ -254,6 +255,165 @@ class TestLineageIntegrationEndToEnd(unittest.TestCase):
         self.assertEqual(context_metric['Value'], 1.0)
 
 
+class TestEnhancedGlueExtractorProcessing(unittest.TestCase):
+    """Glue血缘提取器的解析、汇总和保存测试"""
+    
+    def setUp(self):
+        """测试设置（不启用上下文感知，AWS客户端全部为模拟对象）"""
+        self.session = MagicMock()
+        self.extractor = EnhancedGlueLineageExtractor(
+            session=self.session,
+            lineage_output_path="s3://test-bucket/lineage/",
+            enable_context_awareness=False
+        )
+        
+        self.events = [
+            {
+                "eventType": event_type,
+                "eventTime": f"2024-01-01T00:00:0{i}+00:00",
+                "run": {"runId": "run-1"},
+                "inputs": [{"namespace": "s3://test-bucket", "name": f"input_{i % 2}.csv", "facets": {"schema": {}}}],
+                "outputs": [{"namespace": "redshift://test-cluster", "name": "public.final_table"}]
+            }
+            for i, event_type in enumerate(["START", "RUNNING", "COMPLETE"])
+        ]
+    
+    def _save_and_capture(self):
+        """保存事件并返回上传的 (bucket, key, 文档)"""
+        uploaded = {}
+        
+        def capture(body, bucket, key, **kwargs):
+            uploaded['body'] = body.read()
+            uploaded['bucket'] = bucket
+            uploaded['key'] = key
+        
+        self.extractor.s3_client.upload_fileobj.side_effect = capture
+        result = self.extractor.save_lineage_to_s3(self.events, "test-job", "jr_test123")
+        self.assertEqual(result, f"s3://{uploaded['bucket']}/{uploaded['key']}")
+        return uploaded['bucket'], uploaded['key'], uploaded['body']
+    
+    def test_extract_json_after_anchor(self):
+        """测试从ConsoleTransport锚点后解析事件"""
+        message = 'INFO ConsoleTransport: {"eventType": "START", "eventTime": "t1"}'
+        self.assertEqual(
+            self.extractor.extract_json_from_message(message),
+            [{"eventType": "START", "eventTime": "t1"}]
+        )
+    
+    def test_extract_json_with_trailing_text(self):
+        """测试事件JSON之后还有其他文本及多个锚点"""
+        message = ('ConsoleTransport: {"eventType": "START"} trailing '
+                   'ConsoleTransport: {"eventTime": "t2"} more text')
+        self.assertEqual(
+            self.extractor.extract_json_from_message(message),
+            [{"eventType": "START"}, {"eventTime": "t2"}]
+        )
+    
+    def test_extract_json_with_braces_in_strings(self):
+        """测试字符串值中包含花括号和锚点文本"""
+        message = 'ConsoleTransport: {"eventType": "START", "sql": "SELECT \'{ConsoleTransport: {x}\'"}'
+        events = self.extractor.extract_json_from_message(message)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["sql"], "SELECT '{ConsoleTransport: {x}'")
+    
+    def test_extract_json_skips_invalid_json(self):
+        """测试无效JSON和不含血缘字段的对象被跳过"""
+        self.assertEqual(self.extractor.extract_json_from_message('ConsoleTransport: {not json}'), [])
+        self.assertEqual(self.extractor.extract_json_from_message('ConsoleTransport: {"other": 1}'), [])
+        self.assertEqual(
+            self.extractor.extract_json_from_message('ConsoleTransport: {bad} ConsoleTransport: {"eventType": "C"}'),
+            [{"eventType": "C"}]
+        )
+    
+    def test_extract_json_requires_anchor(self):
+        """测试没有ConsoleTransport锚点的消息不解析"""
+        self.assertEqual(self.extractor.extract_json_from_message('plain {"eventType": "START"}'), [])
+    
+    def test_aggregate_datasets_deduplicates_by_namespace_and_name(self):
+        """测试数据集按 (namespace, name) 去重并保持首次出现顺序"""
+        inputs = _aggregate_datasets(self.events, 'inputs')
+        self.assertEqual(
+            [(ds['namespace'], ds['name']) for ds in inputs],
+            [("s3://test-bucket", "input_0.csv"), ("s3://test-bucket", "input_1.csv")]
+        )
+        self.assertEqual(inputs[0]['facets'], {"schema": {}})
+        
+        outputs = _aggregate_datasets(self.events, 'outputs')
+        self.assertEqual(outputs, [{"namespace": "redshift://test-cluster", "name": "public.final_table", "facets": {}}])
+        
+        self.assertEqual(_aggregate_datasets([{"eventType": "START"}], 'inputs'), [])
+    
+    def test_save_lineage_to_s3_writes_compact_document(self):
+        """测试上传的血缘文档为紧凑JSON，且包含元数据汇总和全部事件"""
+        bucket, key, body = self._save_and_capture()
+        
+        self.assertEqual(bucket, "test-bucket")
+        self.assertTrue(key.startswith("lineage/lineage_test-job_jr_test123_"))
+        self.assertTrue(key.endswith(".json"))
+        self.assertNotIn(b'\n', body)
+        self.assertNotIn(b'": ', body)
+        
+        document = json.loads(body)
+        self.assertEqual(document['events'], self.events)
+        metadata = document['metadata']
+        self.assertEqual(metadata['total_events'], 3)
+        self.assertEqual(metadata['event_types'], {"START": 1, "RUNNING": 1, "COMPLETE": 1})
+        self.assertEqual(len(metadata['data_lineage']['inputs']), 2)
+        self.assertEqual(len(metadata['data_lineage']['outputs']), 1)
+    
+    def test_save_lineage_to_s3_skips_disabled_sections(self):
+        """测试关闭的汇总部分保留空的默认值"""
+        self.extractor.capture_inputs = False
+        self.extractor.capture_event_type_stats = False
+        
+        _, _, body = self._save_and_capture()
+        metadata = json.loads(body)['metadata']
+        self.assertEqual(metadata['event_types'], {})
+        self.assertEqual(metadata['data_lineage']['inputs'], [])
+        self.assertEqual(len(metadata['data_lineage']['outputs']), 1)
+        self.assertEqual(
+            metadata['enhanced_features']['captured_sections'],
+            {'inputs': False, 'outputs': True, 'event_types': False}
+        )
+    
+    def test_save_lineage_to_s3_without_events(self):
+        """测试没有事件时不上传"""
+        self.assertIsNone(self.extractor.save_lineage_to_s3([], "test-job"))
+        self.extractor.s3_client.upload_fileobj.assert_not_called()
+    
+    def test_invalid_output_path_rejected(self):
+        """测试非S3输出路径在创建时即报错"""
+        with self.assertRaises(ValueError):
+            EnhancedGlueLineageExtractor(self.session, "/local/path", enable_context_awareness=False)
+    
+    def test_ms_to_iso_matches_datetime_conversion(self):
+        """测试毫秒时间戳转换与datetime直接转换结果一致"""
+        for timestamp_ms in (0, 1, 999, 1704067200000, 1704067200123, 1732000000999):
+            self.assertEqual(
+                _ms_to_iso(timestamp_ms),
+                datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).isoformat()
+            )
+    
+    def test_continuous_mode_waits_for_streams_only_once(self):
+        """测试持续模式下只在第一轮等待日志流并直接搜索，之后按固定间隔轮询"""
+        sleeps = []
+        
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 4:
+                raise KeyboardInterrupt
+        
+        with patch.object(self.extractor, 'find_log_streams', return_value=[]) as mock_find, \
+                patch.object(self.extractor, '_attempt_direct_search') as mock_direct, \
+                patch('integrations.enhanced_glue_extractor.sleep', side_effect=fake_sleep):
+            with self.assertRaises(KeyboardInterrupt):
+                self.extractor.extract_and_save_lineage("test-job", "jr_test123", continuous=True)
+        
+        self.assertEqual(sleeps, [30, 15, 15, 15])
+        self.assertEqual(mock_direct.call_count, 1)
+        self.assertEqual(mock_find.call_count, 4)
+
+
 class TestConcurrentExecution(unittest.TestCase):
     """并发执行测试"""
     
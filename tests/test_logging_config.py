@@ -0,0 +1,119 @@
+"""
+日志配置测试
+"""
+
+import io
+import logging
+import logging.handlers
+import threading
+import unittest
+from unittest.mock import patch
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils import logging_config
+from utils.logging_config import setup_logging, stop_logging_listener, get_contextual_logger
+
+
+class TestAsyncLogging(unittest.TestCase):
+    """QueueHandler/QueueListener异步日志测试类"""
+    
+    def setUp(self):
+        """测试设置"""
+        self.stdout = io.StringIO()
+        stdout_patcher = patch('sys.stdout', self.stdout)
+        stdout_patcher.start()
+        self.addCleanup(stdout_patcher.stop)
+    
+    def tearDown(self):
+        """测试清理"""
+        stop_logging_listener()
+        logging.getLogger('enhanced_lineage_agent').handlers.clear()
+    
+    def test_async_logging_uses_queue_handler(self):
+        """测试异步模式下logger只挂载QueueHandler，由监听线程输出"""
+        logger = setup_logging(log_level='INFO', log_format='%(levelname)s %(message)s')
+        
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertIsInstance(logger.handlers[0], logging.handlers.QueueHandler)
+        self.assertIsNotNone(logging_config._queue_listener)
+        self.assertFalse(logger.propagate)
+    
+    def test_async_logging_flushes_records_in_order_on_stop(self):
+        """测试停止监听时输出队列中剩余的全部日志，且保持记录顺序"""
+        logger = setup_logging(log_level='INFO', log_format='%(message)s')
+        
+        for i in range(50):
+            logger.info(f"message {i}")
+        logger.debug("filtered out")
+        stop_logging_listener()
+        
+        self.assertEqual(
+            self.stdout.getvalue().splitlines(),
+            [f"message {i}" for i in range(50)]
+        )
+        self.assertIsNone(logging_config._queue_listener)
+    
+    def test_async_logging_from_worker_threads(self):
+        """测试多个线程同时记录日志不丢失"""
+        logger = setup_logging(log_level='INFO', log_format='%(message)s')
+        
+        def worker(worker_id):
+            for i in range(20):
+                logger.info(f"worker {worker_id} message {i}")
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        stop_logging_listener()
+        
+        self.assertEqual(len(self.stdout.getvalue().splitlines()), 80)
+    
+    def test_setup_logging_twice_replaces_listener(self):
+        """测试重复调用setup_logging时停止旧的监听线程"""
+        setup_logging(log_level='INFO')
+        first_listener = logging_config._queue_listener
+        
+        logger = setup_logging(log_level='INFO')
+        
+        self.assertIsNot(logging_config._queue_listener, first_listener)
+        self.assertIsNone(first_listener._thread)
+        self.assertEqual(len(logger.handlers), 1)
+    
+    def test_sync_logging_writes_directly(self):
+        """测试关闭异步模式时直接挂载StreamHandler"""
+        logger = setup_logging(log_level='INFO', log_format='%(message)s', enable_async=False)
+        
+        self.assertIsInstance(logger.handlers[0], logging.StreamHandler)
+        self.assertIsNone(logging_config._queue_listener)
+        
+        logger.info("direct message")
+        self.assertEqual(self.stdout.getvalue(), "direct message\n")
+
+
+class TestContextualLogger(unittest.TestCase):
+    """上下文感知日志记录器测试类"""
+    
+    def test_context_prefix_and_level_check(self):
+        """测试消息添加上下文ID前缀，isEnabledFor与底层logger一致"""
+        contextual_logger = get_contextual_logger('test_component', context_id='ctx_123')
+        
+        with self.assertLogs('enhanced_lineage_agent.test_component', level='INFO') as captured:
+            contextual_logger.info("hello")
+        
+        self.assertEqual(captured.records[0].getMessage(), "[ctx_123] hello")
+        self.assertEqual(
+            contextual_logger.isEnabledFor(logging.DEBUG),
+            contextual_logger.logger.isEnabledFor(logging.DEBUG)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+监控指标批量发送测试
+"""
+
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.monitoring import SimpleMonitoring, CLOUDWATCH_MAX_BATCH_SIZE
+
+
+def _metric(index):
+    """构造测试指标"""
+    return {'MetricName': f'TestMetric{index}', 'Value': index, 'Unit': 'Count'}
+
+
+class TestSimpleMonitoringBatching(unittest.TestCase):
+    """SimpleMonitoring指标缓冲与批量发送测试类"""
+    
+    def setUp(self):
+        """测试设置"""
+        client_patcher = patch('boto3.client')
+        mock_boto_client = client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+        
+        self.mock_cloudwatch = MagicMock()
+        mock_boto_client.return_value = self.mock_cloudwatch
+    
+    def _sent_metric_names(self):
+        """按发送顺序返回所有已发送的指标名称"""
+        return [
+            metric['MetricName']
+            for call in self.mock_cloudwatch.put_metric_data.call_args_list
+            for metric in call.kwargs['MetricData']
+        ]
+    
+    def test_metrics_buffered_until_batch_size(self):
+        """测试未达到批次大小时只缓冲不发送"""
+        monitoring = SimpleMonitoring(buffer_size=5, flush_interval_seconds=0)
+        
+        monitoring._buffer_metrics([_metric(i) for i in range(4)])
+        self.mock_cloudwatch.put_metric_data.assert_not_called()
+        
+        monitoring._buffer_metrics([_metric(4)])
+        self.mock_cloudwatch.put_metric_data.assert_called_once()
+        self.assertEqual(self._sent_metric_names(), [f'TestMetric{i}' for i in range(5)])
+    
+    def test_flush_splits_into_cloudwatch_batches(self):
+        """测试刷新时按CloudWatch单次上限拆分批次"""
+        monitoring = SimpleMonitoring(buffer_size=100, flush_interval_seconds=0)
+        
+        monitoring._buffer_metrics([_metric(i) for i in range(45)])
+        monitoring.flush_metrics()
+        
+        batch_sizes = [
+            len(call.kwargs['MetricData'])
+            for call in self.mock_cloudwatch.put_metric_data.call_args_list
+        ]
+        self.assertEqual(batch_sizes, [CLOUDWATCH_MAX_BATCH_SIZE, CLOUDWATCH_MAX_BATCH_SIZE, 5])
+        self.assertEqual(self._sent_metric_names(), [f'TestMetric{i}' for i in range(45)])
+    
+    def test_failed_batches_requeued_in_order(self):
+        """测试发送失败时未发送的指标按原顺序保留，下次刷新重新发送"""
+        monitoring = SimpleMonitoring(buffer_size=100, flush_interval_seconds=0)
+        self.mock_cloudwatch.put_metric_data.side_effect = [
+            None,
+            ClientError({'Error': {'Code': 'Throttling', 'Message': 'Rate exceeded'}}, 'PutMetricData')
+        ]
+        
+        monitoring._buffer_metrics([_metric(i) for i in range(30)])
+        monitoring.flush_metrics()
+        
+        self.assertEqual(
+            [metric['MetricName'] for metric in monitoring._metric_buffer],
+            [f'TestMetric{i}' for i in range(20, 30)]
+        )
+        
+        self.mock_cloudwatch.put_metric_data.side_effect = None
+        monitoring.flush_metrics()
+        self.assertEqual(len(monitoring._metric_buffer), 0)
+    
+    def test_timer_flushes_partial_batch(self):
+        """测试未满批次的指标在刷新间隔后自动发送"""
+        monitoring = SimpleMonitoring(buffer_size=20, flush_interval_seconds=0.05)
+        
+        monitoring.emit_context_identification_metric(True, 'standalone_script')
+        self.mock_cloudwatch.put_metric_data.assert_not_called()
+        
+        deadline = time.monotonic() + 5
+        while not self.mock_cloudwatch.put_metric_data.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        self.assertEqual(self._sent_metric_names(), ['ContextIdentificationSuccess'])
+    
+    def test_buffer_bounded(self):
+        """测试缓冲区达到上限后丢弃最旧的指标"""
+        monitoring = SimpleMonitoring(buffer_size=1000, flush_interval_seconds=0, max_buffered_metrics=10)
+        
+        monitoring._buffer_metrics([_metric(i) for i in range(15)])
+        
+        self.assertEqual(
+            [metric['MetricName'] for metric in monitoring._metric_buffer],
+            [f'TestMetric{i}' for i in range(5, 15)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
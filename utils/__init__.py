@@ -4,10 +4,35 @@
 包含配置管理、监控等实用工具。
 """
 
-from .config_manager import ConfigManager
-from .monitoring import SimpleMonitoring
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config_manager import ConfigManager
+    from .monitoring import SimpleMonitoring
+
+# 公开符号 -> 所在模块，首次访问时才导入（PEP 562），避免导入配置管理器时加载boto3
+_LAZY_EXPORTS = {
+    "ConfigManager": ".config_manager",
+    "SimpleMonitoring": ".monitoring"
+}
 
 __all__ = [
     "ConfigManager",
     "SimpleMonitoring"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """按需导入公开符号"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -11,6 +11,24 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 
 
+# 环境变量 -> 配置路径
+_ENV_MAPPINGS = {
+    'ENHANCED_LINEAGE_MODEL_ID': ['agent', 'model_id'],
+    'ENHANCED_LINEAGE_REGION': ['storage', 'region'],
+    'ENHANCED_LINEAGE_TABLE_PREFIX': ['storage', 'dynamodb_table_prefix'],
+    'ENHANCED_LINEAGE_BUCKET_PREFIX': ['storage', 's3_bucket_prefix'],
+    'ENHANCED_LINEAGE_LOG_LEVEL': ['logging', 'level'],
+    'ENHANCED_LINEAGE_TIME_TOLERANCE': ['job_validation', 'time_tolerance_seconds'],
+    'ENHANCED_LINEAGE_MONITORING_ENABLED': ['monitoring', 'enabled']
+}
+
+# 需要类型转换的环境变量 -> 转换函数（未列出的保持字符串）
+_ENV_CONVERTERS = {
+    'ENHANCED_LINEAGE_TIME_TOLERANCE': int,
+    'ENHANCED_LINEAGE_MONITORING_ENABLED': lambda value: value.lower() in ('true', '1', 'yes', 'on')
+}
+
+
 class ConfigManager:
     """配置管理器"""
     
@@ -88,29 +106,17 @@ class ConfigManager:
     
     def _load_environment_config(self):
         """从环境变量加载配置"""
-        env_mappings = {
-            'ENHANCED_LINEAGE_MODEL_ID': ['agent', 'model_id'],
-            'ENHANCED_LINEAGE_REGION': ['storage', 'region'],
-            'ENHANCED_LINEAGE_TABLE_PREFIX': ['storage', 'dynamodb_table_prefix'],
-            'ENHANCED_LINEAGE_BUCKET_PREFIX': ['storage', 's3_bucket_prefix'],
-            'ENHANCED_LINEAGE_LOG_LEVEL': ['logging', 'level'],
-            'ENHANCED_LINEAGE_TIME_TOLERANCE': ['job_validation', 'time_tolerance_seconds'],
-            'ENHANCED_LINEAGE_MONITORING_ENABLED': ['monitoring', 'enabled']
-        }
-        
-        for env_var, config_path in env_mappings.items():
+        for env_var, config_path in _ENV_MAPPINGS.items():
             value = os.environ.get(env_var)
             if value is not None:
                 # 处理不同类型的值
-                if config_path[-1] in ['time_tolerance_seconds', 'max_retries', 'timeout_seconds', 
-                                      'metric_buffer_size', 'flush_interval_seconds']:
+                convert = _ENV_CONVERTERS.get(env_var)
+                if convert is not None:
                     try:
-                        value = int(value)
+                        value = convert(value)
                     except ValueError:
                         self.logger.warning(f"Invalid integer value for {env_var}: {value}")
                         continue
-                elif config_path[-1] in ['enabled']:
-                    value = value.lower() in ('true', '1', 'yes', 'on')
                 
                 # 设置配置值
                 self._set_nested_config(config_path, value)
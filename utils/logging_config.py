@@ -2,16 +2,25 @@
 日志配置模块
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+from typing import List, Optional
 from ..config import get_config
 
 
+# 异步日志管道：业务线程只负责入队，由监听线程写入实际的日志输出
+_log_queue: Optional[queue.Queue] = None
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
 def setup_logging(
     log_level: Optional[str] = None,
     log_format: Optional[str] = None,
-    enable_console: bool = True
+    enable_console: bool = True,
+    enable_async: bool = True
 ) -> logging.Logger:
     """
     设置日志配置
@@ -20,6 +29,7 @@ def setup_logging(
         log_level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_format: 日志格式
         enable_console: 是否启用控制台输出
+        enable_async: 是否通过QueueHandler/QueueListener异步输出日志
     
     Returns:
         配置好的logger实例
@@ -44,16 +54,25 @@ def setup_logging(
     logger = logging.getLogger('enhanced_lineage_agent')
     logger.setLevel(getattr(logging, log_level.upper()))
     
-    # 清除现有的handlers
+    # 清除现有的handlers，并停止之前的日志监听线程
     logger.handlers.clear()
+    stop_logging_listener()
     
-    # 添加控制台handler
+    # 创建实际输出日志的handlers
+    handlers: List[logging.Handler] = []
     if enable_console:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(getattr(logging, log_level.upper()))
         console_formatter = logging.Formatter(log_format)
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+    
+    if enable_async and handlers:
+        # 日志记录只入队，由后台监听线程写入实际的handlers
+        logger.addHandler(_start_logging_listener(handlers))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
     # 防止重复日志
     logger.propagate = False
@@ -61,6 +80,32 @@ def setup_logging(
     return logger
 
 
+def _start_logging_listener(handlers: List[logging.Handler]) -> logging.handlers.QueueHandler:
+    """启动日志监听线程，返回挂载到logger上的QueueHandler"""
+    global _log_queue, _queue_listener
+    
+    _log_queue = queue.Queue(-1)
+    _queue_listener = logging.handlers.QueueListener(
+        _log_queue, *handlers, respect_handler_level=True
+    )
+    _queue_listener.start()
+    
+    return logging.handlers.QueueHandler(_log_queue)
+
+
+def stop_logging_listener():
+    """停止日志监听线程，并输出队列中剩余的日志记录"""
+    global _log_queue, _queue_listener
+    
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+        _log_queue = None
+
+
+atexit.register(stop_logging_listener)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     获取指定名称的logger
@@ -83,6 +128,10 @@ class ContextualLogger:
         self.logger = logger
         self.context_id = context_id
     
+    def isEnabledFor(self, level: int) -> bool:
+        """判断指定级别的日志是否会被输出，用于跳过开销较大的消息构造"""
+        return self.logger.isEnabledFor(level)
+    
     def _format_message(self, message: str) -> str:
         """格式化消息，添加上下文信息"""
         if self.context_id:
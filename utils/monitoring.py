@@ -4,25 +4,54 @@
 为MVP版本提供基础的监控和指标收集功能。
 """
 
+import atexit
 import boto3
 import json
 import logging
+import threading
+import weakref
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Deque
 from botocore.exceptions import ClientError
 
 
+# CloudWatch PutMetricData每次最多接受20个指标
+CLOUDWATCH_MAX_BATCH_SIZE = 20
+
+# 所有存活的监控实例，进程退出时统一刷新
+_live_monitors: "weakref.WeakSet[SimpleMonitoring]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_monitors():
+    """进程退出时刷新所有监控实例的缓冲指标"""
+    for monitor in list(_live_monitors):
+        try:
+            monitor.flush_metrics()
+        except Exception:
+            pass
+
+
 class SimpleMonitoring:
     """简化的监控实现"""
     
-    def __init__(self, namespace: str = "EnhancedLineage/MVP"):
+    def __init__(self, namespace: str = "EnhancedLineage/MVP",
+                 buffer_size: int = CLOUDWATCH_MAX_BATCH_SIZE,
+                 flush_interval_seconds: float = 5.0,
+                 max_buffered_metrics: int = 1000):
         self.cloudwatch = boto3.client('cloudwatch')
         self.namespace = namespace
         self.logger = logging.getLogger(__name__)
         
-        # 指标缓冲区
-        self._metric_buffer: List[Dict[str, Any]] = []
-        self._buffer_size = 100
+        # 指标缓冲区：emit_*只做内存追加，按批次或定时刷新到CloudWatch
+        self._metric_buffer: Deque[Dict[str, Any]] = deque(maxlen=max_buffered_metrics)
+        self._buffer_size = buffer_size
+        self._flush_interval_seconds = flush_interval_seconds
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        
+        _live_monitors.add(self)
     
     def emit_context_identification_metric(self, success: bool, environment_type: str, 
                                          processing_time_ms: float = 0):
@@ -226,39 +255,68 @@ class SimpleMonitoring:
         """缓冲指标数据"""
         timestamp = datetime.utcnow()
         
-        for metric in metrics:
-            metric['Timestamp'] = timestamp
-            self._metric_buffer.append(metric)
+        with self._buffer_lock:
+            for metric in metrics:
+                metric['Timestamp'] = timestamp
+                self._metric_buffer.append(metric)
+            
+            buffer_full = len(self._metric_buffer) >= self._buffer_size
+            if not buffer_full:
+                self._schedule_flush()
         
         # 如果缓冲区满了，刷新到CloudWatch
-        if len(self._metric_buffer) >= self._buffer_size:
+        if buffer_full:
             self.flush_metrics()
     
+    def _schedule_flush(self):
+        """启动定时刷新（调用方需持有缓冲区锁）"""
+        if self._flush_timer is not None or self._flush_interval_seconds <= 0:
+            return
+        
+        self._flush_timer = threading.Timer(self._flush_interval_seconds, self._on_flush_timer)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    def _on_flush_timer(self):
+        """定时刷新回调"""
+        with self._buffer_lock:
+            self._flush_timer = None
+        self.flush_metrics()
+    
     def flush_metrics(self):
         """刷新指标到CloudWatch"""
-        if not self._metric_buffer:
-            return
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            
+            if not self._metric_buffer:
+                return
+            
+            pending = list(self._metric_buffer)
+            self._metric_buffer.clear()
         
+        sent = 0
         try:
-            # CloudWatch每次最多接受20个指标
-            batch_size = 20
-            for i in range(0, len(self._metric_buffer), batch_size):
-                batch = self._metric_buffer[i:i + batch_size]
+            for i in range(0, len(pending), CLOUDWATCH_MAX_BATCH_SIZE):
+                batch = pending[i:i + CLOUDWATCH_MAX_BATCH_SIZE]
                 
                 self.cloudwatch.put_metric_data(
                     Namespace=self.namespace,
                     MetricData=batch
                 )
+                sent += len(batch)
             
-            self.logger.debug(f"Flushed {len(self._metric_buffer)} metrics to CloudWatch")
-            self._metric_buffer.clear()
+            self.logger.debug(f"Flushed {len(pending)} metrics to CloudWatch")
             
         except ClientError as e:
             self.logger.error(f"Failed to flush metrics to CloudWatch: {e}")
-            # 保留指标数据，下次再试
+            # 保留未发送的指标数据，下次再试
+            with self._buffer_lock:
+                self._metric_buffer.extendleft(reversed(pending[sent:]))
         except Exception as e:
             self.logger.error(f"Unexpected error flushing metrics: {e}")
-            self._metric_buffer.clear()  # 清空缓冲区避免内存泄漏
+            # 丢弃未发送的指标，避免内存泄漏
     
     def create_dashboard(self, dashboard_name: str) -> bool:
         """创建CloudWatch仪表板"""